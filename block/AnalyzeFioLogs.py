@@ -0,0 +1,908 @@
+#!/usr/bin/env python3
+"""Analyze FIO Logs.
+
+# Interface between RunFioTest.py
+# RunFioTest.py should do:
+# 1. generate the bw/iops/lat logs by "fio --write_*_log" with
+#    "--per_job_logs=1" and "--log_avg_msec" (the "plots" collector)
+# 2. name the logs as "<casename>_<series>.<job>.log"
+# 3. convert the logs into "<casename>.fiologs.npz" by "--convert" (the
+#    text logs are removed unless "--keep_text_logs")
+# 4. put the logs into "<casename>.tar.gz" in the log path
+# 5. generate the latency histogram logs by "fio --write_hist_log" (the
+#    "hist" collector), named as "<casename>_clat_hist.<job>.log"
+
+History:
+v0.1    2026-10-17  agent         Init version.
+"""
+
+import os
+import io
+import re
+import glob
+import struct
+import zipfile
+import tarfile
+import multiprocessing
+import click
+import numpy as np
+import pandas as pd
+
+# The pattern of the log names, such as "<casename>_bw.1.log", the
+# histogram logs are named as "<casename>_clat_hist.1.log"
+LOG_PATTERN = re.compile(
+    r'^(.+)_(bw|iops|lat|clat|slat|clat_hist)\.(\d+)\.log$')
+
+# The number of latency histogram bins of fio without coarseness, which is
+# FIO_IO_U_PLAT_GROUP_NR * FIO_IO_U_PLAT_VAL of fio 3.x (29 groups) and the
+# older versions (19 groups).
+HIST_BINS = [29 * 64, 19 * 64]
+
+# The directions of fio ("ddir")
+DIRECTIONS = ['read', 'write', 'trim']
+
+# The pattern of the converted logs, such as "<casename>.fiologs.npz"
+NPZ_PATTERN = re.compile(r'^(.+)\.fiologs\.npz$')
+
+# The columns of the converted logs and their dtypes. Each column of each
+# series is stored as an array named "<series>.<column>" in the npz file.
+NPZ_COLUMNS = [('time', np.uint32), ('value', np.int64),
+               ('direction', np.uint8), ('bs', np.uint32), ('job', np.uint16)]
+
+# The scale to convert the log values, and the unit after converting. The
+# "bw" was "KiB/s", the latencies were "ns".
+SERIES_UNITS = {
+    'bw': (1 / 1024.0, 'MiB/s'),
+    'iops': (1.0, 'IOPS'),
+    'lat': (1 / 1000000.0, 'ms'),
+    'clat': (1 / 1000000.0, 'ms'),
+    'slat': (1 / 1000000.0, 'ms')
+}
+
+# The KPIs of the aggregate series added to the test report, in (series,
+# statistic) format.
+TIMESERIES_KPIS = [('bw', 'GM'), ('bw', 'CoV(%)'), ('bw', 'Jitter(%)'),
+                   ('iops', 'GM'), ('iops', 'CoV(%)'), ('iops', 'Jitter(%)'),
+                   ('lat', 'GM'), ('lat', 'CoV(%)'), ('lat', 'Jitter(%)')]
+
+
+def get_hist_bin_values(count):
+    """Get the latency values of the bins in a fio histogram log.
+
+    The value of a bin is the middle of its range, in the same way as
+    plat_idx_to_val() of fio, so that it matches the "bins" of json+ format.
+    With "--log_hist_coarseness", 2^coarseness bins are merged into one, the
+    coarseness is derived from the number of bins.
+
+    Args:
+        count: int, the number of bins in the log.
+
+    Returns:
+        An array of the values (ns).
+
+    """
+    for total in HIST_BINS:
+        stride = total // count
+        if total % count == 0 and stride & (stride - 1) == 0:
+            break
+    else:
+        raise ValueError('Unknown number of histogram bins: %s' % count)
+
+    def get_value(index, edge):
+        error_bits = np.maximum((index >> 6) - 1, 0)
+        values = (1 << (error_bits + 6)) + (index % 64 + edge) * (
+            1 << error_bits)
+        return np.where(index < 128, index, values)
+
+    index = np.arange(count, dtype=np.int64) * stride
+    lower = get_value(index, 0.0)
+    upper = get_value(index + stride - 1, 1.0)
+    return np.floor((lower + upper) / 2.0).astype(np.int64)
+
+
+def get_timeseries_column(series, statistic):
+    """Get the report column of a statistic, such as 'BW-GM(MiB/s)'."""
+    unit = SERIES_UNITS[series][1]
+    if statistic.endswith('(%)') or unit == 'IOPS':
+        return '%s-%s' % (series.upper(), statistic)
+    return '%s-%s(%s)' % (series.upper(), statistic, unit)
+
+
+def parse_fio_log(buffer, columns=3):
+    """Parse a fio log into an array.
+
+    The lines of a fio log are like "time, value, direction, bs, offset",
+    the number of columns depends on the fio version and options.
+
+    Args:
+        buffer: bytes, the content of the log.
+        columns: int, the number of leading columns to be returned, None
+            for all the columns (such as the bins of a histogram log).
+
+    Returns:
+        An array of shape (samples, columns), the columns are the time (ms),
+        the value, the direction (0 for read, 1 for write) and the bs.
+
+    """
+    end = buffer.find(b'\n')
+    if end < 0:
+        end = len(buffer)
+    width = buffer[:end].count(b',') + 1
+    if not buffer[:end].strip():
+        return np.zeros((0, columns or width))
+
+    values = np.fromstring(buffer.replace(b',', b' '), sep=' ')
+    return values[:len(values) // width * width].reshape(-1,
+                                                         width)[:, :columns]
+
+
+def convert_fio_logs(path, keep_text_logs=False):
+    """Convert the text logs in a path into the binary format.
+
+    The logs of each fio test are saved into "<casename>.fiologs.npz" in
+    the same path, which is uncompressed so that it can be loaded
+    memory-mapped by load_fio_logs_npz(). The columns are stored one by one
+    in their own dtypes, so it is smaller than the text and packs better in
+    the tarball.
+
+    Args:
+        path: string, the path where the text logs are, such as the output
+            path of a fio job.
+        keep_text_logs: bool, keep the text logs after converting.
+
+    Returns:
+        The list of the converted files.
+
+    """
+    # Read the text logs of each fio test
+    cases = {}
+    for name in sorted(os.listdir(path)):
+        match = LOG_PATTERN.match(name)
+        if match and match.group(2) in SERIES_UNITS:
+            with open(path + os.sep + name, 'rb') as f:
+                array = parse_fio_log(f.read(), 4)
+            cases.setdefault(match.group(1), []).append(
+                (match.group(2), int(match.group(3)), array, name))
+
+    outputs = []
+    for (casename, logs) in sorted(cases.items()):
+        arrays = {}
+        for series in sorted(set([x[0] for x in logs])):
+            parts = sorted([x for x in logs if x[0] == series],
+                           key=lambda x: x[1])
+            data = np.concatenate([x[2] for x in parts])
+            jobs = np.repeat([x[1] for x in parts], [len(x[2]) for x in parts])
+            for (index, (column, dtype)) in enumerate(NPZ_COLUMNS[:4]):
+                arrays['%s.%s' % (series, column)] = data[:, index].astype(
+                    dtype)
+            arrays['%s.job' % series] = jobs.astype(NPZ_COLUMNS[4][1])
+
+        # Write to a temporary file and rename it, np.savez() appends the
+        # ".npz" suffix to the name without it
+        output = path + os.sep + casename + '.fiologs.npz'
+        np.savez(output + '.tmp.npz', **arrays)
+        os.rename(output + '.tmp.npz', output)
+        outputs.append(output)
+
+        if not keep_text_logs:
+            for log in logs:
+                os.remove(path + os.sep + log[3])
+
+    return outputs
+
+
+def load_fio_logs_npz(source):
+    """Load the converted logs.
+
+    The arrays are memory-mapped from the npz file, since they are stored
+    without compression, or decoded from the buffer.
+
+    Args:
+        source: string or bytes, the path to the npz file or its content.
+
+    Returns:
+        A dict like {"<series>.<column>": array}.
+
+    """
+    if not isinstance(source, str):
+        with np.load(io.BytesIO(source)) as npz:
+            return dict([(x[:-len('.npy')] if x.endswith('.npy') else x,
+                          npz[x]) for x in npz.files])
+
+    arrays = {}
+    with zipfile.ZipFile(source) as archive, open(source, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')]
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info))
+                continue
+
+            # Skip the local file header to the npy data
+            f.seek(info.header_offset)
+            header = f.read(30)
+            (name_length, extra_length) = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                (shape, fortran_order, dtype) = \
+                    np.lib.format.read_array_header_1_0(f)
+            else:
+                (shape, fortran_order, dtype) = \
+                    np.lib.format.read_array_header_2_0(f)
+
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(source,
+                                         dtype=dtype,
+                                         mode='r',
+                                         offset=f.tell(),
+                                         shape=shape,
+                                         order='F' if fortran_order else 'C')
+
+    return arrays
+
+
+def _split_fio_logs_npz(casename, arrays, series_list=None):
+    """Split the converted logs into the tuples of read_fio_logs()."""
+    logs = []
+    for series in sorted(set([x.split('.')[0] for x in arrays])):
+        if series_list and series not in series_list:
+            continue
+        data = np.column_stack([
+            arrays['%s.%s' % (series, x)].astype(np.float64)
+            for x in ('time', 'value', 'direction')
+        ])
+        # The jobs are contiguous, split the samples at the boundaries
+        jobs = np.asarray(arrays['%s.job' % series])
+        order = np.argsort(jobs, kind='mergesort')
+        (jobs, data) = (jobs[order], data[order])
+        bounds = [0] + list(np.flatnonzero(np.diff(jobs)) + 1) + [len(jobs)]
+        for (begin, end) in zip(bounds[:-1], bounds[1:]):
+            if end > begin:
+                logs.append((casename, series, int(jobs[begin]),
+                             data[begin:end]))
+
+    return logs
+
+
+def read_fio_logs(source, series_list=None):
+    """Read the fio logs from a tarball, a directory or beside a fiolog.
+
+    Both the text logs and the converted ones are read, the text logs are
+    ignored if the converted ones of the same fio test are there.
+
+    Args:
+        source: string, the path to a *.tar.gz file, a directory or a
+            *.fiolog file (the logs with the same casename beside it).
+        series_list: list, the series to be read, all if not specified.
+
+    Returns:
+        A list of (casename, series, job, array) tuples, the array is
+        returned by parse_fio_log().
+
+    """
+    logs, converted = [], []
+
+    def is_wanted(name):
+        basename = os.path.basename(name)
+        match = LOG_PATTERN.match(basename)
+        if match:
+            return not series_list or match.group(2) in series_list
+        return bool(NPZ_PATTERN.match(basename))
+
+    def add(name, content=None):
+        basename = os.path.basename(name)
+        match = NPZ_PATTERN.match(basename)
+        if match:
+            arrays = load_fio_logs_npz(name if content is None else content)
+            converted.extend(
+                _split_fio_logs_npz(match.group(1), arrays, series_list))
+            return
+
+        match = LOG_PATTERN.match(basename)
+        if content is None:
+            with open(name, 'rb') as f:
+                content = f.read()
+        logs.append(
+            (match.group(1), match.group(2), int(match.group(3)),
+             parse_fio_log(content,
+                           None if match.group(2) == 'clat_hist' else 3)))
+
+    if source.endswith('.tar.gz') and os.path.isfile(source):
+        with tarfile.open(source, 'r|gz') as tar:
+            for member in tar:
+                if member.isfile() and is_wanted(member.name):
+                    add(member.name, tar.extractfile(member).read())
+    else:
+        if os.path.isdir(source):
+            names = [source + os.sep + x for x in sorted(os.listdir(source))]
+        elif source.endswith('.fiolog'):
+            prefix = source[:-len('.fiolog')]
+            names = sorted(glob.glob(prefix + '_*.log')) + glob.glob(
+                prefix + '.fiologs.npz')
+        else:
+            names = [source]
+
+        for name in names:
+            if is_wanted(name):
+                add(name)
+
+    # Prefer the converted logs
+    cases = set([(x[0], x[1]) for x in converted])
+    return converted + [x for x in logs if (x[0], x[1]) not in cases]
+
+
+class FioLogAnalyzer():
+    """FIO Log Analyzer.
+
+    This class used to analyze the bw/iops/lat logs of fio. As basic
+    functions:
+    1. It loads the logs into arrays from the tarballs or directories;
+    2. It merges the directions of each job into a series, and merges the
+       jobs of each fio test into an aggregate series ("ALL");
+    3. It calculates the statistics of all the series in a single pass;
+    4. It dumps the statistics to a CSV file.
+
+    The latency histogram logs are decoded into the percentile series of
+    each direction, the histograms of the jobs are merged in each interval.
+
+    Attributes:
+        log_list: the list of loaded logs.
+        df_stats: a DataFrame to store the statistics.
+        df_hist: a DataFrame to store the percentile series.
+
+    """
+
+    # The series to be analyzed.
+    series_list = ['bw', 'iops', 'lat']
+
+    # The samples in the warm-up period (seconds) are trimmed.
+    trim = 0.0
+
+    # The percentiles of the samples to be reported.
+    percentile_list = ['1', '5', '50', '95', '99']
+
+    # The completion latency percentiles decoded from the histogram logs.
+    hist_percentile_list = ['50', '99', '99.9']
+
+    def __init__(self):
+        """Init log analyzer."""
+        # The list of logs, each item is a (casename, series, job, array)
+        # tuple.
+        self.log_list = []
+
+        # The DataFrame to store the statistics.
+        self.df_stats = None
+
+        # The DataFrame to store the percentile series of the histogram logs.
+        self.df_hist = None
+
+    def load_fio_logs(self, params={}):
+        """Load the fio logs from the tarballs and directories.
+
+        Args:
+            params: dict
+                result_path: string, the path where the tarballs (or the
+                    directories of the logs) are stored in.
+                jobs: int, the number of processes to load the logs, 0 for
+                    the number of CPUs. (default 1)
+
+        Returns:
+            0: Passed
+            1: Failed
+
+        Updates:
+            self.log_list: the list of loaded logs.
+
+        """
+        # Parse required params
+        if 'result_path' not in params:
+            print('[ERROR] Missing required params: params[result_path]')
+            return 1
+
+        result_path = params['result_path']
+        jobs = params.get('jobs', 1) or multiprocessing.cpu_count()
+
+        # Include the result path itself if there are logs in it
+        sources = [result_path]
+        for name in sorted(os.listdir(result_path)):
+            path = result_path + os.sep + name
+            if name.endswith('.tar.gz') or os.path.isdir(path):
+                sources.append(path)
+
+        tasks = [(x, self.series_list) for x in sources]
+        if jobs > 1 and len(tasks) > 1:
+            pool = multiprocessing.Pool(min(jobs, len(tasks)))
+            try:
+                results = pool.map(_read_fio_logs, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_read_fio_logs(x) for x in tasks]
+
+        self.log_list = [x for logs in results for x in logs]
+        print('[NOTE] Loaded %s logs from %s sources.' %
+              (len(self.log_list), len(sources)))
+
+        return 0
+
+    def _get_job_series(self, series, array):
+        """Get the series of a job, the directions are merged.
+
+        The samples are put into buckets of the logging interval. The bw and
+        iops of the directions are summed, and the latencies are averaged.
+
+        Args:
+            series: string, the series such as 'bw'.
+            array: array, the log returned by parse_fio_log().
+
+        Returns:
+            A tuple of (buckets, values) arrays.
+
+        """
+        array = array[array[:, 0] >= self.trim * 1000.0]
+        if len(array) == 0:
+            return (np.zeros(0, dtype=np.int64), np.zeros(0))
+
+        # The logging interval is the typical distance of the timestamps
+        times = np.unique(array[:, 0])
+        steps = np.diff(times)
+        interval = np.median(steps) if len(steps) else 1.0
+
+        buckets = np.rint(array[:, 0] / interval).astype(np.int64)
+        (buckets, inverse) = np.unique(buckets, return_inverse=True)
+        values = np.bincount(inverse, array[:, 1]) * SERIES_UNITS[series][0]
+        if series not in ('bw', 'iops'):
+            values /= np.bincount(inverse)
+
+        return (buckets, values)
+
+    def _get_aggregate_series(self, series, job_series):
+        """Get the aggregate series of the jobs in a fio test.
+
+        Only the buckets covered by all the jobs are kept, the bw and iops of
+        the jobs are summed, and the latencies are averaged.
+
+        Args:
+            series: string, the series such as 'bw'.
+            job_series: list, the (buckets, values) tuples of the jobs.
+
+        Returns:
+            The values in an array.
+
+        """
+        buckets = np.concatenate([x[0] for x in job_series])
+        values = np.concatenate([x[1] for x in job_series])
+        (buckets, inverse) = np.unique(buckets, return_inverse=True)
+        counts = np.bincount(inverse)
+        sums = np.bincount(inverse, values)
+        if series not in ('bw', 'iops'):
+            sums /= counts
+
+        return sums[counts == len(job_series)]
+
+    def _get_group_statistics(self, values, groups, count):
+        """Calculate the statistics of the groups of samples.
+
+        All the groups are calculated at once by NumPy, the samples of each
+        group should be contiguous and in the order of time.
+
+        Args:
+            values: array, the samples of all the groups.
+            groups: array, the group index of each sample.
+            count: int, the number of groups.
+
+        Returns:
+            A dict of arrays, indexed by the group.
+
+        """
+        stats = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            samples = np.bincount(groups, minlength=count)
+            mean = np.bincount(groups, values, minlength=count) / samples
+            deviations = values - mean[groups]
+            stdev = np.sqrt(
+                np.bincount(groups, deviations**2, minlength=count) /
+                (samples - 1))
+
+            # The geometric mean ignores the samples of zero
+            positive = values > 0
+            geomean = np.exp(
+                np.bincount(groups[positive], np.log(values[positive]),
+                            minlength=count) /
+                np.bincount(groups[positive], minlength=count))
+
+            # The jitter is the mean change between the adjacent samples
+            adjacent = groups[1:] == groups[:-1]
+            changes = np.abs(np.diff(values))[adjacent]
+            jitter = np.bincount(groups[1:][adjacent], changes,
+                                 minlength=count) / (samples - 1)
+
+            stats['Samples'] = samples
+            stats['Mean'] = mean
+            stats['GM'] = geomean
+            stats['Stdev'] = stdev
+            stats['CoV(%)'] = stdev / mean * 100.0
+            stats['Jitter(%)'] = jitter / mean * 100.0
+
+        # The percentiles by the nearest-rank method
+        ordered = values[np.lexsort((values, groups))]
+        starts = np.cumsum(samples) - samples
+        for percentile in self.percentile_list:
+            ranks = np.ceil(float(percentile) / 100.0 * samples) - 1
+            index = starts + np.clip(ranks, 0, np.maximum(samples - 1, 0))
+            result = np.full(count, np.nan)
+            result[samples > 0] = ordered[index[samples > 0].astype(
+                np.int64)]
+            stats['P%s' % percentile] = result
+
+        return stats
+
+    def calculate_statistics(self):
+        """Calculate the statistics of the jobs and the fio tests.
+
+        As data source, the following attributes should be ready to use:
+        1. self.log_list: the list of loaded logs.
+
+        Updates:
+            self.df_stats: the DataFrame of statistics.
+
+        """
+        # Merge the directions of each job and the jobs of each fio test
+        cases = {}
+        for (casename, series, job, array) in self.log_list:
+            if series in SERIES_UNITS:
+                cases.setdefault((casename, series), []).append(
+                    (job, self._get_job_series(series, array)))
+
+        keys, arrays = [], []
+        for ((casename, series), jobs) in sorted(cases.items()):
+            jobs.sort(key=lambda x: x[0])
+            for (job, (buckets, values)) in jobs:
+                keys.append((casename, series, job))
+                arrays.append(values)
+            keys.append((casename, series, 'ALL'))
+            arrays.append(
+                self._get_aggregate_series(series, [x[1] for x in jobs]))
+
+        # Calculate the statistics of all the series in a single pass
+        groups = np.repeat(np.arange(len(arrays)),
+                           [len(x) for x in arrays])
+        values = np.concatenate(arrays) if arrays else np.zeros(0)
+        stats = self._get_group_statistics(values, groups, len(arrays))
+
+        self.df_stats = pd.DataFrame(keys, columns=['Case', 'Series', 'Job'])
+        self.df_stats['Unit'] = [SERIES_UNITS[x][1] for x in
+                                 self.df_stats['Series']]
+        columns = ['Samples', 'Mean', 'GM', 'Stdev', 'CoV(%)'] + [
+            'P%s' % x for x in self.percentile_list
+        ] + ['Jitter(%)']
+        for column in columns:
+            self.df_stats[column] = stats[column]
+        self.df_stats = self.df_stats.round(4)
+
+        return None
+
+    def calculate_hist_percentiles(self):
+        """Calculate the percentile series from the histogram logs.
+
+        The histograms of all the jobs are merged (summed up bin by bin) in
+        each interval for each direction, then the percentiles of all the
+        intervals are calculated at once by the cumulative counts, which is
+        the lowest bin whose cumulative count reaches the percentage.
+
+        As data source, the following attributes should be ready to use:
+        1. self.log_list: the list of loaded logs.
+
+        Updates:
+            self.df_hist: the DataFrame of percentile series.
+
+        """
+        cases = {}
+        for (casename, series, job, array) in self.log_list:
+            if series == 'clat_hist' and len(array):
+                cases.setdefault(casename, []).append(array)
+
+        columns = ['CLAT%s(ms)' % x for x in self.hist_percentile_list]
+        df_list = []
+        for (casename, arrays) in sorted(cases.items()):
+            # The columns are "time, ddir, bs, bins..."
+            data = np.concatenate(arrays)
+            data = data[data[:, 0] >= self.trim * 1000.0]
+            if len(data) == 0:
+                continue
+            counts = data[:, 3:]
+            values = get_hist_bin_values(counts.shape[1])
+
+            # Put the histograms into the buckets of the logging interval
+            times = np.unique(data[:, 0])
+            interval = np.median(np.diff(times)) if len(times) > 1 else 1.0
+            buckets = np.rint(data[:, 0] / interval).astype(np.int64)
+            (keys, inverse) = np.unique(np.column_stack(
+                (data[:, 1].astype(np.int64), buckets)),
+                                        axis=0,
+                                        return_inverse=True)
+            inverse = inverse.reshape(-1)
+
+            # Merge the histograms in each bucket
+            order = np.argsort(inverse, kind='mergesort')
+            starts = np.flatnonzero(np.diff(inverse[order], prepend=-1))
+            merged = np.add.reduceat(counts[order], starts, axis=0)
+
+            # Calculate the percentiles of all the buckets
+            cumsum = np.cumsum(merged, axis=1)
+            totals = cumsum[:, -1]
+            df = pd.DataFrame({
+                'Case': casename,
+                'Direction': [DIRECTIONS[x] for x in keys[:, 0]],
+                'Time(s)': keys[:, 1] * interval / 1000.0,
+                'Samples': totals.astype(np.int64)
+            })
+            for (column, percentile) in zip(columns,
+                                            self.hist_percentile_list):
+                thresholds = totals * float(percentile) / 100.0
+                index = np.minimum(
+                    (cumsum < thresholds[:, None]).sum(axis=1),
+                    len(values) - 1)
+                df[column] = np.where(totals > 0, values[index] / 1000000.0,
+                                      np.nan)
+            df_list.append(df)
+
+        self.df_hist = pd.concat(df_list, ignore_index=True) if df_list \
+            else pd.DataFrame(columns=['Case', 'Direction', 'Time(s)',
+                                       'Samples'] + columns)
+        self.df_hist = self.df_hist.round(4)
+
+        return None
+
+    def get_timeseries_kpis(self):
+        """Get the KPIs of the aggregate series for the test report.
+
+        As data source, the self.df_stats should be ready to use.
+
+        Returns:
+            A dict like {'BW-GM(MiB/s)': value, ...}, 'NaN' if unavailable.
+
+        """
+        kpis = {}
+        df_aggr = self.df_stats[self.df_stats['Job'] == 'ALL']
+        for (series, statistic) in TIMESERIES_KPIS:
+            values = df_aggr[df_aggr['Series'] == series][statistic]
+            value = values.iloc[0] if len(values) == 1 else np.nan
+            kpis[get_timeseries_column(series, statistic)] = (
+                'NaN' if np.isnan(value) else float(value))
+
+        return kpis
+
+    def hist_dataframe_to_csv(self, params={}):
+        """Dump the percentile series to a csv file.
+
+        As data source, the self.df_hist should be ready to use.
+
+        Args:
+            params: dict
+                hist_csv: string, the csv file to dump the series to.
+
+        Returns:
+            0: Passed
+            1: Failed
+
+        Raises:
+            1. Error while dumping to csv file
+
+        """
+        # Parse required params
+        if 'hist_csv' not in params:
+            print('[ERROR] Missing required params: params[hist_csv]')
+            return 1
+
+        # Write the series to the csv file
+        try:
+            print('[NOTE] Dumping percentile series into csv file "%s"...' %
+                  params['hist_csv'])
+            self.df_hist.to_csv(params['hist_csv'])
+            print('[NOTE] Finished!')
+
+        except Exception as err:
+            print('[ERROR] Error while dumping to csv file: %s' % err)
+            return 1
+
+        return 0
+
+    def statistics_dataframe_to_csv(self, params={}):
+        """Dump the statistics to a csv file.
+
+        As data source, the self.df_stats should be ready to use.
+
+        Args:
+            params: dict
+                stats_csv: string, the csv file to dump the statistics to.
+
+        Returns:
+            0: Passed
+            1: Failed
+
+        Raises:
+            1. Error while dumping to csv file
+
+        """
+        # Parse required params
+        if 'stats_csv' not in params:
+            print('[ERROR] Missing required params: params[stats_csv]')
+            return 1
+
+        # Write the statistics to the csv file
+        try:
+            print('[NOTE] Dumping statistics into csv file "%s"...' %
+                  params['stats_csv'])
+            self.df_stats.to_csv(params['stats_csv'])
+            print('[NOTE] Finished!')
+
+        except Exception as err:
+            print('[ERROR] Error while dumping to csv file: %s' % err)
+            return 1
+
+        return 0
+
+
+def _read_fio_logs(task):
+    """Read the fio logs in a worker process, task is (source, series)."""
+    (source, series_list) = task
+    try:
+        return read_fio_logs(source, series_list)
+    except Exception as err:
+        print('[ERROR] Error while reading logs from "%s": %s' %
+              (source, err))
+        return []
+
+
+def get_timeseries_kpis(source, trim=0.0):
+    """Get the time-series KPIs of a fio test for the test report.
+
+    Args:
+        source: string, the tarball or fiolog of the fio test.
+        trim: float, the warm-up period (seconds) to be trimmed.
+
+    Returns:
+        A dict like {'BW-GM(MiB/s)': value, ...}, 'NaN' if unavailable.
+
+    """
+    analyzer = FioLogAnalyzer()
+    analyzer.trim = trim
+    analyzer.log_list = read_fio_logs(source, analyzer.series_list)
+    analyzer.calculate_statistics()
+    return analyzer.get_timeseries_kpis()
+
+
+def analyze_fio_logs(result_path,
+                     stats_csv,
+                     jobs=1,
+                     trim=0.0,
+                     percentiles=None,
+                     series=None,
+                     hist_csv=None,
+                     hist_percentiles=None):
+    """Analyze FIO logs."""
+    analyzer = FioLogAnalyzer()
+    analyzer.trim = trim
+    if percentiles:
+        analyzer.percentile_list = percentiles
+    if series:
+        analyzer.series_list = series
+    if hist_percentiles:
+        analyzer.hist_percentile_list = hist_percentiles
+    if hist_csv:
+        analyzer.series_list = analyzer.series_list + ['clat_hist']
+
+    # Load the logs
+    return_value = analyzer.load_fio_logs({
+        'result_path': result_path,
+        'jobs': jobs
+    })
+    if return_value:
+        exit(1)
+
+    # Calculate the statistics
+    analyzer.calculate_statistics()
+
+    # Dump the statistics as CSV file
+    return_value = analyzer.statistics_dataframe_to_csv(
+        {'stats_csv': stats_csv})
+    if return_value:
+        exit(1)
+
+    # Dump the percentile series of the histogram logs if required
+    if hist_csv:
+        analyzer.calculate_hist_percentiles()
+        return_value = analyzer.hist_dataframe_to_csv({'hist_csv': hist_csv})
+        if return_value:
+            exit(1)
+
+    exit(0)
+
+
+@click.command()
+@click.option('--result_path',
+              type=click.Path(exists=True),
+              help='Specify the path where the tarballs (or the logs) are \
+stored in.')
+@click.option('--stats_csv',
+              type=click.Path(),
+              help='Specify the name of CSV file for the statistics.')
+@click.option('--jobs',
+              type=click.IntRange(min=0),
+              default=1,
+              help='The number of processes to load the logs, \'0\' for the \
+number of CPUs. (default 1)')
+@click.option('--trim',
+              type=click.FloatRange(min=0),
+              default=0.0,
+              help='Trim the samples in the warm-up period (seconds). \
+(default 0)')
+@click.option('--percentiles',
+              help='The percentiles of the samples to be reported. (default \
+\'1,5,50,95,99\')')
+@click.option('--series',
+              help='The series to be analyzed, such as \'bw,iops,lat,clat\'. \
+(default \'bw,iops,lat\')')
+@click.option('--hist_csv',
+              type=click.Path(),
+              help='Specify the name of CSV file for the completion latency \
+percentiles over time, which are decoded from the histogram logs.')
+@click.option('--hist_percentiles',
+              help='The percentiles of the histogram logs to be reported. \
+(default \'50,99,99.9\')')
+@click.option('--convert',
+              type=click.Path(exists=True, file_okay=False),
+              help='Convert the text logs in the path (such as the output \
+path of a fio job) into \'<casename>.fiologs.npz\' and exit.')
+@click.option('--keep_text_logs',
+              is_flag=True,
+              help='Keep the text logs after converting them.')
+def cli(result_path, stats_csv, jobs, trim, percentiles, series, hist_csv,
+        hist_percentiles, convert, keep_text_logs):
+    """Command Line Interface."""
+    # Convert the text logs
+    if convert:
+        for output in convert_fio_logs(convert, keep_text_logs):
+            print('[NOTE] Converted the logs into "%s".' % output)
+        exit(0)
+
+    # Parse and check the parameters
+    if not result_path:
+        print('[ERROR] Missing parameter, use "--help" to check the usage.')
+        exit(1)
+    if not stats_csv:
+        print('[WARNING] No CSV file name (--stats_csv) was specified. Will \
+use "%s/fio_timeseries.csv" instead.' % result_path)
+        stats_csv = result_path + os.sep + 'fio_timeseries.csv'
+
+    (percentile_list, hist_percentile_list) = ([], [])
+    for (items, values) in ((percentiles, percentile_list),
+                            (hist_percentiles, hist_percentile_list)):
+        for percentile in items.split(',') if items else []:
+            try:
+                if not 0 < float(percentile) <= 100:
+                    raise ValueError
+            except ValueError:
+                print('[ERROR] Invalid percentile "%s", it should be a '
+                      'number between 0 and 100.' % percentile)
+                exit(1)
+            values.append('%g' % float(percentile))
+
+    series_list = series.split(',') if series else []
+    for item in series_list:
+        if item not in SERIES_UNITS:
+            print('[ERROR] Invalid series "%s", it should be one of %s.' %
+                  (item, ', '.join(sorted(SERIES_UNITS))))
+            exit(1)
+
+    # Analyze the fio logs
+    analyze_fio_logs(result_path, stats_csv, jobs, trim, percentile_list,
+                     series_list, hist_csv, hist_percentile_list)
+
+
+if __name__ == '__main__':
+    cli()
@@ -8,13 +8,20 @@ v1.1    2018-08-09  charles.shih  Update the Command Line Interface.
 v1.2    2018-08-20  charles.shih  Support Python 3.
 v1.2.1  2019-07-08  charles.shih  Use minor and major to indicate the results.
 v1.3    2019-07-29  charles.shih  Calculate 90% complete latency number.
+v1.4    2026-10-17  agent         Compare per device, placement policy and CPU
+                                  efficiency; load columnar samples and support
+                                  the groupby engine.
 """
 
+import os
+import time
 import click
 import pandas as pd
 import numpy as np
 from scipy.stats import ttest_rel
 from scipy.stats import ttest_ind
+from scipy.stats import ttest_ind_from_stats
+from ReportUtils import read_samples
 
 
 class FioBenchmarkReporter():
@@ -29,19 +36,40 @@ class FioBenchmarkReporter():
         df_base: a DataFrame to store base samples.
         df_test: a DataFrame to store test samples.
         df_report: a DataFrame to store the benchmark report.
+        keys: the KEYs to identify a sub-case.
 
     """
 
     # The DataFrame to store base samples and test samples
     df_base = df_test = None
 
+    # The KEYs to identify a sub-case, the optional KEYs will be appended
+    # only if both the base and test samples have them
+    keys = ['Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs']
+    optional_keys = ['Target', 'Placement']
+
+    # The KPIs to be compared, in (label, column, higher_is_better) format,
+    # the optional KPIs will be appended only if both the base and test
+    # samples have them
+    kpis = [('BW', 'BW(MiB/s)', True), ('IOPS', 'IOPS', True),
+            ('LAT', 'LAT(ms)', False), ('CLAT90', 'CLAT90(ms)', False),
+            ('Util', 'Util(%)', True)]
+    optional_kpis = [('IOPS/CPU', 'IOPS/CPU', True),
+                     ('BW/CPU', 'BW/CPU(MiB/s)', True),
+                     ('Cycles/IO', 'Cycles/IO', False)]
+
+    # The engine to calculate the statistics, 'groupby' calculates all the
+    # sub-cases at once, 'legacy' looks up the samples row by row
+    engine = 'groupby'
+
     # The DataFrame to store the benchmark report
     df_report = None
 
     def load_samples(self, params={}):
         """Load the base and test samples.
 
-        Load the base and test samples from csv files specified.
+        Load the base and test samples from csv (or parquet/feather) files
+        specified.
 
         Args:
             params: dict
@@ -57,7 +85,7 @@ class FioBenchmarkReporter():
             self.df_test: store the test samples;
 
         Raises:
-            1. Error while reading from csv file
+            1. Error while reading the samples
 
         """
         # Parse required params
@@ -71,59 +99,67 @@ class FioBenchmarkReporter():
 
         try:
             # Load base samples from CSV file
-            print('[NOTE] Reading base samples from csv file "%s"...' %
+            print('[NOTE] Reading base samples from file "%s"...' %
                   params['base_csv'])
-            self.df_base = pd.read_csv(params['base_csv'])
+            self.df_base = read_samples(params['base_csv'])
 
             # Load test samples from CSV file
-            print('[NOTE] Reading test samples from csv file "%s"...' %
+            print('[NOTE] Reading test samples from file "%s"...' %
                   params['test_csv'])
-            self.df_test = pd.read_csv(params['test_csv'])
+            self.df_test = read_samples(params['test_csv'])
 
         except Exception as err:
-            print('[ERROR] Error while reading from csv file: %s' % err)
+            print('[ERROR] Error while reading the samples: %s' % err)
             return 1
 
         return 0
 
     def _add_columns_into_report_dataframe(self, label):
         """Add a serial of columns into report DataFrame."""
-        # Add a serial of columns for the specified label
-        self.df_report.insert(
-            len(self.df_report.columns), label + '-BASE-AVG', 0)
-        self.df_report.insert(
-            len(self.df_report.columns), label + '-BASE-%SD', 0)
-        self.df_report.insert(
-            len(self.df_report.columns), label + '-TEST-AVG', 0)
-        self.df_report.insert(
-            len(self.df_report.columns), label + '-TEST-%SD', 0)
-        self.df_report.insert(len(self.df_report.columns), label + '-%DIFF', 0)
-        self.df_report.insert(len(self.df_report.columns), label + '-SIGN', 0)
-        self.df_report.insert(
-            len(self.df_report.columns), label + '-CONCLUSION', 0)
+        # Add a serial of columns for the specified label, the statistics are
+        # float and the conclusion is a string
+        for suffix in ('-BASE-AVG', '-BASE-%SD', '-TEST-AVG', '-TEST-%SD',
+                       '-%DIFF', '-SIGN'):
+            self.df_report.insert(len(self.df_report.columns), label + suffix,
+                                  np.nan)
+        self.df_report.insert(len(self.df_report.columns),
+                              label + '-CONCLUSION', None)
 
         return None
 
     def _create_report_dataframe(self):
         """Create the report DataFrame."""
+        # Get the KEYs for both the base and test samples
+        self.keys = list(FioBenchmarkReporter.keys)
+        for key in self.optional_keys:
+            if key in self.df_base.columns and key in self.df_test.columns:
+                # The "NaN" was read as a float which couldn't be matched,
+                # the columnar files keep it as a category
+                if self.df_base[key].isna().any():
+                    self.df_base[key] = self.df_base[key].fillna('NaN')
+                if self.df_test[key].isna().any():
+                    self.df_test[key] = self.df_test[key].fillna('NaN')
+                self.keys.append(key)
+
         # Create the report DataFrame according to self.df_test
-        self.df_report = self.df_test[[
-            'Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs'
-        ]].drop_duplicates()
+        self.df_report = self.df_test[self.keys].drop_duplicates()
 
         # Sort the report DataFrame and reset its index
-        self.df_report = self.df_report.sort_values(by=[
-            'Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs'
-        ])
+        self.df_report = self.df_report.sort_values(by=self.keys)
         self.df_report = self.df_report.reset_index().drop(columns=['index'])
 
+        # Get the KPIs for both the base and test samples
+        self.kpis = list(FioBenchmarkReporter.kpis)
+        for kpi in self.optional_kpis:
+            if kpi[1] in self.df_base.columns and \
+                    kpi[1] in self.df_test.columns:
+                self.kpis.append(kpi)
+
         # Add the new columns to report DataFrame
         # [Note] Units: BW(MiB/s) / IOPS / LAT(ms) / CLAT90(ms) / Util(%)
-        self._add_columns_into_report_dataframe('BW')
-        self._add_columns_into_report_dataframe('IOPS')
-        self._add_columns_into_report_dataframe('LAT')
-        self._add_columns_into_report_dataframe('CLAT90')
-        self._add_columns_into_report_dataframe('Util')
+        #        IOPS/CPU / BW/CPU(MiB/s) / Cycles/IO
+        for (label, column, higher_is_better) in self.kpis:
+            self._add_columns_into_report_dataframe(label)
 
         return None
 
@@ -240,37 +276,18 @@ class FioBenchmarkReporter():
         # Deal with every Series in report DataFrame
         for (index, series) in self.df_report.iterrows():
 
-            # Look up the sub DataFrame from the base samples
-            my_sub_base = self.df_base[
-                (self.df_base['Backend'] == series['Backend'])
-                & (self.df_base['Driver'] == series['Driver'])
-                & (self.df_base['Format'] == series['Format'])
-                & (self.df_base['RW'] == series['RW'])
-                & (self.df_base['BS'] == series['BS'])
-                & (self.df_base['IODepth'] == series['IODepth'])
-                & (self.df_base['Numjobs'] == series['Numjobs'])]
-
-            # Look up the sub DataFrame from the test samples
-            my_sub_test = self.df_test[
-                (self.df_test['Backend'] == series['Backend'])
-                & (self.df_test['Driver'] == series['Driver'])
-                & (self.df_test['Format'] == series['Format'])
-                & (self.df_test['RW'] == series['RW'])
-                & (self.df_test['BS'] == series['BS'])
-                & (self.df_test['IODepth'] == series['IODepth'])
-                & (self.df_test['Numjobs'] == series['Numjobs'])]
+            # Look up the sub DataFrame from the base and test samples
+            my_sub_base = self.df_base
+            my_sub_test = self.df_test
+            for key in self.keys:
+                my_sub_base = my_sub_base[my_sub_base[key] == series[key]]
+                my_sub_test = my_sub_test[my_sub_test[key] == series[key]]
 
             # Calculate the statistics
-            self._calculate_and_fill_report_series(
-                series, my_sub_base, my_sub_test, 'BW', 'BW(MiB/s)', True)
-            self._calculate_and_fill_report_series(
-                series, my_sub_base, my_sub_test, 'IOPS', 'IOPS', True)
-            self._calculate_and_fill_report_series(
-                series, my_sub_base, my_sub_test, 'LAT', 'LAT(ms)', False)
-            self._calculate_and_fill_report_series(
-                series, my_sub_base, my_sub_test, 'CLAT90', 'CLAT90(ms)', False)
-            self._calculate_and_fill_report_series(
-                series, my_sub_base, my_sub_test, 'Util', 'Util(%)', True)
+            for (label, column, higher_is_better) in self.kpis:
+                self._calculate_and_fill_report_series(
+                    series, my_sub_base, my_sub_test, label, column,
+                    higher_is_better)
 
             # Show current series
             print(series)
@@ -280,6 +297,89 @@ class FioBenchmarkReporter():
 
         return None
 
+    def _get_group_statistics(self, df):
+        """Get the summary statistics of all the KPIs for each sub-case.
+
+        Args:
+            df: DataFrame, the base or test samples.
+
+        Returns:
+            A DataFrame indexed by the rows of the report DataFrame, with the
+            "<column>-mean", "<column>-std" (ddof=1), "<column>-count" (the
+            valid samples) and "<column>-size" (all the samples) columns of
+            each KPI. The statistics are NaN for the missing sub-cases.
+
+        """
+        columns = [x[1] for x in self.kpis]
+        df_values = df[self.keys].copy()
+        for column in columns:
+            df_values[column] = pd.to_numeric(df[column], errors='coerce')
+
+        # The sub-cases with missing KEYs never match, as the row-by-row
+        # lookup does
+        grouped = df_values.groupby(self.keys, sort=False)
+        df_stats = grouped[columns].agg(['mean', 'std', 'count'])
+        df_stats.columns = ['%s-%s' % x for x in df_stats.columns]
+        df_stats = df_stats.join(grouped.size().rename('size'))
+        for column in columns:
+            df_stats[column + '-size'] = df_stats['size']
+        df_stats = df_stats.drop(columns=['size']).reset_index()
+
+        return self.df_report[self.keys].merge(
+            df_stats, how='left', on=self.keys).set_index(self.df_report.index)
+
+    def _complete_report_dataframe_by_groupby(self):
+        """Complete the report DataFrame with the statistics by groupby.
+
+        The mean, std dev and count of all the KPIs are calculated for all
+        the sub-cases at once, and the unpaired t-tests are done from these
+        summary statistics in a vectorized form. The results are the same as
+        _complete_report_dataframe(), which looks up the samples and does
+        the t-test row by row.
+
+        """
+        df_base = self._get_group_statistics(self.df_base)
+        df_test = self._get_group_statistics(self.df_test)
+
+        for (label, column, higher_is_better) in self.kpis:
+            base_avg = df_base[column + '-mean'].values
+            test_avg = df_test[column + '-mean'].values
+            base_std = df_base[column + '-std'].values
+            test_std = df_test[column + '-std'].values
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Calculate the average and %SD of the samples
+                self.df_report[label + '-BASE-AVG'] = base_avg
+                self.df_report[label + '-BASE-%SD'] = base_std / base_avg * 100
+                self.df_report[label + '-TEST-AVG'] = test_avg
+                self.df_report[label + '-TEST-%SD'] = test_std / test_avg * 100
+
+                # Calculate the %DIFF of the test samples againest base
+                self.df_report[label + '-%DIFF'] = (test_avg -
+                                                    base_avg) / base_avg * 100
+
+                # Calculate the Significance by Student's t-test, a sub-case
+                # with invalid samples has no Significance
+                (statistic, pvalue) = ttest_ind_from_stats(
+                    base_avg, base_std, df_base[column + '-count'].values,
+                    test_avg, test_std, df_test[column + '-count'].values)
+            invalid = (df_base[column + '-count'] < df_base[column + '-size']
+                       ) | (df_test[column + '-count'] <
+                            df_test[column + '-size'])
+            self.df_report[label + '-SIGN'] = np.where(
+                invalid.values, np.nan, 1 - np.asarray(pvalue))
+
+            # Get the Conclusion
+            self.df_report[label + '-CONCLUSION'] = [
+                self._get_conclusion(*x, higher_is_better=higher_is_better)
+                for x in zip(self.df_report[label + '-BASE-%SD'],
+                             self.df_report[label + '-TEST-%SD'],
+                             self.df_report[label + '-%DIFF'],
+                             self.df_report[label + '-SIGN'])
+            ]
+
+        return None
+
     def _format_report_dataframe(self):
         """Format the report DataFrame."""
         self.df_report = self.df_report.round(4)
@@ -290,6 +390,7 @@ class FioBenchmarkReporter():
         """Generate benchmark report.
 
         This function creates the report DataFrame, completes and formats it.
+        The statistics are calculated by the engine specified by self.engine.
 
         As data source, the following DataFrame should be ready to use:
         1. self.df_base: store the base samples;
@@ -303,7 +404,13 @@ class FioBenchmarkReporter():
         self._create_report_dataframe()
 
         # Complete report DataFrame
-        self._complete_report_dataframe()
+        begin = time.time()
+        if self.engine == 'legacy':
+            self._complete_report_dataframe()
+        else:
+            self._complete_report_dataframe_by_groupby()
+        print('[NOTE] Compared %s sub-cases in %.2fs by the %s engine.' %
+              (len(self.df_report), time.time() - begin, self.engine))
 
         # Format report DataFrame
         self._format_report_dataframe()
@@ -348,9 +455,13 @@ class FioBenchmarkReporter():
         return 0
 
 
-def generate_fio_benchmark_report(base_csv, test_csv, report_csv):
+def generate_fio_benchmark_report(base_csv,
+                                  test_csv,
+                                  report_csv,
+                                  engine='groupby'):
     """Generate FIO benchmark report."""
     fiobenchreporter = FioBenchmarkReporter()
+    fiobenchreporter.engine = engine
 
     # Load base and test samples
     return_value = fiobenchreporter.load_samples({
@@ -375,16 +486,23 @@ def generate_fio_benchmark_report(base_csv, test_csv, report_csv):
 @click.option(
     '--base_csv',
     type=click.Path(exists=True),
-    help='Specify the CSV file of the base samples.')
+    help='Specify the CSV (or parquet/feather) file of the base samples.')
 @click.option(
     '--test_csv',
     type=click.Path(exists=True),
-    help='Specify the CSV file of the test samples.')
+    help='Specify the CSV (or parquet/feather) file of the test samples.')
 @click.option(
     '--report_csv',
     type=click.Path(),
     help='Specify the CSV file to store the benchmark report.')
-def cli(base_csv, test_csv, report_csv):
+@click.option(
+    '--engine',
+    type=click.Choice(['groupby', 'legacy']),
+    default='groupby',
+    help='The engine to calculate the statistics, \'groupby\' calculates \
+all the sub-cases at once, \'legacy\' looks up the samples row by row. \
+(default \'groupby\')')
+def cli(base_csv, test_csv, report_csv, engine):
     """Command Line Interface."""
     # Parse and check the parameters
     if not base_csv or not test_csv or not report_csv:
@@ -392,7 +510,7 @@ def cli(base_csv, test_csv, report_csv):
         exit(1)
 
     # Generate FIO benchmark report
-    generate_fio_benchmark_report(base_csv, test_csv, report_csv)
+    generate_fio_benchmark_report(base_csv, test_csv, report_csv, engine)
 
 
 if __name__ == '__main__':
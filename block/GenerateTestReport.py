@@ -4,7 +4,8 @@
 # Interface between StoragePerformanceTest.py
 # StoragePerformanceTest.py should do:
 # 1. the fio outputs should be at least in json+ format
-#    the "fio --group_reporting" must be used
+#    the "fio --group_reporting" should be used, otherwise the clones are
+#    merged in the same way (and reported one by one if required)
 # 2. save the fio outputs into *.fiolog
 # 3. put all *.fiolog files into the spcified path
 # 4. pass the additional information by "fio --description"
@@ -12,6 +13,13 @@
 #    b) "format" - the disk format, such as raw or xfs
 #    c) "round" - the round number, such as 1, 2, 3...
 #    d) "backend" - the hardware which data image based on
+#    e) "target" - the disk(s) or file(s) tested by fio (optional)
+#    f) "mode" - "sweep" for the load sweep, which also passes "rate_iops",
+#       "slo_percentile" and "slo_lat" (optional)
+#    g) "placement" - the placement policy of the fio clones (optional)
+# 5. put the CPU usage beside the *.fiolog (optional), which is taken from
+#    "<casename>.sampler.npz", "<casename>-sa_cpu.log" or the "cpu_idleness"
+#    of "fio --idle-prof", and the cycles from "<casename>.perfstat"
 
 History:
 v1.0    2018-02-09  charles.shih  Finish all the functions.
@@ -33,13 +41,33 @@ v2.6.1  2019-12-30  charles.shih  Add "NaN" to the report if disk utils
                                   unavailable
 v2.6.2  2019-12-30  charles.shih  Remove temporary files after parsing fiolog
 v2.7    2020-07-13  charles.shih  Fix a bug to handle fio-3.19 json outputs
+v2.8    2026-10-17  agent         Report per-device, steady state, load sweep,
+                                  placement, latency percentile, fio log and
+                                  CPU KPIs; read the tarballs in memory, cache
+                                  the KPIs and support columnar reports.
 """
 
+import io
 import json
 import re
 import os
+import mmap
+import collections
+import time
+import multiprocessing
 import click
+import numpy as np
 import pandas as pd
+from ReportUtils import get_members_from_tarball
+from ReportUtils import dataframe_to_columnar
+
+# The version of KPI extraction, bump it when the KPIs are changed so that
+# the cached KPIs are invalidated.
+PARSER_VERSION = 4
+
+# The files of the CPU usage and the cycles beside the fiolog, which are
+# named as "<casename><suffix>".
+CPU_SUFFIXES = ['.sampler.npz', '-sa_cpu.log', '.perfstat']
 
 
 class FioTestReporter():
@@ -50,24 +78,91 @@ class FioTestReporter():
     2. It analyse the raw data and extract performance KPIs from raw data;
     3. It generates the report DataFrame and dump to a CSV file;
 
+    The raw data are streamed into the KPIs, each of them is dropped right
+    after its KPIs are extracted, so that the memory does not grow with the
+    number of files in the result path.
+
     Attributes:
-        raw_data_list: the list to store raw data.
+        raw_data_iter: the generator of raw data.
         perf_kpi_list: the list to store performance KPI tuples.
         df_report: a DataFrame to store the test report.
+        df_sweep: a DataFrame to store the latency-vs-load curves.
+        df_job: a DataFrame to store the results of each fio clone.
 
     """
 
-    # The list of raw data, the item is loaded from fio log file.
-    # Each item is a full data source (raw data) in Python dict format.
-    raw_data_list = []
-
-    # The list of performance KPIs, which are extracted from the raw data.
-    # Each item represents a single fio test results in Python dict format.
-    perf_kpi_list = []
-
-    # The DataFrame to store performance KPIs for reporting, which is powered
-    # by Pandas.
-    df_report = None
+    # The name of the KPI cache in the result path.
+    cache_name = '.fio_report_cache.json'
+
+    # The latency percentiles to be reported for each direction, such as
+    # '99.9' or 'max'. They are taken from fio or calculated from the
+    # histograms of json+ format.
+    percentile_list = []
+
+    # Keep the latency histograms of each direction in the KPIs.
+    keep_hist = False
+
+    # Keep the KPIs of each fio clone, which are available if the fio jobs
+    # were run without "--group_reporting".
+    per_job = False
+
+    # The warm-up period (seconds) trimmed from the bw/iops/lat logs for the
+    # time-series KPIs, None to skip the time-series analysis.
+    timeseries_trim = None
+
+    # The key columns stored as categorical in the columnar report.
+    category_columns = [
+        'Backend', 'Driver', 'Format', 'RW', 'BS', 'Target', 'Placement'
+    ]
+
+    # The ratio of the offered IOPS to be achieved by the load sweep, or the
+    # offered load is considered unsustainable.
+    sweep_tolerance = 0.95
+
+    # The patterns to locate the json block in fio log, and the latency
+    # histograms in json+ format, which have no nested objects.
+    json_begin = re.compile(br'^{', re.M)
+    json_end = re.compile(br'^}', re.M)
+    json_bins = re.compile(br'"bins" : {[^}]*}')
+
+    def __init__(self):
+        """Init test reporter."""
+        # The raw data to be consumed by calculate_performance_kpis(). It
+        # yields a (filename, raw_data) tuple for each file parsed, the raw
+        # data is a full data source in Python dict format.
+        self.raw_data_iter = iter([])
+
+        # All the fio log files and tarballs found in the result path.
+        self.source_list = []
+
+        # The KPI cache, in {filename: entry} format. Each entry has the
+        # fingerprint (size, mtime, parser version and options) of the file
+        # and its KPIs. It is saved as a sidecar file in the result path.
+        self.cache = {}
+        self.cache_path = None
+
+        # The list of performance KPIs, which are extracted from the raw
+        # data. Each item represents a single fio test results in Python
+        # dict format.
+        self.perf_kpi_list = []
+
+        # The DataFrame to store performance KPIs for reporting, which is
+        # powered by Pandas.
+        self.df_report = None
+
+        # The DataFrame to store the latency histograms in long format, and
+        # the DataFrame to store the percentiles calculated from the
+        # histograms merged across the rounds.
+        self.df_hist = None
+        self.df_merged = None
+
+        # The DataFrame to store the results of each fio clone, and the
+        # imbalance among the clones.
+        self.df_job = None
+
+        # The DataFrame to store the latency-vs-load curves of the load
+        # sweep.
+        self.df_sweep = None
 
     def _byteify(self, inputs):
         """Convert unicode to utf-8 string.
@@ -93,15 +188,57 @@ class FioTestReporter():
         else:
             return inputs
 
-    def _get_raw_data_from_fio_log(self, data_file):
+    def _get_raw_data_from_buffer(self, buffer, skip_bins=True):
+        """Get the raw data from a buffer of fio log.
+
+        This function locates the first json block (from a line starting with
+        '{' to a line starting with '}') in the buffer and decodes it in place
+        without copying the buffer line by line.
+
+        Args:
+            buffer: bytes or mmap, the content of the fio log.
+            skip_bins: bool, blank out the latency histograms ("bins") of the
+                json+ format before decoding, which are not used by the
+                summary KPIs but take the most time to decode.
+
+        Returns:
+            The raw data in Python dict format, or None if there is no json
+            block in the buffer.
+
+        """
+        match = self.json_begin.search(buffer)
+        if not match:
+            return None
+        begin = match.start()
+
+        match = self.json_end.search(buffer, begin)
+        if not match:
+            return None
+        end = match.start()
+
+        block = buffer[begin:end + 1]
+        if skip_bins:
+            block = self.json_bins.sub(b'"bins" : {}', block)
+        json_data = json.loads(block.decode('utf-8'))
+
+        if '' == b'':
+            # Convert to byteify for Python 2
+            return self._byteify(json_data)
+        else:
+            # Keep strings for Python 3
+            return json_data
+
+    def _get_raw_data_from_fio_log(self, data_file, skip_bins=True):
         """Get the raw data from a specified fio log file.
 
-        This function open a specified fio log file and read the first json
-        block which is expected to be generated by the fio --output=json/json+.
-        Then it converts this block into Python dict format and returns it.
+        This function maps a specified fio log file into memory and decodes
+        the first json block which is expected to be generated by the fio
+        --output=json/json+. No temporary file is written, so the fio log
+        files can be read from a read-only path.
 
         Args:
             data_file: string, the path to the fio log file.
+            skip_bins: bool, skip the latency histograms ("bins").
 
         Returns:
             This function returns a tuple like (result, raw_data):
@@ -113,7 +250,6 @@ class FioTestReporter():
 
         Raises:
             1. Error while handling fio log file
-            2. Error while handling the new json file
 
         """
         # Parse required params
@@ -121,68 +257,530 @@ class FioTestReporter():
             print('[ERROR] Missing required params: data_file')
             return (1, None)
 
-        # Get the offsets of the first json block
+        # Decode the first json block
         try:
-            with open(data_file, 'r') as f:
-                file_content = f.readlines()
-
-            # Locate the first json block
-            begin = end = num = 0
-            while num < len(file_content):
-                if re.search(r'^{', file_content[num]):
-                    begin = num
-                    break
-                num += 1
-            while num < len(file_content):
-                if re.search(r'^}', file_content[num]):
-                    end = num
-                    break
-                num += 1
+            with open(data_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # An empty file cannot be mapped
+                    raw_data = None
+                else:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        raw_data = self._get_raw_data_from_buffer(
+                            buffer, skip_bins)
+                    finally:
+                        buffer.close()
         except Exception as err:
             print('[ERROR] Error while handling fio log file: %s' % err)
             return (1, None)
 
-        # Extract the json block into a new file and get the raw_data
-        if begin >= end:
+        if raw_data is None:
             print('[ERROR] Cannot found validate json block in file: %s' %
                   data_file)
             return (1, None)
 
-        try:
-            with open(data_file + '.json', 'w') as json_file:
-                json_file.writelines(file_content[begin:end + 1])
-            with open(data_file + '.json', 'r') as json_file:
-                json_data = json.load(json_file)
-                if '' == b'':
-                    # Convert to byteify for Python 2
-                    raw_data = self._byteify(json_data)
-                else:
-                    # Keep strings for Python 3
-                    raw_data = json_data
+        return (0, raw_data)
 
+    def _get_timeseries_kpis(self, filename, trim):
+        """Get the time-series KPIs from the bw/iops/lat logs of a file.
+
+        Args:
+            filename: string, the path to the *.fiolog or *.tar.gz file.
+            trim: float, the warm-up period (seconds) to be trimmed.
+
+        Returns:
+            The KPIs in Python dict format, empty if failed.
+
+        """
+        from AnalyzeFioLogs import get_timeseries_kpis
+
+        try:
+            return get_timeseries_kpis(filename, trim)
         except Exception as err:
-            print('[ERROR] Error while handling the new json file: %s' % err)
-            return (1, None)
+            print('[WARNING] Error while analyzing the logs of "%s": %s' %
+                  (filename, err))
+            return {}
 
-        os.unlink(data_file + '.json')
-        return (0, raw_data)
+    def _get_cpu_usage_from_sampler(self, content, ramp_time=0):
+        """Get the CPU usage from the samples of the native sampler.
+
+        The cumulative CPU times of /proc/stat are interpolated at the time
+        fio started (plus the ramp time) and stopped, so that the usage
+        covers exactly the measurement of the job.
+
+        Args:
+            content: bytes, the content of "<casename>.sampler.npz".
+            ramp_time: float, the seconds of "fio --ramp_time".
+
+        Returns:
+            A dict like {'usr': 1.2, 'sys': 3.4, 'iowait': 0.5, 'steal':
+            0.0, 'idle': 94.9, 'cpus': 8} (the percentages of all the CPUs),
+            or None if the CPU times are unavailable.
+
+        """
+        from RunFioTest import load_sampler_data
+
+        data = load_sampler_data(io.BytesIO(content))
+        stat = data.get('stat', {})
+        if len(data['time']) < 2 or 'cpu.idle' not in stat:
+            return None
+
+        begin = data['events'].get('fio_start', data['time'][0])
+        end = data['events'].get('fio_stop', data['time'][-1])
+        if begin + ramp_time < end:
+            begin += ramp_time
+        times = {}
+        for field in ('user', 'nice', 'system', 'idle', 'iowait', 'irq',
+                      'softirq', 'steal'):
+            values = np.interp([begin, end], data['time'],
+                               stat.get('cpu.' + field, [0] * 2))
+            times[field] = max(0.0, values[1] - values[0])
+
+        total = sum(times.values())
+        if total <= 0:
+            return None
+
+        return {
+            'usr': (times['user'] + times['nice']) * 100.0 / total,
+            'sys': (times['system'] + times['irq'] + times['softirq']) *
+            100.0 / total,
+            'iowait': times['iowait'] * 100.0 / total,
+            'steal': times['steal'] * 100.0 / total,
+            'idle': times['idle'] * 100.0 / total,
+            'cpus': len([x for x in stat if re.match(r'^cpu\d+\.idle$', x)])
+        }
+
+    def _get_sar_seconds(self, items):
+        """Get the seconds of the day from the items of a sar line.
+
+        Args:
+            items: list, the items of the line, which starts with the time
+                like "12:34:56" or "12:34:56 PM".
+
+        Returns:
+            A tuple like (seconds, items), the seconds is None if the line
+            doesn't start with the time, and the items are the ones after
+            the time.
+
+        """
+        match = re.match(r'^(\d+):(\d+):(\d+)$', items[0] if items else '')
+        if not match:
+            return (None, items)
+
+        seconds = (int(match.group(1)) * 3600 + int(match.group(2)) * 60 +
+                   int(match.group(3)))
+        if items[1:2] in (['AM'], ['PM']):
+            seconds = seconds % 43200 + (43200 if items[1] == 'PM' else 0)
+            return (seconds, items[2:])
+
+        return (seconds, items[1:])
+
+    def _get_cpu_usage_from_sar(self, content, ramp_time=0):
+        """Get the CPU usage from the outputs of "sar -u".
+
+        The sar starts with fio, so the intervals ended in the ramp time
+        (since the time in the header) are dropped, and the usage is the
+        average of the rest intervals. The "Average" line is used if there
+        is no ramp time or no interval left.
+
+        Args:
+            content: bytes, the content of "<casename>-sa_cpu.log".
+            ramp_time: float, the seconds of "fio --ramp_time".
+
+        Returns:
+            A dict like _get_cpu_usage_from_sampler(), or None if the
+            average is not found.
+
+        """
+        (cpus, columns, start, rows, values) = (None, None, None, [], None)
+        for line in content.decode('utf-8', 'ignore').splitlines():
+            match = re.search(r'\((\d+) CPU\)', line)
+            if match:
+                cpus = int(match.group(1))
+
+            # The columns of "sar -u" or "sar -u ALL"
+            (seconds, items) = self._get_sar_seconds(line.split())
+            if '%idle' in items and 'CPU' in items:
+                columns = items[items.index('CPU') + 1:]
+                if start is None:
+                    start = seconds
+            elif columns and items[:1] == ['Average:'] and 'all' in items:
+                values = dict(
+                    zip(columns,
+                        [float(x) for x in items[items.index('all') + 1:]]))
+            elif (columns and items[:1] == ['all'] and seconds is not None
+                  and start is not None
+                  and (seconds - start) % 86400 > ramp_time):
+                rows.append([float(x) for x in items[1:]])
+
+        if ramp_time > 0 and rows:
+            values = dict(
+                zip(columns, [float(x) for x in np.mean(rows, axis=0)]))
+        if values is None:
+            return None
+
+        return {
+            'usr':
+            values.get('%user', values.get('%usr', 0.0)) +
+            values.get('%nice', 0.0),
+            'sys':
+            values.get('%system', values.get('%sys', 0.0)) +
+            values.get('%irq', 0.0) + values.get('%soft', 0.0),
+            'iowait':
+            values.get('%iowait', 0.0),
+            'steal':
+            values.get('%steal', 0.0),
+            'idle':
+            values['%idle'],
+            'cpus':
+            cpus
+        }
+
+    def _get_cpu_usage_from_idleprof(self, raw_data):
+        """Get the CPU usage from "fio --idle-prof".
+
+        Only the idleness is measured by fio, so the busy CPU is all but
+        the idle, and the number of CPUs is known by "--idle-prof=percpu".
+        Note that the idleness covers the ramp time as well.
+
+        Args:
+            raw_data: dict, the raw data.
+
+        Returns:
+            A dict like _get_cpu_usage_from_sampler(), or None if fio was
+            not run with "--idle-prof".
+
+        """
+        idleness = raw_data.get('cpu_idleness')
+        if not idleness or 'system' not in idleness:
+            return None
+
+        return {
+            'usr': 'NaN',
+            'sys': 'NaN',
+            'iowait': 'NaN',
+            'steal': 'NaN',
+            'idle': float(idleness['system']),
+            'cpus': len(idleness.get('percpu', [])) or None
+        }
+
+    def _get_ramp_time(self, raw_data):
+        """Get the seconds of "fio --ramp_time" from the raw data."""
+        units = {'us': 1e-6, 'ms': 1e-3, 's': 1, 'm': 60, 'h': 3600,
+                 'd': 86400}
+
+        value = raw_data['jobs'][0]['job options'].get(
+            'ramp_time',
+            raw_data.get('global options', {}).get('ramp_time', 0))
+        match = re.match(r'^\s*(\d+(?:\.\d+)?)\s*(us|ms|s|m|h|d)?\s*$',
+                         str(value).lower())
+        if not match:
+            return 0
+
+        return float(match.group(1)) * units[match.group(2) or 's']
+
+    def _get_cycles_from_perfstat(self, content):
+        """Get the CPU cycles counted by "perf stat -a -x,".
+
+        Args:
+            content: bytes, the content of "<casename>.perfstat".
+
+        Returns:
+            The cycles of all the CPUs, or None if they are not counted.
+
+        """
+        cycles = None
+        for line in content.decode('utf-8', 'ignore').splitlines():
+            items = line.split(',')
+            if len(items) < 3 or items[2].split(':')[0] not in ('cycles',
+                                                                 'cpu-cycles'):
+                continue
+            try:
+                cycles = (cycles or 0) + int(float(items[0]))
+            except ValueError:
+                # Such as "<not counted>" or "<not supported>"
+                continue
+
+        return cycles
+
+    def _get_cpu_usage(self, raw_data, members):
+        """Get the CPU usage and the cycles of a fio test.
+
+        The CPU usage is taken from the native sampler, the sar logs and the
+        idle profiling of fio in turn, whichever is available first.
+
+        The collectors start with fio, but fio doesn't count the I/Os in the
+        ramp time. So the ramp time is excluded from the CPU usage (except
+        the idle profiling), and the cycles are scaled down to the runtime
+        of fio, as if the cycles were evenly spent.
+
+        Args:
+            raw_data: dict, the raw data.
+            members: dict, the content of the files beside the fiolog, in
+                {suffix: content} format.
+
+        Returns:
+            A dict like _get_cpu_usage_from_sampler() with the 'source' and
+            the 'cycles' (None if they are unavailable), or an empty dict.
+
+        """
+        ramp_time = self._get_ramp_time(raw_data)
+
+        usage = None
+        for (suffix, source, parser) in (
+            ('.sampler.npz', 'sampler', self._get_cpu_usage_from_sampler),
+            ('-sa_cpu.log', 'sar', self._get_cpu_usage_from_sar)):
+            if usage is None and suffix in members:
+                try:
+                    usage = parser(members[suffix], ramp_time)
+                    if usage:
+                        usage['source'] = source
+                except Exception as err:
+                    print('[WARNING] Error while parsing the CPU usage from '
+                          '"%s": %s' % (suffix, err))
+        if usage is None:
+            usage = self._get_cpu_usage_from_idleprof(raw_data)
+            if usage:
+                usage['source'] = 'idleprof'
+
+        cycles = None
+        if '.perfstat' in members:
+            cycles = self._get_cycles_from_perfstat(members['.perfstat'])
+
+        # Scale the cycles down to the runtime (in msec)
+        runtime = max([
+            job[x]['runtime'] for job in raw_data['jobs']
+            for x in ('read', 'write', 'trim') if x in job
+        ] or [0])
+        if cycles and ramp_time > 0 and runtime > 0:
+            cycles = int(cycles * runtime / (runtime + ramp_time * 1000.0))
+
+        if usage is None and cycles is None:
+            return {}
+
+        usage = usage or {}
+        usage['cycles'] = cycles
+        return usage
+
+    def _get_raw_data_from_file(self,
+                                filename,
+                                skip_bins=True,
+                                timeseries_trim=None):
+        """Get the raw data from a fio log file or a tarball.
+
+        The fiolog in the tarball is decoded in memory, nothing is extracted
+        to the disk, so that the workers (and the reports) can run at the
+        same time.
+
+        Args:
+            filename: string, the path to the *.fiolog or *.tar.gz file.
+            skip_bins: bool, skip the latency histograms ("bins").
+            timeseries_trim: float, analyze the bw/iops/lat logs with the
+                warm-up period (seconds) trimmed, and put the KPIs into the
+                raw data as "timeseries". None to skip.
+
+        The CPU usage and the cycles are read from the files beside the
+        fiolog (or in the same tarball), and put into the raw data as
+        "cpu_usage".
+
+        Returns:
+            The raw data in Python dict format, or None if the file is not a
+            fio log or it failed to be parsed.
+
+        """
+        raw_data = None
+        members = {}
+        if filename.endswith('.tar.gz') and os.path.isfile(filename):
+            try:
+                members = get_members_from_tarball(
+                    filename, ['.fiolog'] + CPU_SUFFIXES,
+                    os.path.basename(filename)[:-len('.tar.gz')] + '_')
+                if '.fiolog' not in members:
+                    return None
+                raw_data = self._get_raw_data_from_buffer(
+                    members['.fiolog'], skip_bins)
+            except Exception as err:
+                print('[ERROR] Error while handling tarball "%s": %s' %
+                      (filename, err))
+                return None
+
+            if raw_data is None:
+                print('[ERROR] Cannot found validate json block in file: %s' %
+                      filename)
+        elif filename.endswith('.fiolog') and os.path.isfile(filename):
+            (result, raw_data) = self._get_raw_data_from_fio_log(
+                filename, skip_bins)
+            for suffix in CPU_SUFFIXES:
+                sidecar = filename[:-len('.fiolog')] + suffix
+                if os.path.isfile(sidecar):
+                    with open(sidecar, 'rb') as f:
+                        members[suffix] = f.read()
+
+        # Get the CPU usage of the fio test
+        if raw_data is not None:
+            raw_data['cpu_usage'] = self._get_cpu_usage(raw_data, members)
+
+        # Analyze the bw/iops/lat logs of the fio test if required
+        if raw_data is not None and timeseries_trim is not None:
+            raw_data['timeseries'] = self._get_timeseries_kpis(
+                filename, timeseries_trim)
+
+        return raw_data
+
+    def _get_options_signature(self):
+        """Get the signature of the options which affect the KPIs."""
+        return json.dumps(
+            {
+                'sweep_tolerance': self.sweep_tolerance,
+                'percentile_list': self.percentile_list,
+                'keep_hist': self.keep_hist,
+                'per_job': self.per_job,
+                'timeseries_trim': self.timeseries_trim
+            },
+            sort_keys=True)
+
+    def _load_cache(self, result_path):
+        """Load the KPI cache from the result path.
+
+        Returns:
+            The cache entries in {filename: entry} format, an empty dict if
+            the cache is unavailable.
+
+        """
+        try:
+            with open(result_path + os.sep + self.cache_name, 'r') as f:
+                return json.load(f)['entries']
+        except Exception:
+            return {}
+
+    def _save_cache(self):
+        """Save the KPI cache into the result path.
+
+        The cache is written to a temporary file and then renamed, so that
+        it is always complete. A read-only result path only disables the
+        cache.
+
+        """
+        cache_file = self.cache_path + os.sep + self.cache_name
+        try:
+            with open(cache_file + '.tmp', 'w') as f:
+                json.dump(
+                    {
+                        'parser_version': PARSER_VERSION,
+                        'entries': self.cache
+                    }, f)
+            os.rename(cache_file + '.tmp', cache_file)
+        except (IOError, OSError) as err:
+            print('[WARNING] Cannot save the KPI cache: %s' % err)
+
+        return None
+
+    def _get_raw_data_from_files(self, tasks, jobs=1):
+        """Get the raw data from the files one by one.
+
+        The files are parsed by a pool of processes if there are multiple
+        jobs. At most two files per process are in flight, so that the raw
+        data do not pile up if they are consumed slower than parsed.
+
+        Args:
+            tasks: list, the tasks of _get_raw_data_from_file().
+            jobs: int, the number of processes to parse the files.
+
+        Yields:
+            The raw data of each file in order, None if it is failed.
+
+        """
+        if jobs > 1 and len(tasks) > 1:
+            pool = multiprocessing.Pool(min(jobs, len(tasks)))
+            try:
+                pending = collections.deque()
+                for task in tasks:
+                    pending.append(
+                        pool.apply_async(_get_raw_data_from_file, (task, )))
+                    if len(pending) >= jobs * 2:
+                        yield pending.popleft().get()
+                while pending:
+                    yield pending.popleft().get()
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for task in tasks:
+                yield _get_raw_data_from_file(task)
+
+    def _iter_raw_data(self, result_path, sources, fingerprints,
+                       skip_bins=True, jobs=1):
+        """Load the raw data from the files lazily.
+
+        The failed files are cached, so that they are not parsed again. The
+        parse throughput is reported when all the files are loaded.
+
+        Args:
+            result_path: string, the path where the files located.
+            sources: list, the names of the files to be parsed.
+            fingerprints: dict, the fingerprints of the files.
+            skip_bins: bool, skip the latency histograms.
+            jobs: int, the number of processes to parse the files.
+
+        Yields:
+            A (filename, raw_data) tuple for each file parsed.
+
+        """
+        begin = time.time()
+        count = 0
+        tasks = [(result_path + os.sep + x, skip_bins, self.timeseries_trim)
+                 for x in sources]
+        for (index, raw_data) in enumerate(
+                self._get_raw_data_from_files(tasks, jobs)):
+            fname = sources[index]
+            if raw_data is None:
+                # Cache the failure, so that it is not parsed again
+                self.cache[fname] = dict(fingerprints[fname], kpi=None)
+            else:
+                # Drop the stale entry until the KPIs are calculated
+                self.cache.pop(fname, None)
+                count += 1
+                yield (fname, raw_data)
+
+        # Report the parse throughput
+        seconds = time.time() - begin
+        print('[NOTE] Parsed %s fio logs in %.2fs (%.1f files/s) by %s '
+              'process(es), %s unchanged files taken from the cache.' %
+              (count, seconds, count / seconds if seconds > 0 else 0, jobs,
+               len(self.source_list) - len(sources)))
 
     def load_raw_data_from_fio_logs(self, params={}):
         """Load raw data from fio log files.
 
-        This function loads raw data from a sort of fio log files and stores
-        the raw data (in Python dict format) into self.raw_data_list.
+        This function finds a sort of fio log files and sets up the
+        generator of their raw data (in Python dict format) as
+        self.raw_data_iter. The files are parsed when the generator is
+        consumed by calculate_performance_kpis(), in the order of their
+        names, by a pool of processes if required, so that the results are
+        always the same.
+
+        If the cache is used, the files whose path, size, mtime, parser
+        version and options are the same as the cached ones are not loaded,
+        their KPIs are taken from the cache by calculate_performance_kpis().
 
         Args:
             params: dict
                 result_path: string, the path where the fio log files located.
+                skip_bins: bool, skip the latency histograms (default True).
+                jobs: int, the number of processes to load the files, '0'
+                    for the number of CPUs (default 1).
+                use_cache: bool, use the KPI cache (default True).
+                rebuild_cache: bool, drop the KPI cache and rebuild it
+                    (default False).
 
         Returns:
             0: Passed
             1: Failed
 
         Updates:
-            self.raw_data_list: store all the raw data;
+            self.raw_data_iter: the generator of raw data;
+            self.source_list: all the files in the result path;
+            self.cache: the KPI cache;
 
         """
         # Parse required params
@@ -190,26 +788,290 @@ class FioTestReporter():
             print('[ERROR] Missing required params: params[result_path]')
             return 1
 
-        # Load raw data from files
-        for fname in os.listdir(params['result_path']):
+        skip_bins = params.get('skip_bins', True)
+        jobs = params.get('jobs', 1) or multiprocessing.cpu_count()
+
+        # Get the fingerprints of the files
+        fingerprints = {}
+        for fname in sorted(os.listdir(params['result_path'])):
             filename = params['result_path'] + os.sep + fname
+            if fname.endswith(('.fiolog', '.tar.gz')) and os.path.isfile(
+                    filename):
+                stat = os.stat(filename)
+                fingerprints[fname] = {
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'parser': PARSER_VERSION,
+                    'options': self._get_options_signature()
+                }
+        self.source_list.extend(sorted(fingerprints))
+
+        # Take the unchanged files from the cache
+        self.cache_path = params['result_path']
+        if params.get('use_cache', True):
+            if not params.get('rebuild_cache', False):
+                cache = self._load_cache(params['result_path'])
+                for fname in self.source_list:
+                    entry = dict(cache.get(fname, {}))
+                    kpi = entry.pop('kpi', None)
+                    if entry == fingerprints[fname]:
+                        self.cache[fname] = dict(entry, kpi=kpi)
+        else:
+            self.cache_path = None
 
-            tmpfolder = '/tmp/fio-report.tmp'
-            if filename.endswith('.tar.gz') and os.path.isfile(filename):
-                os.system('mkdir -p {0}'.format(tmpfolder))
-                os.system('tar xf {1} -C {0}'.format(tmpfolder, filename))
-                filename = tmpfolder + os.sep + fname.replace(
-                    '.tar.gz', '.fiolog')
+        # Load raw data from the other files lazily
+        sources = [x for x in self.source_list if x not in self.cache]
+        self.raw_data_iter = self._iter_raw_data(params['result_path'],
+                                                 sources, fingerprints,
+                                                 skip_bins, jobs)
 
-            if filename.endswith('.fiolog') and os.path.isfile(filename):
-                (result, raw_data) = self._get_raw_data_from_fio_log(filename)
-                if result == 0:
-                    self.raw_data_list.append(raw_data)
+        return 0
 
-            # Remove temporary files
-            os.system('[ -e {0} ] && rm -rf {0}'.format(tmpfolder))
+    def _get_percentiles_from_bins(self, values, counts, percentiles):
+        """Calculate the percentiles from a latency histogram.
 
-        return 0
+        This function calculates the percentiles in the same way as fio,
+        which is the lowest bin whose cumulative count reaches the
+        percentage.
+
+        Args:
+            values: array, the values of the bins.
+            counts: array, the counts of the bins.
+            percentiles: list, the percentiles such as [99.0, 99.9].
+
+        Returns:
+            A list of the values, or None for each if the histogram is empty.
+
+        """
+        values = np.asarray(values, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        if counts.sum() == 0:
+            return [None] * len(percentiles)
+
+        order = np.argsort(values, kind='mergesort')
+        values = values[order]
+        cumsum = np.cumsum(counts[order])
+        thresholds = np.asarray(percentiles, dtype=np.float64) * cumsum[-1]
+        index = np.searchsorted(cumsum, thresholds / 100.0)
+        return [int(x) for x in values[np.minimum(index, len(values) - 1)]]
+
+    def _get_clat_percentile(self, stats, percentile):
+        """Get a percentile of the completion latency in ms.
+
+        Args:
+            stats: dict, the statistics of a direction, such as "read".
+            percentile: string, the percentile such as '99.9' or 'max'.
+
+        Returns:
+            The value in ms, or 'NaN' if it is not available.
+
+        """
+        clat = stats['clat_ns']
+        if stats['total_ios'] == 0:
+            return 'NaN'
+        if percentile == 'max':
+            return clat['max'] / 1000000.0
+
+        key = '%f' % float(percentile)
+        if key in clat.get('percentile', {}):
+            return clat['percentile'][key] / 1000000.0
+
+        # Not reported by fio, calculate it from the histogram
+        bins = clat.get('bins', {})
+        (value, ) = self._get_percentiles_from_bins(
+            [int(x) for x in bins.keys()], list(bins.values()),
+            [float(percentile)])
+        return 'NaN' if value is None else value / 1000000.0
+
+    def _get_percentile_columns(self):
+        """Get the report columns of the percentiles for each direction."""
+        columns = []
+        for direction in ('R', 'W'):
+            for percentile in self.percentile_list:
+                columns.append('%s-CLAT%s(ms)' %
+                               (direction, percentile.upper()))
+        return columns
+
+    def _merge_clat_stats(self, clats):
+        """Merge the completion latency statistics of the fio clones.
+
+        The histograms are summed up bin by bin and the percentiles are
+        calculated from the merged histogram. If the histograms were skipped,
+        the percentiles take the worst value across the clones.
+
+        Args:
+            clats: list, the "clat_ns" statistics of the clones.
+
+        Returns:
+            The merged statistics in Python dict format.
+
+        """
+        merged = {'max': max([x.get('max', 0) for x in clats])}
+
+        bins = {}
+        for clat in clats:
+            for (key, count) in clat.get('bins', {}).items():
+                bins[key] = bins.get(key, 0) + count
+
+        keys = sorted(
+            set([x for clat in clats for x in clat.get('percentile', {})]))
+        if bins:
+            merged['bins'] = bins
+            merged['percentile'] = dict(
+                zip(
+                    keys,
+                    self._get_percentiles_from_bins(
+                        [int(x) for x in bins.keys()], list(bins.values()),
+                        [float(x) for x in keys])))
+        elif keys:
+            merged['percentile'] = dict([
+                (key,
+                 max([x['percentile'][key] for x in clats
+                      if key in x.get('percentile', {})])) for key in keys
+            ])
+
+        return merged
+
+    def _merge_fio_jobs(self, jobs):
+        """Merge the fio clones reported one by one into a single job.
+
+        Without "--group_reporting" fio reports each clone separately. They
+        are merged in the same way as the group reporting: the BW, IOPS and
+        I/Os are summed, the LAT is weighted by the I/Os, the runtime takes
+        the longest one and the CLAT is merged by self._merge_clat_stats().
+
+        Args:
+            jobs: list, the "jobs" in the fio outputs.
+
+        Returns:
+            The merged job in Python dict format.
+
+        """
+        if len(jobs) == 1:
+            return jobs[0]
+
+        merged = dict(jobs[0])
+        for direction in ('read', 'write'):
+            stats = [x[direction] for x in jobs]
+            total_ios = sum([x['total_ios'] for x in stats])
+            lat_sum = sum(
+                [x['lat_ns']['mean'] * x['total_ios'] for x in stats])
+            merged[direction] = {
+                'bw': sum([x['bw'] for x in stats]),
+                'iops': sum([x['iops'] for x in stats]),
+                'io_bytes': sum([x.get('io_bytes', 0) for x in stats]),
+                'total_ios': total_ios,
+                'runtime': max([x['runtime'] for x in stats]),
+                'lat_ns': {
+                    'mean': lat_sum / total_ios if total_ios else 0.0
+                },
+                'clat_ns':
+                self._merge_clat_stats([x['clat_ns'] for x in stats])
+            }
+
+        return merged
+
+    def _get_io_kpis_from_job(self, job):
+        """Get the BW, IOPS, LAT and CLAT90 of a fio job.
+
+        Args:
+            job: dict, a job (or a merged one) in the fio outputs.
+
+        Returns:
+            The KPIs in Python dict format.
+
+        """
+        io_kpi = {}
+
+        # The unit of "bw" was "KiB/s", convert to "MiB/s"
+        io_kpi['r-bw'] = job['read']['bw'] / 1024.0
+        io_kpi['w-bw'] = job['write']['bw'] / 1024.0
+        io_kpi['bw'] = io_kpi['r-bw'] + io_kpi['w-bw']
+
+        # The IOPS was a decimal, make it an integer
+        io_kpi['r-iops'] = int(job['read']['iops'])
+        io_kpi['w-iops'] = int(job['write']['iops'])
+        io_kpi['iops'] = io_kpi['r-iops'] + io_kpi['w-iops']
+
+        # The unit of "lat" was "ns", convert to "ms"
+        io_kpi['r-lat'] = job['read']['lat_ns']['mean'] / 1000000.0
+        io_kpi['w-lat'] = job['write']['lat_ns']['mean'] / 1000000.0
+        io_kpi['lat'] = io_kpi['r-lat'] + io_kpi['w-lat']
+
+        # The unit of "clat" was "ns", convert to "ms"
+        if 'percentile' in job['read']['clat_ns'].keys():
+            io_kpi['r-clat90'] = job['read']['clat_ns']['percentile'][
+                '90.000000'] / 1000000.0
+        else:
+            io_kpi['r-clat90'] = 0.0
+        if 'percentile' in job['write']['clat_ns'].keys():
+            io_kpi['w-clat90'] = job['write']['clat_ns']['percentile'][
+                '90.000000'] / 1000000.0
+        else:
+            io_kpi['w-clat90'] = 0.0
+        io_kpi['clat90'] = io_kpi['r-clat90'] + io_kpi['w-clat90']
+
+        return io_kpi
+
+    def _get_cpu_kpis(self, usage, job, io_kpi):
+        """Get the CPU usage and the CPU efficiency of a fio test.
+
+        The efficiency is measured against the busy CPUs, which are all the
+        CPUs but the idle, the iowait and the stolen time, in the unit of a
+        fully busy CPU. So that "IOPS/CPU" is the IOPS could be done by a
+        CPU, and "Cycles/IO" is the cycles of all the CPUs per I/O. Both the
+        CPU usage and the cycles exclude the ramp time of fio, see
+        _get_cpu_usage().
+
+        Args:
+            usage: dict, the CPU usage in the raw data.
+            job: dict, a job (or a merged one) in the fio outputs.
+            io_kpi: dict, the KPIs returned by _get_io_kpis_from_job().
+
+        Returns:
+            The KPIs in Python dict format, "NaN" for the unavailable ones.
+
+        """
+        cpu_kpi = {}
+        for field in ('usr', 'sys', 'iowait', 'steal'):
+            cpu_kpi[field] = usage.get(field, 'NaN')
+
+        # Get the efficiency per busy CPU
+        cpu_kpi['iops_cpu'] = cpu_kpi['bw_cpu'] = 'NaN'
+        if usage.get('idle') is not None and usage.get('cpus'):
+            busy = 100.0 - usage['idle'] - sum([
+                usage[x] for x in ('iowait', 'steal')
+                if isinstance(usage[x], float)
+            ])
+            if busy > 0:
+                cpus = busy / 100.0 * usage['cpus']
+                cpu_kpi['iops_cpu'] = io_kpi['iops'] / cpus
+                cpu_kpi['bw_cpu'] = io_kpi['bw'] / cpus
+
+        # Get the cycles per I/O
+        total_ios = sum([
+            job[x]['total_ios'] for x in ('read', 'write', 'trim') if x in job
+        ])
+        if usage.get('cycles') and total_ios > 0:
+            cpu_kpi['cycles_io'] = float(usage['cycles']) / total_ios
+        else:
+            cpu_kpi['cycles_io'] = 'NaN'
+
+        # Round the values here, since the columns with "NaN" are not
+        # numeric to be rounded in the report DataFrame
+        for (key, value) in cpu_kpi.items():
+            if isinstance(value, float):
+                cpu_kpi[key] = round(value, 4)
+
+        return cpu_kpi
+
+    def _get_timeseries_columns(self):
+        """Get the report columns of the time-series KPIs."""
+        if self.timeseries_trim is None:
+            return []
+
+        from AnalyzeFioLogs import TIMESERIES_KPIS, get_timeseries_column
+        return [get_timeseries_column(x, y) for (x, y) in TIMESERIES_KPIS]
 
     def _get_kpis_from_raw_data(self, raw_data):
         """Get KPIs from a specified raw data.
@@ -242,40 +1104,54 @@ class FioTestReporter():
         perf_kpi = {}
 
         try:
-            perf_kpi['rw'] = raw_data['jobs'][0]['job options']['rw']
-            perf_kpi['bs'] = raw_data['jobs'][0]['job options']['bs']
-            perf_kpi['iodepth'] = raw_data['jobs'][0]['job options']['iodepth']
-            perf_kpi['numjobs'] = raw_data['jobs'][0]['job options']['numjobs']
-
-            # The unit of "bw" was "KiB/s", convert to "MiB/s"
-            perf_kpi['r-bw'] = raw_data['jobs'][0]['read']['bw'] / 1024.0
-            perf_kpi['w-bw'] = raw_data['jobs'][0]['write']['bw'] / 1024.0
-            perf_kpi['bw'] = perf_kpi['r-bw'] + perf_kpi['w-bw']
-
-            # The IOPS was a decimal, make it an integer
-            perf_kpi['r-iops'] = int(raw_data['jobs'][0]['read']['iops'])
-            perf_kpi['w-iops'] = int(raw_data['jobs'][0]['write']['iops'])
-            perf_kpi['iops'] = perf_kpi['r-iops'] + perf_kpi['w-iops']
-
-            # The unit of "lat" was "ns", convert to "ms"
-            perf_kpi['r-lat'] = raw_data['jobs'][0]['read']['lat_ns'][
-                'mean'] / 1000000.0
-            perf_kpi['w-lat'] = raw_data['jobs'][0]['write']['lat_ns'][
-                'mean'] / 1000000.0
-            perf_kpi['lat'] = perf_kpi['r-lat'] + perf_kpi['w-lat']
-
-            # The unit of "clat" was "ns", convert to "ms"
-            if 'percentile' in raw_data['jobs'][0]['read']['clat_ns'].keys():
-                perf_kpi['r-clat90'] = raw_data['jobs'][0]['read']['clat_ns'][
-                    'percentile']['90.000000'] / 1000000.0
-            else:
-                perf_kpi['r-clat90'] = 0.0
-            if 'percentile' in raw_data['jobs'][0]['write']['clat_ns'].keys():
-                perf_kpi['w-clat90'] = raw_data['jobs'][0]['write']['clat_ns'][
-                    'percentile']['90.000000'] / 1000000.0
+            # The clones reported one by one are merged as a whole
+            job = self._merge_fio_jobs(raw_data['jobs'])
+
+            perf_kpi['rw'] = job['job options']['rw']
+            perf_kpi['bs'] = job['job options']['bs']
+            perf_kpi['iodepth'] = job['job options']['iodepth']
+            perf_kpi['numjobs'] = job['job options']['numjobs']
+
+            # Get the BW, IOPS, LAT and CLAT90
+            perf_kpi.update(self._get_io_kpis_from_job(job))
+
+            # Get the CPU usage and the CPU efficiency
+            perf_kpi.update(
+                self._get_cpu_kpis(raw_data.get('cpu_usage', {}), job,
+                                   perf_kpi))
+
+            # Keep the KPIs of each clone
+            if self.per_job and len(raw_data['jobs']) > 1:
+                perf_kpi['jobs'] = [
+                    self._get_io_kpis_from_job(x) for x in raw_data['jobs']
+                ]
+
+            # Get the specified percentiles and the histograms (only the
+            # non-empty bins of json+ format) for each direction
+            for direction in ('read', 'write'):
+                stats = job[direction]
+                for percentile in self.percentile_list:
+                    perf_kpi['%s-CLAT%s(ms)' %
+                             (direction[0].upper(), percentile.upper())] = (
+                                 self._get_clat_percentile(stats, percentile))
+                if self.keep_hist:
+                    perf_kpi[direction[0] + '-hist'] = stats['clat_ns'].get(
+                        'bins', {}) if stats['total_ios'] > 0 else {}
+
+            # Get the time-series KPIs of the bw/iops/lat logs
+            for column in self._get_timeseries_columns():
+                perf_kpi[column] = raw_data.get('timeseries',
+                                                {}).get(column, 'NaN')
+
+            # Get the steady state flag if the job was terminated by it
+            if 'steadystate' in job:
+                perf_kpi['ss'] = job['steadystate']['attained']
             else:
-                perf_kpi['w-clat90'] = 0.0
-            perf_kpi['clat90'] = perf_kpi['r-clat90'] + perf_kpi['w-clat90']
+                perf_kpi['ss'] = 'NaN'
+
+            # The unit of "runtime" was "ms", convert to "s"
+            perf_kpi['runtime'] = max(job['read']['runtime'],
+                                      job['write']['runtime']) / 1000.0
 
             # Get util% of the disk if there is
             if 'disk_util' in raw_data:
@@ -293,7 +1169,7 @@ class FioTestReporter():
 
             # Get additional information
             try:
-                dict = eval(raw_data['jobs'][0]['job options']['description'])
+                dict = eval(job['job options']['description'])
                 perf_kpi.update(dict)
             except Exception as err:
                 print(
@@ -308,6 +1184,24 @@ class FioTestReporter():
                 perf_kpi['round'] = 'NaN'
             if 'backend' not in perf_kpi:
                 perf_kpi['backend'] = 'NaN'
+            if 'target' not in perf_kpi:
+                perf_kpi['target'] = 'NaN'
+            if 'placement' not in perf_kpi:
+                perf_kpi['placement'] = 'NaN'
+
+            # Check the SLO for the load sweep, the unit of "clat" was "ns",
+            # convert to "ms"
+            if perf_kpi.get('mode') == 'sweep':
+                key = '%f' % perf_kpi['slo_percentile']
+                clats = [
+                    job[x]['clat_ns']['percentile'][key] / 1000000.0
+                    for x in ('read', 'write') if job[x]['total_ios'] > 0
+                ]
+                perf_kpi['slo_clat'] = max(clats) if clats else 'NaN'
+                perf_kpi['slo_met'] = bool(clats) and (
+                    perf_kpi['slo_clat'] <= perf_kpi['slo_lat']) and (
+                        perf_kpi['iops'] >=
+                        perf_kpi['rate_iops'] * self.sweep_tolerance)
 
         except Exception as err:
             print('[ERROR] Error while extracting performance KPIs: %s' % err)
@@ -318,11 +1212,12 @@ class FioTestReporter():
     def calculate_performance_kpis(self, params={}):
         """Calculate performance KPIs.
 
-        This function calculates performance KPIs from self.raw_data_list and
-        stores the performance KPI tuples into self.perf_kpi_list.
+        This function calculates performance KPIs from self.raw_data_iter and
+        stores the performance KPI tuples into self.perf_kpi_list. The raw
+        data are loaded one by one, and dropped once the KPIs are extracted.
 
         As data source, the following attributes should be ready to use:
-        1. self.raw_data_list: the list of raw data (Python dict format)
+        1. self.raw_data_iter: the generator of raw data (Python dict format)
 
         Args:
             params: dict
@@ -334,16 +1229,38 @@ class FioTestReporter():
 
         Updates:
             self.perf_kpi_list: store the performance KPI tuples.
+            self.cache: the KPI cache.
 
         """
         # Calculate performance KPIs
-        for raw_data in self.raw_data_list:
+        kpis = {}
+        for (fname, raw_data) in self.raw_data_iter:
             (result, perf_kpi) = self._get_kpis_from_raw_data(raw_data)
             if result == 0:
-                self.perf_kpi_list.append(perf_kpi)
+                kpis[fname] = perf_kpi
             else:
                 return 1
 
+        # Merge the KPIs with the cached ones in the order of files
+        for fname in self.source_list:
+            if fname in kpis:
+                self.perf_kpi_list.append(kpis[fname])
+            elif fname in self.cache and self.cache[fname]['kpi']:
+                self.perf_kpi_list.append(self.cache[fname]['kpi'])
+
+        # Update the cache
+        if self.cache_path:
+            for (fname, perf_kpi) in kpis.items():
+                stat = os.stat(self.cache_path + os.sep + fname)
+                self.cache[fname] = {
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'parser': PARSER_VERSION,
+                    'options': self._get_options_signature(),
+                    'kpi': perf_kpi
+                }
+            self._save_cache()
+
         return 0
 
     def _create_report_dataframe(self):
@@ -359,13 +1276,17 @@ class FioTestReporter():
             self.df_report: the report DataFrame.
 
         """
-        # Create report DataFrame from self.perf_kpi_list
-        self.df_report = pd.DataFrame(self.perf_kpi_list,
-                                      columns=[
-                                          'backend', 'driver', 'format', 'rw',
-                                          'bs', 'iodepth', 'numjobs', 'round',
-                                          'bw', 'iops', 'lat', 'clat90', 'util'
-                                      ])
+        # Create report DataFrame from self.perf_kpi_list, the load sweep is
+        # reported separately
+        self.df_report = pd.DataFrame(
+            [x for x in self.perf_kpi_list if x.get('mode') != 'sweep'],
+            columns=[
+                'backend', 'driver', 'format', 'rw', 'bs', 'iodepth',
+                'numjobs', 'target', 'placement', 'round', 'bw', 'iops',
+                'lat', 'clat90', 'util', 'ss', 'runtime', 'usr', 'sys',
+                'iowait', 'steal', 'iops_cpu', 'bw_cpu', 'cycles_io'
+            ] + self._get_percentile_columns() +
+            self._get_timeseries_columns())
 
         # Rename the columns of the report DataFrame
         self.df_report.rename(columns={
@@ -376,17 +1297,164 @@ class FioTestReporter():
             'bs': 'BS',
             'iodepth': 'IODepth',
             'numjobs': 'Numjobs',
+            'target': 'Target',
+            'placement': 'Placement',
             'round': 'Round',
             'bw': 'BW(MiB/s)',
             'iops': 'IOPS',
             'lat': 'LAT(ms)',
             'clat90': 'CLAT90(ms)',
-            'util': 'Util(%)'
+            'util': 'Util(%)',
+            'ss': 'SS',
+            'runtime': 'Runtime(s)',
+            'usr': 'USR(%)',
+            'sys': 'SYS(%)',
+            'iowait': 'IOWAIT(%)',
+            'steal': 'STEAL(%)',
+            'iops_cpu': 'IOPS/CPU',
+            'bw_cpu': 'BW/CPU(MiB/s)',
+            'cycles_io': 'Cycles/IO'
         },
                               inplace=True)
 
         return None
 
+    def _create_sweep_dataframe(self):
+        """Create the DataFrame of latency-vs-load curves.
+
+        This function creates the DataFrame from the results of the load
+        sweep, each curve (sub-case and target) is sorted by the offered IOPS,
+        and the highest offered IOPS meeting the SLO is marked as the knee.
+
+        As data source, the following attributes should be ready to use:
+        1. self.perf_kpi_list: the list of performance KPIs.
+
+        Updates:
+            self.df_sweep: the DataFrame of latency-vs-load curves.
+
+        """
+        keys = [
+            'Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs',
+            'Target'
+        ]
+
+        self.df_sweep = pd.DataFrame(
+            [x for x in self.perf_kpi_list if x.get('mode') == 'sweep'],
+            columns=[
+                'backend', 'driver', 'format', 'rw', 'bs', 'iodepth',
+                'numjobs', 'target', 'rate_iops', 'iops', 'slo_percentile',
+                'slo_clat', 'slo_lat', 'slo_met'
+            ])
+
+        self.df_sweep.rename(columns={
+            'backend': 'Backend',
+            'driver': 'Driver',
+            'format': 'Format',
+            'rw': 'RW',
+            'bs': 'BS',
+            'iodepth': 'IODepth',
+            'numjobs': 'Numjobs',
+            'target': 'Target',
+            'rate_iops': 'Offered(IOPS)',
+            'iops': 'IOPS',
+            'slo_percentile': 'Percentile',
+            'slo_clat': 'CLATP(ms)',
+            'slo_lat': 'SLO(ms)',
+            'slo_met': 'SLO Met'
+        },
+                             inplace=True)
+
+        # Sort the curves and mark the knees
+        self.df_sweep = self.df_sweep.sort_values(by=keys +
+                                                  ['Offered(IOPS)'])
+        self.df_sweep = self.df_sweep.reset_index().drop(columns=['index'])
+        self.df_sweep['Knee'] = False
+        for (values, df_group) in self.df_sweep.groupby(keys, sort=False):
+            df_met = df_group[df_group['SLO Met'].astype(bool)]
+            if len(df_met) > 0:
+                self.df_sweep.loc[df_met['Offered(IOPS)'].idxmax(),
+                                  'Knee'] = True
+
+        self.df_sweep = self.df_sweep.round(4)
+
+        return None
+
+    def _aggregate_report_dataframe(self):
+        """Aggregate the per-device results in report DataFrame.
+
+        The jobs running against different devices at the same time are
+        reported separately. This function adds an aggregate row whose
+        "Target" is "ALL" for each sub-case with more than one target.
+        The BW and IOPS are summed, the LAT is weighted by IOPS, and the
+        CLAT90, the percentiles and Util take the worst value across the
+        devices. The CPU usage of the devices tested at the same time is
+        averaged, and the efficiency is accumulated.
+
+        As data source, the following attributes should be ready to use:
+        1. self.df_report: the report DataFrame.
+
+        Updates:
+            self.df_report: the report DataFrame.
+
+        """
+        keys = [
+            'Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs',
+            'Round'
+        ]
+
+        aggr_list = []
+        for (values, df_group) in self.df_report.groupby(keys, sort=False):
+            if df_group['Target'].nunique() < 2:
+                continue
+
+            aggr = dict(zip(keys, values))
+            aggr['Target'] = 'ALL'
+            if df_group['Placement'].nunique() == 1:
+                aggr['Placement'] = df_group['Placement'].iloc[0]
+            else:
+                aggr['Placement'] = 'MIXED'
+            aggr['BW(MiB/s)'] = df_group['BW(MiB/s)'].sum()
+            aggr['IOPS'] = df_group['IOPS'].sum()
+            if aggr['IOPS'] > 0:
+                aggr['LAT(ms)'] = (df_group['LAT(ms)'] *
+                                   df_group['IOPS']).sum() / aggr['IOPS']
+            else:
+                aggr['LAT(ms)'] = df_group['LAT(ms)'].mean()
+            aggr['CLAT90(ms)'] = df_group['CLAT90(ms)'].max()
+            for column in self._get_percentile_columns():
+                values = pd.to_numeric(df_group[column], errors='coerce')
+                aggr[column] = values.max() if values.notna().any(
+                ) else 'NaN'
+            utils = pd.to_numeric(df_group['Util(%)'], errors='coerce')
+            aggr['Util(%)'] = utils.min() if utils.notna().any() else 'NaN'
+            flags = pd.to_numeric(df_group['SS'], errors='coerce')
+            aggr['SS'] = flags.min() if flags.notna().any() else 'NaN'
+            aggr['Runtime(s)'] = df_group['Runtime(s)'].max()
+
+            # The CPU usage is of the whole system, so the efficiency of the
+            # devices adds up
+            for column in ('USR(%)', 'SYS(%)', 'IOWAIT(%)', 'STEAL(%)',
+                           'IOPS/CPU', 'BW/CPU(MiB/s)', 'Cycles/IO'):
+                values = pd.to_numeric(df_group[column], errors='coerce')
+                if values.isna().any():
+                    aggr[column] = 'NaN'
+                elif column in ('IOPS/CPU', 'BW/CPU(MiB/s)'):
+                    aggr[column] = round(values.sum(), 4)
+                elif column == 'Cycles/IO':
+                    aggr[column] = round(1.0 / (1.0 / values).sum(), 4)
+                else:
+                    aggr[column] = round(values.mean(), 4)
+            for column in self._get_timeseries_columns():
+                aggr[column] = 'NaN'
+            aggr_list.append(aggr)
+
+        if aggr_list:
+            self.df_report = pd.concat(
+                [self.df_report, pd.DataFrame(aggr_list)],
+                ignore_index=True)[self.df_report.columns]
+
+        return None
+
     def _format_report_dataframe(self):
         """Format report DataFrame.
 
@@ -402,7 +1470,7 @@ class FioTestReporter():
         # Sort the report DataFrame and reset its index
         self.df_report = self.df_report.sort_values(by=[
             'Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs',
-            'Round'
+            'Target', 'Placement', 'Round'
         ])
         self.df_report = self.df_report.reset_index().drop(columns=['index'])
 
@@ -427,9 +1495,226 @@ class FioTestReporter():
         # Create DataFrame
         self._create_report_dataframe()
 
+        # Aggregate the per-device results
+        self._aggregate_report_dataframe()
+
         # Format DataFrame
         self._format_report_dataframe()
 
+        # Create DataFrame for the load sweep
+        self._create_sweep_dataframe()
+
+        # Create DataFrames for the latency histograms
+        if self.keep_hist:
+            self._create_hist_dataframe()
+            self._create_merged_dataframe()
+
+        # Create DataFrame for the fio clones
+        if self.per_job:
+            self._create_job_dataframe()
+
+        return None
+
+    def _create_hist_dataframe(self):
+        """Create the DataFrame of latency histograms in long format.
+
+        Each row is a non-empty bin of the completion latency histogram of a
+        direction in a fio test, the unit of "Bin(ns)" is "ns".
+
+        As data source, the following attributes should be ready to use:
+        1. self.perf_kpi_list: the list of performance KPIs.
+
+        Updates:
+            self.df_hist: the DataFrame of latency histograms.
+
+        """
+        keys = [
+            'backend', 'driver', 'format', 'rw', 'bs', 'iodepth', 'numjobs',
+            'target', 'placement', 'round'
+        ]
+
+        columns = dict([(x, []) for x in keys + ['direction', 'bin', 'count']])
+        for perf_kpi in self.perf_kpi_list:
+            if perf_kpi.get('mode') == 'sweep':
+                continue
+            for direction in ('read', 'write'):
+                bins = perf_kpi.get(direction[0] + '-hist', {})
+                for key in keys:
+                    columns[key].extend([perf_kpi[key]] * len(bins))
+                columns['direction'].extend([direction] * len(bins))
+                columns['bin'].extend([int(x) for x in bins.keys()])
+                columns['count'].extend(bins.values())
+
+        self.df_hist = pd.DataFrame(columns,
+                                    columns=keys +
+                                    ['direction', 'bin', 'count'])
+        self.df_hist.rename(columns={
+            'backend': 'Backend',
+            'driver': 'Driver',
+            'format': 'Format',
+            'rw': 'RW',
+            'bs': 'BS',
+            'iodepth': 'IODepth',
+            'numjobs': 'Numjobs',
+            'target': 'Target',
+            'placement': 'Placement',
+            'round': 'Round',
+            'direction': 'Direction',
+            'bin': 'Bin(ns)',
+            'count': 'Count'
+        },
+                            inplace=True)
+
+        self.df_hist = self.df_hist.sort_values(by=[
+            'Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs',
+            'Target', 'Placement', 'Round', 'Direction', 'Bin(ns)'
+        ])
+        self.df_hist = self.df_hist.reset_index().drop(columns=['index'])
+
+        return None
+
+    def _create_merged_dataframe(self):
+        """Create the DataFrame of percentiles from the merged histograms.
+
+        The histograms of all the rounds of a sub-case are merged (summed up
+        bin by bin), and the percentiles are calculated from the merged
+        histogram, which is exact, unlike averaging the percentiles of the
+        rounds.
+
+        As data source, the following attributes should be ready to use:
+        1. self.df_hist: the DataFrame of latency histograms.
+
+        Updates:
+            self.df_merged: the DataFrame of percentiles.
+
+        """
+        keys = [
+            'Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs',
+            'Target', 'Placement', 'Direction'
+        ]
+        percentiles = self.percentile_list or [
+            '50', '90', '99', '99.9', '99.99', 'max'
+        ]
+        columns = ['CLAT%s(ms)' % x.upper() for x in percentiles]
+
+        merged_list = []
+        df_sum = self.df_hist.groupby(keys + ['Bin(ns)'],
+                                      sort=True)['Count'].sum().reset_index()
+        rounds = self.df_hist.groupby(keys)['Round'].nunique()
+        for (values, df_group) in df_sum.groupby(keys, sort=False):
+            merged = dict(zip(keys, values))
+            merged['Rounds'] = rounds[values]
+            merged['Samples'] = df_group['Count'].sum()
+            results = self._get_percentiles_from_bins(
+                df_group['Bin(ns)'].values, df_group['Count'].values,
+                [100.0 if x == 'max' else float(x) for x in percentiles])
+            for (column, value) in zip(columns, results):
+                merged[column] = value / 1000000.0
+            merged_list.append(merged)
+
+        self.df_merged = pd.DataFrame(merged_list,
+                                      columns=keys + ['Rounds', 'Samples'] +
+                                      columns).round(4)
+
+        return None
+
+    def _create_job_dataframe(self):
+        """Create the DataFrame of the results of each fio clone.
+
+        Each fio test has a row for each clone (numbered by "Job") and an
+        aggregate row whose "Job" is "ALL", which has the imbalance among the
+        clones: the MIN, MAX and CoV (coefficient of variation, the standard
+        deviation divided by the mean) of BW, IOPS and LAT. The imbalance is
+        "NaN" if the clones were reported as a whole.
+
+        As data source, the following attributes should be ready to use:
+        1. self.perf_kpi_list: the list of performance KPIs.
+
+        Updates:
+            self.df_job: the DataFrame of the results of each fio clone.
+
+        """
+        keys = [
+            'backend', 'driver', 'format', 'rw', 'bs', 'iodepth', 'numjobs',
+            'target', 'placement', 'round'
+        ]
+        kpis = [('bw', 'BW', '(MiB/s)'), ('iops', 'IOPS', ''),
+                ('lat', 'LAT', '(ms)')]
+
+        job_list = []
+        for perf_kpi in self.perf_kpi_list:
+            if perf_kpi.get('mode') == 'sweep':
+                continue
+
+            clones = perf_kpi.get('jobs', [])
+            for (index, clone) in enumerate(clones):
+                row = dict([(x, perf_kpi[x]) for x in keys])
+                row['job'] = index
+                row.update(clone)
+                job_list.append(row)
+
+            aggr = dict([(x, perf_kpi[x]) for x in keys])
+            aggr['job'] = 'ALL'
+            for kpi in ('bw', 'iops', 'lat', 'clat90'):
+                aggr[kpi] = perf_kpi[kpi]
+            for (kpi, name, unit) in kpis:
+                values = np.array([x[kpi] for x in clones], dtype=np.float64)
+                if len(values) > 1:
+                    mean = values.mean()
+                    aggr['%s-MIN%s' % (name, unit)] = round(values.min(), 4)
+                    aggr['%s-MAX%s' % (name, unit)] = round(values.max(), 4)
+                    aggr['%s-CoV(%%)' % name] = round(
+                        values.std() / mean * 100.0 if mean else 0.0, 4)
+                else:
+                    aggr['%s-MIN%s' % (name, unit)] = 'NaN'
+                    aggr['%s-MAX%s' % (name, unit)] = 'NaN'
+                    aggr['%s-CoV(%%)' % name] = 'NaN'
+            job_list.append(aggr)
+
+        columns = [
+            'Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs',
+            'Target', 'Placement', 'Round', 'Job', 'BW(MiB/s)', 'IOPS',
+            'LAT(ms)', 'CLAT90(ms)'
+        ]
+        for (kpi, name, unit) in kpis:
+            columns += [
+                '%s-MIN%s' % (name, unit),
+                '%s-MAX%s' % (name, unit),
+                '%s-CoV(%%)' % name
+            ]
+
+        self.df_job = pd.DataFrame(job_list)
+        self.df_job.rename(columns={
+            'backend': 'Backend',
+            'driver': 'Driver',
+            'format': 'Format',
+            'rw': 'RW',
+            'bs': 'BS',
+            'iodepth': 'IODepth',
+            'numjobs': 'Numjobs',
+            'target': 'Target',
+            'placement': 'Placement',
+            'round': 'Round',
+            'job': 'Job',
+            'bw': 'BW(MiB/s)',
+            'iops': 'IOPS',
+            'lat': 'LAT(ms)',
+            'clat90': 'CLAT90(ms)'
+        },
+                           inplace=True)
+        self.df_job = self.df_job.reindex(columns=columns)
+
+        # Sort by the sub-cases and rounds, the aggregate row comes last
+        self.df_job['Order'] = self.df_job['Job'].apply(
+            lambda x: len(self.df_job) if x == 'ALL' else x)
+        self.df_job = self.df_job.sort_values(by=[
+            'Backend', 'Driver', 'Format', 'RW', 'BS', 'IODepth', 'Numjobs',
+            'Target', 'Placement', 'Round', 'Order'
+        ])
+        self.df_job = self.df_job.reset_index().drop(
+            columns=['index', 'Order'])
+        self.df_job = self.df_job.round(4)
+
         return None
 
     def report_dataframe_to_csv(self, params={}):
@@ -458,9 +1743,7 @@ class FioTestReporter():
         try:
             print('[NOTE] Dumping data into csv file "%s"...' %
                   params['report_csv'])
-            content = self.df_report.to_csv()
-            with open(params['report_csv'], 'w') as f:
-                f.write(content)
+            self.df_report.to_csv(params['report_csv'])
             print('[NOTE] Finished!')
 
         except Exception as err:
@@ -469,14 +1752,174 @@ class FioTestReporter():
 
         return 0
 
+    def report_dataframe_to_columnar(self, params={}):
+        """Dump the report DataFrame to a columnar (parquet or feather) file.
+
+        The key columns (self.category_columns) are stored as categorical,
+        and the other columns (including "IODepth", "Numjobs" and "Round")
+        are stored as numbers, see dataframe_to_columnar().
+
+        As data source, the self.df_report should be ready to use.
+
+        Args:
+            params: dict, see dataframe_to_columnar().
+
+        Returns:
+            0: Passed
+            1: Failed
+
+        """
+        return dataframe_to_columnar(self.df_report, self.category_columns,
+                                     params)
+
+    def sweep_dataframe_to_csv(self, params={}):
+        """Dump the latency-vs-load curves to a csv file.
+
+        As data source, the self.df_sweep should be ready to use.
+
+        Args:
+            params: dict
+                sweep_csv: string, the csv file to dump the curves to.
+
+        Returns:
+            0: Passed
+            1: Failed
 
-def generate_fio_test_report(result_path, report_csv):
+        Raises:
+            1. Error while dumping to csv file
+
+        """
+        # Parse required params
+        if 'sweep_csv' not in params:
+            print('[ERROR] Missing required params: params[sweep_csv]')
+            return 1
+
+        # Write the curves to the csv file
+        try:
+            print('[NOTE] Dumping load sweep into csv file "%s"...' %
+                  params['sweep_csv'])
+            self.df_sweep.to_csv(params['sweep_csv'])
+            print('[NOTE] Finished!')
+
+        except Exception as err:
+            print('[ERROR] Error while dumping to csv file: %s' % err)
+            return 1
+
+        return 0
+
+    def hist_dataframes_to_csv(self, params={}):
+        """Dump the latency histograms and merged percentiles to csv files.
+
+        As data source, the self.df_hist and self.df_merged should be ready
+        to use.
+
+        Args:
+            params: dict
+                hist_csv: string, the csv file to dump the histograms to.
+                merged_csv: string, the csv file to dump the percentiles
+                    calculated from the merged histograms to.
+
+        Returns:
+            0: Passed
+            1: Failed
+
+        Raises:
+            1. Error while dumping to csv file
+
+        """
+        outputs = (('hist_csv', 'latency histograms', self.df_hist),
+                   ('merged_csv', 'merged percentiles', self.df_merged))
+
+        # Write the DataFrames to the csv files
+        for (key, name, df) in outputs:
+            if not params.get(key):
+                continue
+            try:
+                print('[NOTE] Dumping %s into csv file "%s"...' %
+                      (name, params[key]))
+                df.to_csv(params[key])
+                print('[NOTE] Finished!')
+
+            except Exception as err:
+                print('[ERROR] Error while dumping to csv file: %s' % err)
+                return 1
+
+        return 0
+
+    def job_dataframe_to_csv(self, params={}):
+        """Dump the results of each fio clone to a csv file.
+
+        As data source, the self.df_job should be ready to use.
+
+        Args:
+            params: dict
+                job_csv: string, the csv file to dump the results to.
+
+        Returns:
+            0: Passed
+            1: Failed
+
+        Raises:
+            1. Error while dumping to csv file
+
+        """
+        # Parse required params
+        if 'job_csv' not in params:
+            print('[ERROR] Missing required params: params[job_csv]')
+            return 1
+
+        # Write the results to the csv file
+        try:
+            print('[NOTE] Dumping per-job results into csv file "%s"...' %
+                  params['job_csv'])
+            self.df_job.to_csv(params['job_csv'])
+            print('[NOTE] Finished!')
+
+        except Exception as err:
+            print('[ERROR] Error while dumping to csv file: %s' % err)
+            return 1
+
+        return 0
+
+
+def _get_raw_data_from_file(task):
+    """Get the raw data from a file in a worker of the process pool."""
+    (filename, skip_bins, timeseries_trim) = task
+    return FioTestReporter()._get_raw_data_from_file(filename, skip_bins,
+                                                     timeseries_trim)
+
+
+def generate_fio_test_report(result_path,
+                             report_csv,
+                             sweep_csv,
+                             jobs=1,
+                             use_cache=True,
+                             rebuild_cache=False,
+                             columnar_format=None,
+                             partition_cols=None,
+                             percentiles=None,
+                             hist_csv=None,
+                             merged_csv=None,
+                             job_csv=None,
+                             timeseries_trim=None):
     """Generate FIO test report."""
     fioreporter = FioTestReporter()
-
-    # Load raw data from *.fiolog files
-    return_value = fioreporter.load_raw_data_from_fio_logs(
-        {'result_path': result_path})
+    fioreporter.timeseries_trim = timeseries_trim
+    fioreporter.percentile_list = percentiles or []
+    fioreporter.keep_hist = bool(hist_csv or merged_csv)
+    fioreporter.per_job = bool(job_csv)
+
+    # Load raw data from *.fiolog files, the histograms are needed by the
+    # percentiles which are not reported by fio, and by merging the clones
+    # exactly if they were reported one by one
+    return_value = fioreporter.load_raw_data_from_fio_logs({
+        'result_path': result_path,
+        'skip_bins': not (percentiles or fioreporter.keep_hist
+                          or fioreporter.per_job),
+        'jobs': jobs,
+        'use_cache': use_cache,
+        'rebuild_cache': rebuild_cache
+    })
     if return_value:
         exit(1)
 
@@ -494,6 +1937,39 @@ def generate_fio_test_report(result_path, report_csv):
     if return_value:
         exit(1)
 
+    # Dump the Dataframe as columnar file beside the CSV file if required
+    if columnar_format:
+        return_value = fioreporter.report_dataframe_to_columnar({
+            'report_file':
+            os.path.splitext(report_csv)[0] + '.' + columnar_format,
+            'columnar_format': columnar_format,
+            'partition_cols': partition_cols
+        })
+        if return_value:
+            exit(1)
+
+    # Dump the load sweep as CSV file if there is
+    if len(fioreporter.df_sweep) > 0:
+        return_value = fioreporter.sweep_dataframe_to_csv(
+            {'sweep_csv': sweep_csv})
+        if return_value:
+            exit(1)
+
+    # Dump the latency histograms and merged percentiles if required
+    if fioreporter.keep_hist:
+        return_value = fioreporter.hist_dataframes_to_csv({
+            'hist_csv': hist_csv,
+            'merged_csv': merged_csv
+        })
+        if return_value:
+            exit(1)
+
+    # Dump the results of each fio clone if required
+    if fioreporter.per_job:
+        return_value = fioreporter.job_dataframe_to_csv({'job_csv': job_csv})
+        if return_value:
+            exit(1)
+
     exit(0)
 
 
@@ -504,7 +1980,57 @@ def generate_fio_test_report(result_path, report_csv):
 @click.option('--report_csv',
               type=click.Path(),
               help='Specify the name of CSV file for fio test reports.')
-def cli(result_path, report_csv):
+@click.option('--sweep_csv',
+              type=click.Path(),
+              help='Specify the name of CSV file for the latency-vs-load \
+curves of the load sweep.')
+@click.option('--jobs',
+              type=click.IntRange(min=0),
+              default=1,
+              help='The number of processes to load the fio logs, \'0\' for \
+the number of CPUs. (default 1)')
+@click.option('--cache/--no-cache',
+              default=True,
+              help='Cache the KPIs of each file in the result path, so that \
+only the new or changed files are parsed next time. (default True)')
+@click.option('--rebuild_cache',
+              is_flag=True,
+              help='Drop the KPI cache and rebuild it from all the files.')
+@click.option('--columnar',
+              type=click.Choice(['parquet', 'feather']),
+              help='Also dump the report into a columnar file which keeps the \
+dtypes, named after the CSV file.')
+@click.option('--partition_cols',
+              help='Partition the parquet report by the columns, such as \
+\'Backend,Driver,Format\'.')
+@click.option('--percentiles',
+              help='The completion latency percentiles to be reported for \
+each direction, such as \'50,95,99,99.9,99.99,max\'.')
+@click.option('--hist_csv',
+              type=click.Path(),
+              help='Specify the name of CSV file for the latency histograms \
+in long format.')
+@click.option('--merged_csv',
+              type=click.Path(),
+              help='Specify the name of CSV file for the percentiles \
+calculated from the latency histograms merged across the rounds.')
+@click.option('--job_csv',
+              type=click.Path(),
+              help='Specify the name of CSV file for the results of each fio \
+clone and the imbalance among them (the fio jobs should be run without \
+--group_reporting).')
+@click.option('--timeseries',
+              is_flag=True,
+              help='Analyze the bw/iops/lat logs (generated with --plots) \
+and report the geometric mean, CoV and jitter of the aggregate series.')
+@click.option('--ts_trim',
+              type=click.FloatRange(min=0),
+              default=0.0,
+              help='Trim the samples of the bw/iops/lat logs in the warm-up \
+period (seconds) for --timeseries. (default 0)')
+def cli(result_path, report_csv, sweep_csv, jobs, cache, rebuild_cache,
+        columnar, partition_cols, percentiles, hist_csv, merged_csv,
+        job_csv, timeseries, ts_trim):
     """Command Line Interface."""
     # Parse and check the parameters
     if not result_path:
@@ -514,9 +2040,30 @@ def cli(result_path, report_csv):
         print('[WARNING] No CSV file name (--report_csv) was specified. Will \
 use "%s/fio_report.csv" instead.' % result_path)
         report_csv = result_path + os.sep + 'fio_report.csv'
+    if not sweep_csv:
+        sweep_csv = result_path + os.sep + 'fio_sweep.csv'
+
+    # Normalize the percentiles, such as '99.90' to '99.9'
+    percentile_list = []
+    for percentile in percentiles.split(',') if percentiles else []:
+        if percentile.lower() == 'max':
+            percentile_list.append('max')
+            continue
+        try:
+            if not 0 < float(percentile) < 100:
+                raise ValueError
+        except ValueError:
+            print('[ERROR] Invalid percentile "%s", it should be a number '
+                  'between 0 and 100 or "max".' % percentile)
+            exit(1)
+        percentile_list.append('%g' % float(percentile))
 
     # Generate FIO test report
-    generate_fio_test_report(result_path, report_csv)
+    generate_fio_test_report(
+        result_path, report_csv, sweep_csv, jobs, cache, rebuild_cache,
+        columnar, partition_cols.split(',') if partition_cols else None,
+        percentile_list, hist_csv, merged_csv, job_csv,
+        ts_trim if timeseries else None)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,165 @@
+"""The helpers shared by the test reporters.
+
+# The fio, flent and netperf reporters load this module from the same
+# directory, the network ones by symbolic links to this file.
+
+History:
+v0.1    2026-10-17  agent         Init version.
+"""
+
+import os
+import tarfile
+import shutil
+import pandas as pd
+
+
+def get_members_from_tarball(tarball, suffixes, stop_prefix=None):
+    """Read the specified members from a tarball in memory.
+
+    This function streams the tarball and reads the first member ending
+    with each of the suffixes. The other members (such as the bw/iops/lat
+    logs) are skipped without being extracted, and the streaming stops once
+    all the members are found.
+
+    The optional members (such as the CPU usage) may not be there, so the
+    streaming also stops at the first member named with stop_prefix once
+    the first suffix is found. It only works for the tarballs sorted by name
+    (in C locale), where "<casename>_*" (the bw/iops/lat logs) are stored
+    after all the "<casename>.*" and "<casename>-*", so it's disabled once
+    the members are found out of order.
+
+    Args:
+        tarball: string, the path to the *.tar.gz file.
+        suffixes: list, the suffixes of the members to be read.
+        stop_prefix: string, the prefix of the member names to stop at.
+
+    Returns:
+        A dict like {suffix: content}, the content is in bytes.
+
+    """
+    members = {}
+    (ordered, previous) = (True, '')
+    with tarfile.open(tarball, 'r|gz') as tar:
+        for member in tar:
+            # Stop at the fio logs if the tarball is sorted by name
+            ordered = ordered and member.name >= previous
+            previous = member.name
+            if (stop_prefix and ordered and suffixes[0] in members
+                    and os.path.basename(member.name).startswith(stop_prefix)):
+                break
+            if not member.isfile():
+                continue
+            for suffix in suffixes:
+                if suffix not in members and member.name.endswith(suffix):
+                    members[suffix] = tar.extractfile(member).read()
+            if len(members) == len(suffixes):
+                break
+
+    return members
+
+
+def get_columnar_dataframe(df, category_columns):
+    """Get a report DataFrame with the dtypes for the columnar store.
+
+    The key columns are stored as categorical, and the other columns are
+    stored as numbers, with the "NaN" strings converted into missing values.
+
+    Args:
+        df: DataFrame, the report DataFrame.
+        category_columns: list, the key columns.
+
+    Returns:
+        A copy of the DataFrame with the dtypes converted.
+
+    """
+    df = df.copy()
+    for column in df.columns:
+        if column in category_columns:
+            df[column] = df[column].astype(str).astype('category')
+        else:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+
+    return df
+
+
+def dataframe_to_columnar(df, category_columns, params={}):
+    """Dump a report DataFrame to a columnar (parquet or feather) file.
+
+    Unlike the csv file, the columnar file keeps the dtypes of the columns
+    (see get_columnar_dataframe()), which can be loaded by the benchmark
+    reporters directly.
+
+    Args:
+        df: DataFrame, the report DataFrame.
+        category_columns: list, the key columns.
+        params: dict
+            report_file: string, the file to dump report DataFrame to.
+            columnar_format: string, 'parquet' or 'feather'.
+            partition_cols: list, the columns to partition the parquet file
+                by, such as ['Backend', 'Driver', 'Format']. The report_file
+                will be a directory if specified.
+
+    Returns:
+        0: Passed
+        1: Failed
+
+    Raises:
+        1. Error while dumping to columnar file
+
+    """
+    # Parse required params
+    if 'report_file' not in params:
+        print('[ERROR] Missing required params: params[report_file]')
+        return 1
+
+    columnar_format = params.get('columnar_format', 'parquet')
+    partition_cols = params.get('partition_cols')
+    if partition_cols and columnar_format != 'parquet':
+        print('[ERROR] Only the parquet format can be partitioned.')
+        return 1
+
+    # Write the report to the columnar file
+    try:
+        print('[NOTE] Dumping data into %s file "%s"...' %
+              (columnar_format, params['report_file']))
+        df = get_columnar_dataframe(df, category_columns)
+        if columnar_format == 'feather':
+            df.to_feather(params['report_file'])
+        elif partition_cols:
+            # Don't append the partitions to the outdated ones
+            if os.path.isdir(params['report_file']):
+                shutil.rmtree(params['report_file'])
+            df.to_parquet(params['report_file'],
+                          index=False,
+                          partition_cols=partition_cols)
+        else:
+            df.to_parquet(params['report_file'], index=False)
+        print('[NOTE] Finished!')
+
+    except Exception as err:
+        print('[ERROR] Error while dumping to %s file: %s' %
+              (columnar_format, err))
+        return 1
+
+    return 0
+
+
+def read_samples(filename):
+    """Read the samples from a csv or columnar file.
+
+    The parquet (including a partitioned directory) and feather files are
+    detected by their names, otherwise the file is read as csv.
+
+    Args:
+        filename: string, the csv, parquet or feather file (or directory).
+
+    Returns:
+        The samples in a DataFrame.
+
+    """
+    if os.path.isdir(filename) or filename.endswith('.parquet'):
+        return pd.read_parquet(filename)
+    elif filename.endswith('.feather'):
+        return pd.read_feather(filename)
+    else:
+        return pd.read_csv(filename)
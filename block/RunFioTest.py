@@ -4,7 +4,8 @@
 # Interface between GenerateTestReport.py
 # This script should do:
 # 1. the fio outputs should be at least in json+ format
-#    the "fio --group_reporting" must be used
+#    the "fio --group_reporting" should be used, otherwise the clones are
+#    reported one by one and merged by the reporter
 # 2. save the fio outputs into *.fiolog
 # 3. put all *.fiolog files into the spcified path
 # 4. pass the additional information by "fio --description"
@@ -12,6 +13,8 @@
 #    b) "format" - the disk format, such as raw or xfs
 #    c) "round" - the round number, such as 1, 2, 3...
 #    d) "backend" - the hardware which data image based on
+#    e) "target" - the disk(s) or file(s) tested by fio
+#    f) "placement" - the placement policy of the fio clones (optional)
 
 History:
 v0.1    2018-07-31  charles.shih  Refactory based on StoragePerformanceTest.py
@@ -44,14 +47,604 @@ v2.2.1  2020-03-13  charles.shih  PEP-8 Formatting.
 v2.3    2020-07-22  charles.shih  Name all files uniformly.
 v2.4    2020-07-22  charles.shih  Technical Preview, wait before collection.
 v2.5    2020-07-22  charles.shih  Log the fio command.
+v2.6    2026-10-17  agent         Support concurrent per-device job streams,
+                                  journal and resume, steady state, adaptive
+                                  rounds, preconditioning, load sweep, deferred
+                                  post-processing, NUMA placement and pluggable
+                                  collectors.
 """
 
 import os
+import re
+import sys
+import json
+import tarfile
 import time
 import itertools
+import threading
+import multiprocessing
+import subprocess
+import shlex
+import csv
+import glob
+import signal
+import importlib
+import abc
+import inspect
 import yaml
 import click
 
+try:
+    import queue
+except ImportError:
+    # Python 2
+    import Queue as queue
+
+try:
+    from shlex import quote
+except ImportError:
+    # Python 2
+    from pipes import quote
+
+
+def read_proc_stat():
+    """Read the CPU times (in USER_HZ) and counters from /proc/stat."""
+    fields = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq',
+              'steal', 'guest', 'guest_nice')
+    sample = {}
+    with open('/proc/stat', 'r') as f:
+        for line in f:
+            items = line.split()
+            if items[0].startswith('cpu'):
+                for (field, value) in zip(fields, items[1:]):
+                    sample[items[0] + '.' + field] = int(value)
+            elif items[0] in ('ctxt', 'intr', 'procs_running',
+                              'procs_blocked'):
+                sample[items[0]] = int(items[1])
+    return sample
+
+
+def read_proc_diskstats(ignored_disks=('loop', 'ram', 'zram')):
+    """Read the I/O statistics of block devices from /proc/diskstats."""
+    fields = ('reads', 'reads_merged', 'sectors_read', 'ms_reading', 'writes',
+              'writes_merged', 'sectors_written', 'ms_writing', 'in_flight',
+              'ms_io', 'weighted_ms_io')
+    sample = {}
+    with open('/proc/diskstats', 'r') as f:
+        for line in f:
+            items = line.split()
+            if items[2].startswith(ignored_disks):
+                continue
+            for (field, value) in zip(fields, items[3:]):
+                sample[items[2] + '.' + field] = int(value)
+    return sample
+
+
+def read_proc_interrupts(source):
+    """Read the counters summed up over CPUs from /proc/*irqs."""
+    sample = {}
+    with open(source, 'r') as f:
+        ncpu = len(f.readline().split())
+        for line in f:
+            items = line.split()
+            total = 0
+            for value in items[1:ncpu + 1]:
+                if not value.isdigit():
+                    break
+                total += int(value)
+            sample[items[0].rstrip(':')] = total
+    return sample
+
+
+def read_proc_pressure():
+    """Read the total stall time (in us) from /proc/pressure/*."""
+    sample = {}
+    for resource in ('cpu', 'io', 'memory'):
+        with open('/proc/pressure/' + resource, 'r') as f:
+            for line in f:
+                items = line.split()
+                sample[resource + '.' + items[0]] = int(
+                    items[-1].split('=')[1])
+    return sample
+
+
+class SystemSampler(threading.Thread):
+    """System Metrics Sampler.
+
+    This class used to sample the system metrics during a fio job. As basic
+    functions:
+    1. It reads /proc/stat, /proc/diskstats, /proc/interrupts, /proc/softirqs
+       and /proc/pressure/* at the specified interval in a thread;
+    2. It keeps the samples in a table (columns and rows) for each source;
+    3. It saves the tables into a compressed numpy file (*.npz) when stopped;
+
+    The saved file can be loaded by load_sampler_data().
+
+    """
+
+    def __init__(self, output, interval=1.0):
+        """Initialize this Class.
+
+        Args:
+            output: str, the *.npz file to save the samples to.
+            interval: float, the sampling interval in seconds.
+
+        """
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self.output = output
+        self.interval = interval
+
+        # The samples of each source, in {source: (columns, rows)} format
+        self.tables = {}
+        self.times = []
+        self.events = {}
+        self.stop_event = threading.Event()
+
+    def _sample(self):
+        """Take a sample from all the sources."""
+        readers = (('stat', read_proc_stat),
+                   ('diskstats', read_proc_diskstats),
+                   ('interrupts',
+                    lambda: read_proc_interrupts('/proc/interrupts')),
+                   ('softirqs',
+                    lambda: read_proc_interrupts('/proc/softirqs')),
+                   ('pressure', read_proc_pressure))
+
+        self.times.append(time.time())
+        for (source, reader) in readers:
+            try:
+                sample = reader()
+            except (IOError, OSError, IndexError, ValueError):
+                # The source is unavailable, such as PSI on old kernels
+                sample = {}
+
+            # The columns are fixed by the first sample, -1 for missing
+            if source not in self.tables:
+                self.tables[source] = (sorted(sample.keys()), [])
+            (columns, rows) = self.tables[source]
+            rows.append([sample.get(x, -1) for x in columns])
+
+        return None
+
+    def mark(self, event):
+        """Record the time of an event, such as the fio start."""
+        self.events[event] = time.time()
+
+        return None
+
+    def run(self):
+        """Take samples at the interval until being stopped."""
+        start = time.time()
+        count = 0
+        while not self.stop_event.is_set():
+            self._sample()
+            count += 1
+            # Align the samples to the interval to avoid drifting
+            self.stop_event.wait(
+                max(0, start + count * self.interval - time.time()))
+
+        return None
+
+    def stop(self):
+        """Stop sampling, take the last sample and save all the samples."""
+        import numpy as np
+
+        self.stop_event.set()
+        self.join()
+        self._sample()
+
+        arrays = {'time': np.array(self.times, dtype=np.float64)}
+        for (event, value) in self.events.items():
+            arrays['event_' + event] = np.array(value, dtype=np.float64)
+        for (source, (columns, rows)) in self.tables.items():
+            arrays[source + '_columns'] = np.array(columns, dtype=np.str_)
+            arrays[source] = np.array(rows, dtype=np.int64).reshape(
+                len(rows), len(columns))
+        np.savez_compressed(self.output, **arrays)
+
+        return None
+
+
+def load_sampler_data(source):
+    """Load the samples saved by SystemSampler.
+
+    Args:
+        source: str or file object, the *.npz file.
+
+    Returns:
+        A dict like {'time': array, 'events': {event: time},
+        'stat': {column: array}, 'diskstats': {column: array}, ...}. The
+        counters are cumulative, use numpy.diff() to get the rates.
+
+    """
+    import numpy as np
+
+    data = {'events': {}}
+    with np.load(source) as npz:
+        data['time'] = npz['time']
+        for name in npz.files:
+            if name.startswith('event_'):
+                data['events'][name[len('event_'):]] = float(npz[name])
+            elif name.endswith('_columns'):
+                table = name[:-len('_columns')]
+                values = npz[table]
+                data[table] = {}
+                for (index, column) in enumerate(npz[name]):
+                    data[table][str(column)] = values[:, index]
+
+    return data
+
+
+# The base class of the abstract classes, for both Python 2 and 3
+ABC = abc.ABCMeta('ABC', (object, ), {})
+
+
+class Collector(ABC):
+    """Base Class of the Instrumentation Collectors.
+
+    A collector gathers the instrumentation data of the fio jobs. When a job
+    is created, it can add fio options and post-processing commands to the
+    job. When the job runs, it is called at the following hooks:
+    1. before_job: the output path is created, fio is not started yet;
+    2. fio_started: the fio process has just been started;
+    3. fio_finished: the fio process has just exited (or failed to start);
+    4. after_job: in the post-processing, before the tarball is created;
+
+    Each subclass declares its name, its output files (glob patterns in the
+    output path of the job, '%s' stands for the casename) and its overhead
+    class, which is one of 'low' (reads /proc at runtime or changes the
+    outputs only), 'medium' (runs a helper process) and 'high' (changes the
+    fio behavior). The collectors are shared by the concurrent jobs, so the
+    per-job state should be kept by the casename.
+
+    """
+
+    name = None
+    overhead = 'low'
+    outputs = []
+
+    def __init__(self, runner, options={}):
+        """Initialize this Class.
+
+        Args:
+            runner: FioTestRunner, the runner which uses this collector.
+            options: dict, the options of this collector from the YAML.
+
+        """
+        self.runner = runner
+        self.options = options
+        self.state = {}
+
+    def get_output(self, job, suffix):
+        """Get the path of an output file of the specified job."""
+        return job['output_path'] + os.sep + job['casename'] + suffix
+
+    def fio_options(self, casename, output_path):
+        """Return the extra fio options of the job."""
+        return ''
+
+    def postproc_command(self, casename, output_path):
+        """Return the extra post-processing commands of the job."""
+        return ''
+
+    def before_job(self, job):
+        """Hook before the fio process is started."""
+        return None
+
+    def fio_started(self, job, pid):
+        """Hook after the fio process is started."""
+        return None
+
+    def fio_finished(self, job):
+        """Hook after the fio process exits."""
+        return None
+
+    def after_job(self, job):
+        """Hook in the post-processing of the job."""
+        return None
+
+
+class ProcessCollector(Collector):
+    """Base Class of the collectors running a helper process.
+
+    The helper process starts at the hook specified by 'start_at' and is
+    stopped by 'stop_signal' when fio exits. Its stdout is saved to the
+    file specified by 'stdout_suffix' if set.
+
+    """
+
+    overhead = 'medium'
+    start_at = 'before_job'
+    stop_signal = signal.SIGTERM
+    stdout_suffix = None
+
+    @abc.abstractmethod
+    def get_command(self, job, pid):
+        """Return the command (as a list) of the helper process."""
+
+    def _start(self, job, pid=None):
+        """Start the helper process of the specified job."""
+        stdout = open(
+            self.get_output(job, self.stdout_suffix)
+            if self.stdout_suffix else os.devnull, 'w')
+        try:
+            self.state[job['casename']] = subprocess.Popen(
+                self.get_command(job, pid),
+                stdout=stdout,
+                stderr=subprocess.STDOUT,
+                cwd=job['output_path'])
+        except OSError as err:
+            print('[WARNING] Collector "%s" failed to start: %s' %
+                  (self.name, err))
+        finally:
+            stdout.close()
+
+        return None
+
+    def before_job(self, job):
+        if self.start_at == 'before_job':
+            self._start(job)
+        return None
+
+    def fio_started(self, job, pid):
+        if self.start_at == 'fio_started':
+            self._start(job, pid)
+        return None
+
+    def fio_finished(self, job):
+        process = self.state.pop(job['casename'], None)
+        if process:
+            process.send_signal(self.stop_signal)
+            process.wait()
+        return None
+
+
+class SnapshotCollector(Collector):
+    """Base Class of the collectors taking snapshots of /proc files.
+
+    The counters are read when fio starts and exits, and the deltas are
+    saved into '<casename>.<name>.json' along with the time of snapshots.
+
+    """
+
+    @abc.abstractmethod
+    def read(self):
+        """Return the counters in {source: {column: value}} format."""
+
+    def fio_started(self, job, pid):
+        self.state[job['casename']] = (time.time(), self.read())
+        return None
+
+    def fio_finished(self, job):
+        if job['casename'] not in self.state:
+            return None
+
+        (start, before) = self.state.pop(job['casename'])
+        stop = time.time()
+        after = self.read()
+
+        # Keep the changed counters only
+        delta = {}
+        for (source, sample) in after.items():
+            delta[source] = {}
+            for (column, value) in sample.items():
+                if value != before[source].get(column, value):
+                    delta[source][column] = value - before[source][column]
+
+        with open(self.get_output(job, '.%s.json' % self.name), 'w') as f:
+            json.dump({'start': start, 'stop': stop, 'delta': delta}, f)
+
+        return None
+
+
+# The built-in collectors, in {name: class} format
+COLLECTORS = {}
+
+
+def register_collector(cls):
+    """Register a collector class by its name.
+
+    Raises:
+        TypeError: the class doesn't implement all the abstract methods,
+            such as ProcessCollector.get_command().
+
+    """
+    if inspect.isabstract(cls):
+        raise TypeError('Collector "%s" does not implement: %s.' %
+                        (cls.name, ', '.join(sorted(cls.__abstractmethods__))))
+    COLLECTORS[cls.name] = cls
+    return cls
+
+
+@register_collector
+class SamplerCollector(Collector):
+    """Sample the system metrics by SystemSampler during fio."""
+
+    name = 'sampler'
+    overhead = 'low'
+    outputs = ['%s.sampler.npz']
+
+    def before_job(self, job):
+        sampler = SystemSampler(
+            self.get_output(job, '.sampler.npz'),
+            self.options.get('interval', self.runner.sample_interval))
+        sampler.start()
+        self.state[job['casename']] = sampler
+        return None
+
+    def fio_started(self, job, pid):
+        if job['casename'] in self.state:
+            self.state[job['casename']].mark('fio_start')
+        return None
+
+    def fio_finished(self, job):
+        sampler = self.state.pop(job['casename'], None)
+        if sampler:
+            sampler.mark('fio_stop')
+            sampler.stop()
+        return None
+
+
+@register_collector
+class SarCollector(ProcessCollector):
+    """Collect the SAR logs during fio.
+
+    It starts right after fio, so that the average CPU usage of
+    '<casename>-sa_cpu.log' covers the job only.
+
+    """
+
+    name = 'sar'
+    outputs = ['%s.sa']
+    start_at = 'fio_started'
+
+    def get_command(self, job, pid):
+        interval = self.options.get('interval', self.runner.sample_interval)
+        return [
+            'sar', '-A',
+            str(max(1, int(interval))), '-o', job['casename'] + '.sa'
+        ]
+
+    def postproc_command(self, casename, output_path):
+        command = 'pushd %s &>/dev/null; ' % output_path
+        command += 'sar -f %s.sa -u > %s-sa_cpu.log; ' % (casename, casename)
+        command += 'popd &>/dev/null; '
+        return command
+
+
+@register_collector
+class IdleProfCollector(Collector):
+    """Collect the CPU idleness by fio."""
+
+    name = 'idleprof'
+    overhead = 'high'
+
+    def fio_options(self, casename, output_path):
+        return ' --idle-prof=percpu'
+
+
+@register_collector
+class PlotsCollector(Collector):
+    """Generate bw/iops/lat logs in their lifetime for the plots.
+
+    After the plots are generated, the text logs are converted into
+    '<casename>.fiologs.npz' by AnalyzeFioLogs.py and removed unless
+    'keep_text_logs' is set.
+
+    """
+
+    name = 'plots'
+    overhead = 'low'
+    outputs = ['%s_bw.*.log', '%s_iops.*.log', '%s_lat.*.log']
+
+    def fio_options(self, casename, output_path):
+        prefix = output_path + os.sep + casename
+        options = ' --write_bw_log=%s' % prefix
+        options += ' --write_iops_log=%s' % prefix
+        options += ' --write_lat_log=%s' % prefix
+        options += ' --log_avg_msec=%s' % self.options.get('log_avg_msec', 500)
+        options += ' --per_job_logs=1'
+        return options
+
+    def postproc_command(self, casename, output_path):
+        command = 'export PATH=$PATH:$PWD/utils/; '
+        command += 'pushd %s &>/dev/null; ' % output_path
+        command += 'generate_plots.sh %s &>/dev/null; ' % casename
+        if self.options.get('convert', True):
+            command += '%s %s --convert .' % (quote(
+                sys.executable), quote(
+                    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'AnalyzeFioLogs.py')))
+            if self.options.get('keep_text_logs',
+                                self.runner.keep_text_logs):
+                command += ' --keep_text_logs'
+            command += ' &>/dev/null; '
+        command += 'popd &>/dev/null; '
+        return command
+
+
+@register_collector
+class HistCollector(Collector):
+    """Log the completion latency histograms in the intervals.
+
+    The histogram logs are decoded into the percentile series (such as the
+    p99 latency over time) by "AnalyzeFioLogs.py --hist_csv".
+
+    """
+
+    name = 'hist'
+    overhead = 'low'
+    outputs = ['%s_clat_hist.*.log']
+
+    def fio_options(self, casename, output_path):
+        prefix = output_path + os.sep + casename
+        options = ' --write_hist_log=%s' % prefix
+        options += ' --log_hist_msec=%s' % self.options.get(
+            'log_hist_msec', 1000)
+        options += ' --log_hist_coarseness=%s' % self.options.get(
+            'log_hist_coarseness', 0)
+        options += ' --per_job_logs=1'
+        return options
+
+
+@register_collector
+class DiskstatsCollector(SnapshotCollector):
+    """Collect the I/O statistics of block devices during fio."""
+
+    name = 'diskstats'
+    outputs = ['%s.diskstats.json']
+
+    def read(self):
+        return {'diskstats': read_proc_diskstats()}
+
+
+@register_collector
+class InterruptsCollector(SnapshotCollector):
+    """Collect the interrupts and softirqs during fio."""
+
+    name = 'interrupts'
+    outputs = ['%s.interrupts.json']
+
+    def read(self):
+        return {
+            'interrupts': read_proc_interrupts('/proc/interrupts'),
+            'softirqs': read_proc_interrupts('/proc/softirqs')
+        }
+
+
+@register_collector
+class PerfStatCollector(ProcessCollector):
+    """Count the system-wide hardware and software events during fio."""
+
+    name = 'perf'
+    outputs = ['%s.perfstat']
+    start_at = 'fio_started'
+    # perf writes the counts when interrupted
+    stop_signal = signal.SIGINT
+
+    def get_command(self, job, pid):
+        command = [
+            'perf', 'stat', '-a', '-x,', '-o', job['casename'] + '.perfstat'
+        ]
+        if self.options.get('events'):
+            command += ['-e', self.options['events']]
+        return command
+
+
+@register_collector
+class IostatCollector(ProcessCollector):
+    """Collect the extended device statistics by iostat during fio."""
+
+    name = 'iostat'
+    outputs = ['%s.iostat']
+    stdout_suffix = '.iostat'
+
+    def get_command(self, job, pid):
+        interval = self.options.get('interval', self.runner.sample_interval)
+        return ['iostat', '-dxmt', str(max(1, int(interval)))]
+
 
 class FioTestRunner:
     """FIO Test Runner.
@@ -109,9 +702,129 @@ class FioTestRunner:
                     Where the *.fiolog files will be saved to.
                 plots: bool
                     Generate bw/iops/lat logs and plots in their lifetime.
+                keep_text_logs: bool
+                    Keep the text bw/iops/lat logs in the tarball, they are
+                    converted into the binary format and removed by default.
                 dryrun: bool
                     Print the commands that would be executed, but do not
                     execute them.
+                scheduler: str
+                    How to schedule the jobs, 'serial' runs each job against
+                    all the targets in turn, 'device' splits the targets into
+                    per-device job streams and runs them concurrently.
+                    Example: 'serial', 'device'.
+                concurrency: int
+                    The maximum number of jobs running at the same time for
+                    the 'device' scheduler, '0' for the number of targets.
+                resume: bool
+                    Resume the campaign from the journal in log_path, skip
+                    the jobs whose tarball already exists and is valid.
+                steadystate: str
+                    [FIO] Terminate a job as soon as the steady state
+                    criterion is met, capped by runtime. None to disable.
+                    Example: 'iops_slope:0.1%', 'bw:2%'...
+                ss_dur: str
+                    [FIO] The duration of the rolling window to check the
+                    steady state criterion.
+                ss_ramp: str
+                    [FIO] The duration before checking the steady state
+                    criterion.
+                adaptive_rounds: bool
+                    Run 'min_rounds' rounds for each sub-case, then keep
+                    adding rounds until the confidence interval of the KPI
+                    is narrow enough, up to 'rounds' rounds.
+                min_rounds: int
+                    The minimal rounds for the adaptive rounds.
+                ci_width: float
+                    The target half width of the confidence interval in
+                    percent of the mean, for the adaptive rounds.
+                ci_level: float
+                    The confidence level, for the adaptive rounds.
+                adaptive_kpi: str
+                    The KPI to decide the adaptive rounds.
+                    Example: 'iops', 'bw', 'lat', 'clat90'.
+                sampler: str
+                    How to collect the system metrics during the fio test.
+                    Example: 'native', 'sar', 'none'.
+                sample_interval: float
+                    The interval in seconds to collect the system metrics.
+                status_interval: int
+                    [FIO] The interval in seconds to stream the fio status,
+                    '0' (by default) to disable it.
+                abort_zero_intervals: int
+                    Abort a job if its throughput stays zero for the
+                    specified number of status intervals, '0' to disable it.
+                abort_on_error: bool
+                    Abort a job as soon as fio reports errors.
+                precondition: bool
+                    Precondition the targets before running the jobs.
+                force_precondition: bool
+                    Precondition the targets even if they have been
+                    preconditioned by the same size and workload.
+                precondition_runtime: str
+                    [FIO] The maximum duration of the random writes for
+                    preconditioning.
+                precondition_steadystate: str
+                    [FIO] The steady state criterion of the random writes for
+                    preconditioning.
+                state_path: str
+                    Where the marker files of the preconditioned targets are
+                    saved to.
+                time_budget: str
+                    Prune the jobs to fit the campaign into the specified
+                    period of time. None to disable.
+                    Example: '8h', '90m'...
+                history_csv: str
+                    A test report of the previous campaign, to estimate the
+                    variance and throughput of each sub-case.
+                est_bw: float
+                    The estimated throughput in MiB/s of each device, for
+                    the sub-cases not in history_csv.
+                sweep: bool
+                    Run the load sweep instead of the closed-loop jobs, which
+                    searches the maximum IOPS under the latency SLO for each
+                    sub-case.
+                slo_percentile: float
+                    The percentile of the completion latency for the SLO.
+                slo_lat: float
+                    The latency SLO in ms.
+                rate_process: str
+                    [FIO] How the I/Os are issued at the offered load.
+                    Example: 'linear', 'poisson'.
+                sweep_start: int
+                    The offered IOPS of the first step of the load sweep.
+                sweep_precision: float
+                    Stop the load sweep when the knee is located within the
+                    specified percent of the offered IOPS.
+                postproc: str
+                    How to run the post-processing (plots, logs and tarball)
+                    of the jobs. 'sync' runs it right after each job,
+                    'deferred' runs it after the campaign, 'pinned' runs it
+                    in background on the CPUs excluded from fio.
+                    Example: 'sync', 'deferred', 'pinned'.
+                postproc_workers: int
+                    The number of workers for the post-processing, '0' for
+                    the number of postproc_cpus ('pinned') or all the CPUs.
+                postproc_cpus: str
+                    The CPUs for the 'pinned' post-processing, None for the
+                    last CPU.
+                    Example: '0', '0-1', '0,2'...
+                placement: str
+                    How to place the fio clones on the NUMA nodes. 'none'
+                    leaves it to the scheduler, 'local' pins them to the
+                    node of the target device (or spreads them if unknown),
+                    'spread' distributes the job streams over the nodes.
+                    Example: 'none', 'local', 'spread'.
+                collectors: list
+                    The instrumentation collectors of the fio jobs, each item
+                    is a name or a dict like {name: {option: value}}. The
+                    default derives from 'sampler' and 'plots'.
+                    Example: ['sampler', 'plots', {'perf': {'events':
+                    'cycles,instructions'}}].
+                group_reporting: bool
+                    [FIO] Report the fio clones as a whole. If disabled, fio
+                    reports the clones one by one, so that the reporter can
+                    break down the results and show the imbalance.
         Returns:
             None
 
@@ -251,6 +964,14 @@ class FioTestRunner:
         else:
             self.plots = params['plots']
 
+        if 'keep_text_logs' not in params:
+            self.keep_text_logs = False
+        elif not isinstance(params['keep_text_logs'], bool):
+            print('[ERROR] params[keep_text_logs] must be bool.')
+            exit(1)
+        else:
+            self.keep_text_logs = params['keep_text_logs']
+
         if 'dryrun' not in params:
             self.dryrun = False
         elif not isinstance(params['dryrun'], bool):
@@ -259,215 +980,2177 @@ class FioTestRunner:
         else:
             self.dryrun = params['dryrun']
 
-        # Init variables
-        self.jobs = []
-        self.path = ''
+        if 'scheduler' not in params:
+            self.scheduler = 'serial'
+        elif params['scheduler'] not in ('serial', 'device'):
+            print('[ERROR] params[scheduler] must be "serial" or "device".')
+            exit(1)
+        else:
+            self.scheduler = params['scheduler']
 
-        return None
+        if 'concurrency' not in params:
+            self.concurrency = 0
+        elif not isinstance(params['concurrency'],
+                            int) or params['concurrency'] < 0:
+            print('[ERROR] params[concurrency] must be an integer >= 0.')
+            exit(1)
+        else:
+            self.concurrency = params['concurrency']
 
-    def _split_tests(self):
-        """Split fio test parameters and create job list.
+        if 'resume' not in params:
+            self.resume = False
+        elif not isinstance(params['resume'], bool):
+            print('[ERROR] params[resume] must be bool.')
+            exit(1)
+        else:
+            self.resume = params['resume']
 
-        This function splits the parameters for running the fio tests.
+        if 'steadystate' not in params or params['steadystate'] is None:
+            self.steadystate = None
+        elif type(params['steadystate']) not in (type(u''), type(b'')):
+            print('[ERROR] params[steadystate] must be string.')
+            exit(1)
+        else:
+            self.steadystate = params['steadystate']
 
-        It will do Cartesian product with the following itmes:
-        - self.rounds
-        - self.bs_list
-        - self.iodepth_list
-        - self.rw_list
-        (Most often changing)
+        if 'ss_dur' not in params:
+            self.ss_dur = '30s'
+        elif type(params['ss_dur']) not in (type(u''), type(b'')):
+            print('[ERROR] params[ss_dur] must be string.')
+            exit(1)
+        else:
+            self.ss_dur = params['ss_dur']
 
-        Args:
-            None
+        if 'ss_ramp' not in params:
+            self.ss_ramp = '10s'
+        elif type(params['ss_ramp']) not in (type(u''), type(b'')):
+            print('[ERROR] params[ss_ramp] must be string.')
+            exit(1)
+        else:
+            self.ss_ramp = params['ss_ramp']
 
-        Returns:
-            None
+        if 'adaptive_rounds' not in params:
+            self.adaptive_rounds = False
+        elif not isinstance(params['adaptive_rounds'], bool):
+            print('[ERROR] params[adaptive_rounds] must be bool.')
+            exit(1)
+        else:
+            self.adaptive_rounds = params['adaptive_rounds']
+
+        if 'min_rounds' not in params:
+            self.min_rounds = min(3, self.rounds)
+        elif not isinstance(params['min_rounds'], int) or not (
+                2 <= params['min_rounds'] <= self.rounds):
+            print('[ERROR] params[min_rounds] must be an integer between 2 '
+                  'and params[rounds].')
+            exit(1)
+        else:
+            self.min_rounds = params['min_rounds']
 
-        Updates:
-            self.jobs: the job list.
+        if 'ci_width' not in params:
+            self.ci_width = 5.0
+        elif not isinstance(params['ci_width'],
+                            (int, float)) or params['ci_width'] <= 0:
+            print('[ERROR] params[ci_width] must be a number > 0.')
+            exit(1)
+        else:
+            self.ci_width = float(params['ci_width'])
 
-        """
-        # Overall parameters
-        self.path = os.path.expanduser(self.log_path)
+        if 'ci_level' not in params:
+            self.ci_level = 0.95
+        elif not isinstance(params['ci_level'], float) or not (
+                0 < params['ci_level'] < 1):
+            print('[ERROR] params[ci_level] must be a float between 0 and 1.')
+            exit(1)
+        else:
+            self.ci_level = params['ci_level']
 
-        # Technical Preview
-        support_idleness = True
-        support_sar = True
+        if 'adaptive_kpi' not in params:
+            self.adaptive_kpi = 'iops'
+        elif params['adaptive_kpi'] not in ('iops', 'bw', 'lat', 'clat90'):
+            print('[ERROR] params[adaptive_kpi] must be "iops", "bw", "lat" '
+                  'or "clat90".')
+            exit(1)
+        else:
+            self.adaptive_kpi = params['adaptive_kpi']
 
-        # Split parameters
-        param_tuples = itertools.product(list(range(1, self.rounds + 1)),
-                                         self.bs_list, self.iodepth_list,
-                                         self.rw_list)
+        if 'sampler' not in params:
+            self.sampler = 'native'
+        elif params['sampler'] not in ('native', 'sar', 'none'):
+            print('[ERROR] params[sampler] must be "native", "sar" or "none".')
+            exit(1)
+        else:
+            self.sampler = params['sampler']
 
-        # Generate command for all the tests
-        jobnum = 0
-        for param_tuple in param_tuples:
-            (rd, bs, iodepth, rw) = param_tuple
+        if 'sample_interval' not in params:
+            self.sample_interval = 1.0
+        elif not isinstance(params['sample_interval'],
+                            (int, float)) or params['sample_interval'] <= 0:
+            print('[ERROR] params[sample_interval] must be a number > 0.')
+            exit(1)
+        else:
+            self.sample_interval = float(params['sample_interval'])
 
-            command = pre_command = post_command = ''
+        if 'status_interval' not in params:
+            self.status_interval = 0
+        elif not isinstance(params['status_interval'],
+                            int) or params['status_interval'] < 0:
+            print('[ERROR] params[status_interval] must be an integer >= 0.')
+            exit(1)
+        else:
+            self.status_interval = params['status_interval']
+
+        if 'abort_zero_intervals' not in params:
+            self.abort_zero_intervals = 10
+        elif not isinstance(params['abort_zero_intervals'],
+                            int) or params['abort_zero_intervals'] < 0:
+            print('[ERROR] params[abort_zero_intervals] must be an integer '
+                  '>= 0.')
+            exit(1)
+        else:
+            self.abort_zero_intervals = params['abort_zero_intervals']
 
-            # Set case and log file name
-            casename = 'fio_%s_%s_%s_%s_%s_%s_%s_%s_%s_%s' % (
-                self.backend, self.driver, self.fs, self.ioengine, rw, bs,
-                iodepth, self.numjobs, rd,
-                time.strftime('%Y%m%d%H%M%S', time.localtime()))
-            output_path = self.path + os.sep + casename
-            output = output_path + os.sep + casename + '.fiolog'
+        if 'abort_on_error' not in params:
+            self.abort_on_error = True
+        elif not isinstance(params['abort_on_error'], bool):
+            print('[ERROR] params[abort_on_error] must be bool.')
+            exit(1)
+        else:
+            self.abort_on_error = params['abort_on_error']
 
-            # Build fio command
-            command = 'fio'
-            command += ' --name=%s' % casename
-            command += ' --filename=%s' % self.filename
-            command += ' --size=%s' % self.size
-            command += ' --ioengine=%s' % self.ioengine
-            command += ' --direct=%s' % self.direct
-            command += ' --rw=%s' % rw
-            command += ' --bs=%s' % bs
-            command += ' --iodepth=%s' % iodepth
-            command += ' --numjobs=%s' % self.numjobs
-            command += ' --time_based'
-            command += ' --runtime=%s' % self.runtime
-            command += ' --group_reporting'
-            command += ' --output-format=normal,json+'
-            command += ' --output=%s' % output
+        if 'precondition' not in params:
+            self.precondition = False
+        elif not isinstance(params['precondition'], bool):
+            print('[ERROR] params[precondition] must be bool.')
+            exit(1)
+        else:
+            self.precondition = params['precondition']
 
-            # Reuse 'description' to integrate some metadata
-            command += ' --description="%s"' % {
-                'backend': self.backend,
-                'driver': self.driver,
-                'format': self.fs,
-                'round': rd
-            }
+        if 'force_precondition' not in params:
+            self.force_precondition = False
+        elif not isinstance(params['force_precondition'], bool):
+            print('[ERROR] params[force_precondition] must be bool.')
+            exit(1)
+        else:
+            self.force_precondition = params['force_precondition']
 
-            # Technical Preview: Collect CPU idleness
-            if support_idleness and not support_sar:
-                command += ' --idle-prof=percpu'
+        if 'precondition_runtime' not in params:
+            self.precondition_runtime = '2h'
+        elif type(params['precondition_runtime']) not in (type(u''),
+                                                          type(b'')):
+            print('[ERROR] params[precondition_runtime] must be string.')
+            exit(1)
+        else:
+            self.precondition_runtime = params['precondition_runtime']
 
-            # Technical Preview: Wait before collection
-            command += ' --ramp_time=20'
+        if 'precondition_steadystate' not in params:
+            self.precondition_steadystate = 'iops:20%'
+        elif type(params['precondition_steadystate']) not in (type(u''),
+                                                              type(b'')):
+            print('[ERROR] params[precondition_steadystate] must be string.')
+            exit(1)
+        else:
+            self.precondition_steadystate = params['precondition_steadystate']
 
-            # Generate bw/iops/lat logs in their lifetime for the plots
-            if self.plots:
-                prefix = output_path + os.sep + casename
-                command += ' --write_bw_log=%s' % prefix
-                command += ' --write_iops_log=%s' % prefix
-                command += ' --write_lat_log=%s' % prefix
-                command += ' --log_avg_msec=500'
-                command += ' --per_job_logs=1'
+        if 'state_path' not in params:
+            self.state_path = '~/.virt_perf_scripts'
+        elif type(params['state_path']) not in (type(u''), type(b'')):
+            print('[ERROR] params[state_path] must be string.')
+            exit(1)
+        else:
+            self.state_path = params['state_path']
 
-            # Parse options only, don't start any I/O
-            # command += ' --parse-only'  # (comment this line for testing)
+        if 'time_budget' not in params or params['time_budget'] is None:
+            self.time_budget = None
+        elif type(params['time_budget']) not in (type(u''), type(b'')):
+            print('[ERROR] params[time_budget] must be string.')
+            exit(1)
+        else:
+            self.time_budget = params['time_budget']
 
-            # Set pre-command
-            pre_command += 'mkdir -p %s; cd %s; ' % (output_path, output_path)
-            # Drop caches
-            pre_command += 'sync; echo 3 > /proc/sys/vm/drop_caches; '
+        if 'history_csv' not in params or params['history_csv'] is None:
+            self.history_csv = None
+        elif type(params['history_csv']) not in (type(u''), type(b'')):
+            print('[ERROR] params[history_csv] must be string.')
+            exit(1)
+        else:
+            self.history_csv = params['history_csv']
 
-            # Technical Preview: SAR
-            if support_sar:
-                pre_command += 'sar -A 1 -o %s.sa &>/dev/null & ' % casename
-
-            # Set post-command
-            if self.plots:
-                post_command += 'export PATH=$PATH:$PWD/utils/; '
-                post_command += 'pushd %s &>/dev/null; ' % output_path
-                post_command += 'generate_plots.sh %s &>/dev/null; ' % casename
-                post_command += 'popd &>/dev/null; '
-
-            # Technical Preview: SAR
-            if support_sar:
-                post_command += 'pushd %s &>/dev/null; ' % output_path
-                post_command += 'killall sar; '
-                post_command += 'sar -f %s.sa -u > %s-sa_cpu.log; ' % (
-                    casename, casename)
-                post_command += 'popd &>/dev/null; '
-
-            # Log the fio command
-            post_command += 'pushd %s &>/dev/null; ' % output_path
-            post_command += 'echo %s > %s.cmd; ' % (command, casename)
-            post_command += 'popd &>/dev/null; '
-
-            # Collect log files and create tarball
-            post_command += 'pushd %s &>/dev/null' % output_path
-            post_command += ' && tar zcf %s.tar.gz *; ' % casename
-            post_command += 'popd &>/dev/null; '
-            post_command += 'mv -t %s %s/%s.tar.gz' % (self.path, output_path,
-                                                       casename)
-            post_command += ' && rm -r %s; ' % output_path
-
-            # save the current test command into jobs
-            jobnum += 1
-            self.jobs.append({
-                'jobnum': jobnum,
-                'command': command,
-                'pre_command': pre_command,
-                'post_command': post_command,
-                'status': 'NOTRUN',
-                'start': None,
-                'stop': None
-            })
+        if 'est_bw' not in params or params['est_bw'] is None:
+            self.est_bw = None
+        elif not isinstance(params['est_bw'],
+                            (int, float)) or params['est_bw'] <= 0:
+            print('[ERROR] params[est_bw] must be a number > 0.')
+            exit(1)
+        else:
+            self.est_bw = float(params['est_bw'])
 
-        return None
+        if 'sweep' not in params:
+            self.sweep = False
+        elif not isinstance(params['sweep'], bool):
+            print('[ERROR] params[sweep] must be bool.')
+            exit(1)
+        else:
+            self.sweep = params['sweep']
+
+        if 'slo_percentile' not in params:
+            self.slo_percentile = 99.0
+        elif not isinstance(params['slo_percentile'], (int, float)) or not (
+                0 < params['slo_percentile'] < 100):
+            print('[ERROR] params[slo_percentile] must be a number between 0 '
+                  'and 100.')
+            exit(1)
+        else:
+            self.slo_percentile = float(params['slo_percentile'])
 
-    def start(self):
-        """Start to run all tests in the job list."""
-        if not self.jobs:
-            self._split_tests()
+        if 'slo_lat' not in params:
+            self.slo_lat = 1.0
+        elif not isinstance(params['slo_lat'],
+                            (int, float)) or params['slo_lat'] <= 0:
+            print('[ERROR] params[slo_lat] must be a number > 0.')
+            exit(1)
+        else:
+            self.slo_lat = float(params['slo_lat'])
 
-        jobnum = 0
-        total_num = len(self.jobs)
-        for job in self.jobs:
-            # Show job information
-            jobnum += 1
-            start_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
-            print('-' * 50)
-            print('Current Job  : %s / %s' % (jobnum, total_num))
-            print('Current Time : %s' % start_time)
-            print('Pre Command  : %s' % job['pre_command'])
-            print('Test Command : %s' % job['command'])
-            print('Post Command : %s' % job['post_command'])
-            print('-' * 50)
-
-            if self.dryrun is False:
-                # Create log directory
-                if not os.path.exists(self.path):
-                    os.makedirs(self.path)
-
-                # Execute current test
-                os.system(job['pre_command'])
-                os.system(job['command'])
-                os.system(job['post_command'])
-            else:
-                time.sleep(0.2)
+        if 'rate_process' not in params:
+            self.rate_process = 'linear'
+        elif params['rate_process'] not in ('linear', 'poisson'):
+            print('[ERROR] params[rate_process] must be "linear" or '
+                  '"poisson".')
+            exit(1)
+        else:
+            self.rate_process = params['rate_process']
 
-            # Update jobs data
-            job['status'] = 'FINISH'
-            job['start'] = start_time
-            job['stop'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+        if 'sweep_start' not in params:
+            self.sweep_start = 1000
+        elif not isinstance(params['sweep_start'],
+                            int) or params['sweep_start'] < 1:
+            print('[ERROR] params[sweep_start] must be an integer >= 1.')
+            exit(1)
+        else:
+            self.sweep_start = params['sweep_start']
+
+        if 'sweep_precision' not in params:
+            self.sweep_precision = 5.0
+        elif not isinstance(params['sweep_precision'], (int, float)) or not (
+                0 < params['sweep_precision'] < 100):
+            print('[ERROR] params[sweep_precision] must be a number between 0 '
+                  'and 100.')
+            exit(1)
+        else:
+            self.sweep_precision = float(params['sweep_precision'])
 
-        return None
+        if 'postproc' not in params:
+            self.postproc = 'sync'
+        elif params['postproc'] not in ('sync', 'deferred', 'pinned'):
+            print('[ERROR] params[postproc] must be "sync", "deferred" or '
+                  '"pinned".')
+            exit(1)
+        else:
+            self.postproc = params['postproc']
 
+        if 'postproc_workers' not in params:
+            self.postproc_workers = 0
+        elif not isinstance(params['postproc_workers'],
+                            int) or params['postproc_workers'] < 0:
+            print('[ERROR] params[postproc_workers] must be an integer >= 0.')
+            exit(1)
+        else:
+            self.postproc_workers = params['postproc_workers']
 
-def get_cli_params(backend, driver, fs, rounds, filename, size, runtime,
-                   ioengine, direct, numjobs, rw_list, bs_list, iodepth_list,
-                   log_path, plots, dryrun):
-    """Get parameters from the CLI."""
-    cli_params = {}
+        if 'postproc_cpus' not in params or params['postproc_cpus'] is None:
+            self.postproc_cpus = None
+        elif type(params['postproc_cpus']) not in (type(u''), type(b''),
+                                                   int):
+            print('[ERROR] params[postproc_cpus] must be string.')
+            exit(1)
+        else:
+            self.postproc_cpus = str(params['postproc_cpus'])
 
-    if backend is not None:
-        cli_params['backend'] = backend
-    if driver is not None:
-        cli_params['driver'] = driver
-    if fs is not None:
-        cli_params['fs'] = fs
-    if rounds is not None:
-        cli_params['rounds'] = int(rounds)
-    if filename is not None:
-        cli_params['filename'] = filename
-    if size is not None:
-        cli_params['size'] = size
-    if runtime is not None:
-        cli_params['runtime'] = runtime
+        if 'placement' not in params:
+            self.placement = 'none'
+        elif params['placement'] not in ('none', 'local', 'spread'):
+            print('[ERROR] params[placement] must be "none", "local" or '
+                  '"spread".')
+            exit(1)
+        else:
+            self.placement = params['placement']
+
+        if 'group_reporting' not in params:
+            self.group_reporting = True
+        elif not isinstance(params['group_reporting'], bool):
+            print('[ERROR] params[group_reporting] must be bool.')
+            exit(1)
+        else:
+            self.group_reporting = params['group_reporting']
+
+        if 'collectors' not in params or params['collectors'] is None:
+            # Derive the collectors from the legacy switches
+            self.collectors = [{
+                'native': 'sampler',
+                'sar': 'sar',
+                'none': 'idleprof'
+            }[self.sampler]]
+        elif not isinstance(params['collectors'], list):
+            print('[ERROR] params[collectors] must be list.')
+            exit(1)
+        else:
+            self.collectors = list(params['collectors'])
+        if self.plots and 'plots' not in [
+                list(x)[0] if isinstance(x, dict) else x
+                for x in self.collectors
+        ]:
+            self.collectors.append('plots')
+
+        # Technical Preview
+        self.ramp_time = 20
+
+        # Create the collectors
+        self.collectors = [self._create_collector(x) for x in self.collectors]
+
+        # Split the CPUs between fio and the pinned post-processing
+        self.online_cpus = self._get_online_cpus()
+        if self.postproc_cpus is None:
+            self.postproc_cpus = str(self.online_cpus[-1])
+        if self.postproc == 'pinned':
+            self.fio_cpus = [
+                x for x in self.online_cpus
+                if x not in self._parse_cpu_list(self.postproc_cpus)
+            ]
+        else:
+            self.fio_cpus = self.online_cpus
+        if not self.fio_cpus:
+            print('[ERROR] params[postproc_cpus] must leave CPUs for fio.')
+            exit(1)
+
+        # Read the NUMA topology for the placement
+        if self.placement != 'none':
+            self.numa_nodes = self._get_numa_nodes()
+
+        # Init variables
+        self.jobs = []
+        self.path = os.path.expanduser(self.log_path)
+        self.journal = self.path + os.sep + 'fio_journal.json'
+        self.journal_lock = threading.Lock()
+        self.postproc_queue = queue.Queue()
+        self.postproc_threads = []
+
+        return None
+
+    def _create_collector(self, spec):
+        """Create a collector from its specification.
+
+        Args:
+            spec: str or dict, the name of a built-in collector (or a class
+                in 'module:Class' format), or a dict like {name: options}.
+
+        Returns:
+            The collector object.
+
+        """
+        options = {}
+        if isinstance(spec, dict) and len(spec) == 1:
+            (name, options) = list(spec.items())[0]
+            options = options or {}
+        else:
+            name = spec
+
+        if type(name) not in (type(u''), type(b'')) or not isinstance(
+                options, dict):
+            print('[ERROR] params[collectors] has an invalid item: %s' % spec)
+            exit(1)
+
+        if name in COLLECTORS:
+            cls = COLLECTORS[name]
+        elif ':' in name:
+            # Load the collector from an external module
+            (module, attr) = name.split(':', 1)
+            try:
+                cls = getattr(importlib.import_module(module), attr)
+            except (ImportError, AttributeError) as err:
+                print('[ERROR] Cannot load the collector "%s": %s' %
+                      (name, err))
+                exit(1)
+            if inspect.isabstract(cls):
+                print('[ERROR] The collector "%s" does not implement: %s.' %
+                      (name, ', '.join(sorted(cls.__abstractmethods__))))
+                exit(1)
+        else:
+            print('[ERROR] params[collectors] has an unknown collector "%s", '
+                  'the built-in ones are: %s.' %
+                  (name, ', '.join(sorted(COLLECTORS))))
+            exit(1)
+
+        return cls(self, options)
+
+    def _call_collectors(self, hook, job, *args):
+        """Call the specified hook of the collectors.
+
+        The time spent in the hooks is accumulated into the job as the
+        overhead of each collector, and the failure of a collector doesn't
+        affect the job.
+
+        Args:
+            hook: str, 'before_job', 'fio_started', 'fio_finished' or
+                'after_job'.
+            job: dict, the current job.
+            args: the other arguments of the hook.
+
+        Returns:
+            None
+
+        """
+        with self.journal_lock:
+            overhead = job.setdefault('collectors', {})
+        for collector in self.collectors:
+            begin = time.time()
+            try:
+                getattr(collector, hook)(job, *args)
+            except Exception as err:
+                print('[WARNING] Collector "%s" failed in %s: %s' %
+                      (collector.name, hook, err))
+            with self.journal_lock:
+                overhead[collector.name] = round(
+                    overhead.get(collector.name, 0) + time.time() - begin, 6)
+
+            # Check the outputs before they are packed
+            if hook == 'after_job':
+                for pattern in collector.outputs:
+                    if not glob.glob(job['output_path'] + os.sep +
+                                     pattern % job['casename']):
+                        print('[WARNING] Collector "%s" output "%s" is '
+                              'missing.' %
+                              (collector.name, pattern % job['casename']))
+
+        return None
+
+    def _get_online_cpus(self):
+        """Get the list of online CPUs."""
+        try:
+            with open('/sys/devices/system/cpu/online', 'r') as f:
+                return self._parse_cpu_list(f.read())
+        except (IOError, OSError, ValueError):
+            return list(range(multiprocessing.cpu_count()))
+
+    def _get_numa_nodes(self):
+        """Get the CPUs of each NUMA node which are available for fio.
+
+        Returns:
+            A dict like {node: [cpus]}, all the CPUs are considered as node 0
+            if the topology is unavailable.
+
+        """
+        nodes = {}
+        root = '/sys/devices/system/node'
+        try:
+            for name in os.listdir(root):
+                if not re.match(r'^node\d+$', name):
+                    continue
+                with open(os.path.join(root, name, 'cpulist'), 'r') as f:
+                    cpus = [
+                        x for x in self._parse_cpu_list(f.read())
+                        if x in self.fio_cpus
+                    ]
+                if cpus:
+                    nodes[int(name[4:])] = cpus
+        except (IOError, OSError, ValueError):
+            pass
+
+        return nodes or {0: list(self.fio_cpus)}
+
+    def _get_device_node(self, target):
+        """Get the NUMA node of the specified device.
+
+        The numa_node attribute is searched from the device of the block
+        device (the disk for a partition) up to its parents, such as the
+        PCI device of an NVMe namespace.
+
+        Args:
+            target: str, the block device, such as '/dev/nvme0n1'.
+
+        Returns:
+            The NUMA node, or None if unknown (e.g. a file).
+
+        """
+        name = os.path.basename(os.path.realpath(target))
+        path = os.path.realpath('/sys/class/block/%s' % name)
+        if os.path.exists(os.path.join(path, 'partition')):
+            path = os.path.dirname(path)
+
+        path = os.path.realpath(os.path.join(path, 'device'))
+        while path.startswith('/sys/devices/'):
+            try:
+                with open(os.path.join(path, 'numa_node'), 'r') as f:
+                    node = int(f.read())
+                return node if node in self.numa_nodes else None
+            except (IOError, OSError, ValueError):
+                path = os.path.dirname(path)
+
+        return None
+
+    def _get_placement(self, target):
+        """Get the placement of the fio clones against the specified target.
+
+        Args:
+            target: str, the disk(s) or file(s) to be tested by fio.
+
+        Returns:
+            A tuple of (policy, nodes), the policy is 'local' or 'spread'
+            and the nodes is the list of NUMA nodes to run the clones on.
+
+        """
+        targets = target.split(':')
+
+        if self.placement == 'local':
+            nodes = [self._get_device_node(x) for x in targets]
+            if None not in nodes:
+                return ('local', sorted(set(nodes)))
+
+        # Spread the job streams of different targets over the nodes
+        all_nodes = sorted(self.numa_nodes.keys())
+        if len(targets) > 1 or self.scheduler != 'device':
+            return ('spread', all_nodes)
+
+        index = self.filename.split(':').index(target)
+        return ('spread', [all_nodes[index % len(all_nodes)]])
+
+    def _parse_cpu_list(self, text):
+        """Parse the CPU list like "0-3,6" into [0, 1, 2, 3, 6]."""
+        cpus = []
+        for item in text.strip().split(','):
+            if '-' in item:
+                (first, last) = item.split('-')
+                cpus.extend(range(int(first), int(last) + 1))
+            elif item:
+                cpus.append(int(item))
+
+        return sorted(set(cpus))
+
+    def _split_tests(self):
+        """Split fio test parameters and create job list.
+
+        This function splits the parameters for running the fio tests.
+
+        It will do Cartesian product with the following itmes:
+        - self.rounds
+        - self.bs_list
+        - self.iodepth_list
+        - self.rw_list
+        (Most often changing)
+
+        For the 'device' scheduler, each sub-case is further split into one
+        job per target, these jobs make up a wave and can run concurrently.
+
+        For the adaptive rounds, only the first 'min_rounds' rounds are
+        split here, the others will be added on demand.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Updates:
+            self.jobs: the job list.
+
+        """
+        # Split parameters
+        rounds = self.min_rounds if self.adaptive_rounds else self.rounds
+        param_tuples = itertools.product(list(range(1, rounds + 1)),
+                                         self.bs_list, self.iodepth_list,
+                                         self.rw_list)
+
+        # Generate command for all the tests
+        for param_tuple in param_tuples:
+            (rd, bs, iodepth, rw) = param_tuple
+            self._append_jobs(rd, bs, iodepth, rw)
+
+        return None
+
+    def _append_jobs(self, rd, bs, iodepth, rw, rate_iops=None):
+        """Append a wave of jobs for the specified sub-case and round.
+
+        Args:
+            rd, bs, iodepth, rw: the parameters of this sub-case.
+            rate_iops: int, the offered IOPS for the load sweep.
+
+        Returns:
+            None
+
+        Updates:
+            self.jobs: the job list.
+
+        """
+        # Split the targets into per-device job streams if needed
+        if self.scheduler == 'device':
+            targets = self.filename.split(':')
+        else:
+            targets = [self.filename]
+
+        wave = self.jobs[-1]['wave'] + 1 if self.jobs else 0
+        for target in targets:
+            job = self._create_job(len(self.jobs) + 1, wave, target, rd, bs,
+                                   iodepth, rw, rate_iops)
+            self.jobs.append(job)
+
+        return None
+
+    def _create_job(self, jobnum, wave, target, rd, bs, iodepth, rw,
+                    rate_iops=None):
+        """Create a job for the specified sub-case.
+
+        Args:
+            jobnum: int, the number of this job.
+            wave: int, the jobs in the same wave can run concurrently.
+            target: str, the disk(s) or file(s) to be tested by fio.
+            rd, bs, iodepth, rw: the parameters of this sub-case.
+            rate_iops: int, the offered IOPS of the target for the load
+                sweep, None for the closed-loop job.
+
+        Returns:
+            The job in Python dict format.
+
+        """
+        command = pre_command = post_command = ''
+
+        # Set case and log file name
+        fields = [
+            self.backend, self.driver, self.fs, self.ioengine, rw, bs, iodepth,
+            self.numjobs
+        ]
+        if self.scheduler == 'device':
+            # Tag the case with its device, such as "dev-nvme1n1"
+            fields.append(re.sub(r'[^\w.]+', '-', target.strip('/')))
+        if rate_iops:
+            # Tag the case with its offered load, such as "rate12000"
+            fields.append('rate%s' % rate_iops)
+        fields.append(rd)
+        fields.append(time.strftime('%Y%m%d%H%M%S', time.localtime()))
+        casename = 'fio_' + '_'.join([str(x) for x in fields])
+        output_path = self.path + os.sep + casename
+        output = output_path + os.sep + casename + '.fiolog'
+
+        # Build fio command
+        command = 'fio'
+        command += ' --name=%s' % casename
+        command += ' --filename=%s' % target
+        command += ' --size=%s' % self.size
+        command += ' --ioengine=%s' % self.ioengine
+        command += ' --direct=%s' % self.direct
+        command += ' --rw=%s' % rw
+        command += ' --bs=%s' % bs
+        command += ' --iodepth=%s' % iodepth
+        command += ' --numjobs=%s' % self.numjobs
+        command += ' --time_based'
+        command += ' --runtime=%s' % self.runtime
+        if self.group_reporting:
+            command += ' --group_reporting'
+        command += ' --output-format=normal,json+'
+        if self.status_interval:
+            # The outputs are streamed to the runner and saved by itself
+            command += ' --status-interval=%s' % self.status_interval
+        else:
+            command += ' --output=%s' % output
+
+        # Reuse 'description' to integrate some metadata
+        description = {
+            'backend': self.backend,
+            'driver': self.driver,
+            'format': self.fs,
+            'round': rd,
+            'target': target
+        }
+        if self.steadystate:
+            description['steadystate'] = self.steadystate
+        if self.placement != 'none':
+            (policy, nodes) = self._get_placement(target)
+            description['placement'] = policy
+            description['numa_nodes'] = ','.join([str(x) for x in nodes])
+
+        # The offered IOPS is shared by the clones and the directions of the
+        # mixed workloads, report the actual value after rounding
+        if rate_iops:
+            directions = self._get_min_rate(rw) // self.numjobs
+            rate = rate_iops // self.numjobs // directions
+            description['mode'] = 'sweep'
+            description['rate_iops'] = rate * self.numjobs * directions
+            description['slo_percentile'] = self.slo_percentile
+            description['slo_lat'] = self.slo_lat
+        command += ' --description="%s"' % description
+
+        # Drive the load open-loop at the offered IOPS
+        if rate_iops:
+            command += ' --rate_iops=%s' % ','.join([str(rate)] * directions)
+            command += ' --rate_process=%s' % self.rate_process
+            percentiles = [90.0, self.slo_percentile]
+            command += ' --percentile_list=%s' % ':'.join(
+                ['%g' % x for x in sorted(set(percentiles))])
+
+        # Terminate the job once steady state is reached, the attained flag
+        # and the duration will be recorded into the json outputs by fio
+        if self.steadystate:
+            command += ' --steadystate=%s' % self.steadystate
+            command += ' --ss_dur=%s' % self.ss_dur
+            command += ' --ss_ramp=%s' % self.ss_ramp
+
+        # Technical Preview: Wait before collection
+        command += ' --ramp_time=%s' % self.ramp_time
+
+        # Place the clones on the CPUs of the NUMA nodes, one CPU for each
+        # clone, and allocate the memory from the local node
+        if self.placement != 'none':
+            cpus = []
+            for node in nodes:
+                cpus.extend(self.numa_nodes[node])
+            command += ' --cpus_allowed=%s' % ','.join([str(x) for x in cpus])
+            command += ' --cpus_allowed_policy=split'
+            command += ' --numa_mem_policy=local'
+
+        # Keep fio away from the CPUs of the pinned post-processing
+        elif self.postproc == 'pinned':
+            command += ' --cpus_allowed=%s' % ','.join(
+                [str(x) for x in self.fio_cpus])
+
+        # Add the options of the collectors
+        for collector in self.collectors:
+            command += collector.fio_options(casename, output_path)
+
+        # Parse options only, don't start any I/O
+        # command += ' --parse-only'  # (comment this line for testing)
+
+        # Set pre-command
+        pre_command += 'mkdir -p %s; cd %s; ' % (output_path, output_path)
+        # Drop caches, which is done once per wave by _run_waves() for the
+        # 'device' scheduler, so that the running jobs are not disturbed
+        if self.scheduler == 'serial':
+            pre_command += 'sync; echo 3 > /proc/sys/vm/drop_caches; '
+
+        # Set post-command
+        for collector in self.collectors:
+            post_command += collector.postproc_command(casename, output_path)
+
+        # Log the fio command
+        post_command += 'pushd %s &>/dev/null; ' % output_path
+        post_command += 'echo %s > %s.cmd; ' % (command, casename)
+        post_command += 'popd &>/dev/null; '
+
+        # Collect log files and create tarball, the members are sorted in C
+        # locale, so that the fio logs ("<casename>_*") are stored after the
+        # fiolog and the CPU usage, and the reports can stop reading early
+        post_command += 'pushd %s &>/dev/null' % output_path
+        post_command += ' && (export LC_ALL=C; tar zcf %s.tar.gz *); ' % (
+            casename)
+        post_command += 'popd &>/dev/null; '
+        post_command += 'mv -t %s %s/%s.tar.gz' % (self.path, output_path,
+                                                   casename)
+        post_command += ' && rm -r %s; ' % output_path
+
+        # Save the current test command into job
+        return {
+            'jobnum': jobnum,
+            'wave': wave,
+            'target': target,
+            'round': rd,
+            'bs': bs,
+            'iodepth': iodepth,
+            'rw': rw,
+            'casename': casename,
+            'output_path': output_path,
+            'tarball': self.path + os.sep + casename + '.tar.gz',
+            'command': command,
+            'pre_command': pre_command,
+            'post_command': post_command,
+            'rate_iops': rate_iops,
+            'collectors': dict([(x.name, 0) for x in self.collectors]),
+            'status': 'NOTRUN',
+            'start': None,
+            'stop': None,
+            'reason': None,
+            'kpis': None
+        }
+
+    def _save_journal(self):
+        """Save the job list and the status of jobs into the journal.
+
+        The journal is written to a temporary file and then renamed, so that
+        it is always complete even if the guest crashes during the writing.
+
+        Returns:
+            None
+
+        """
+        if self.dryrun:
+            return None
+
+        with self.journal_lock:
+            content = json.dumps({'log_path': self.log_path,
+                                  'jobs': self.jobs},
+                                 indent=4)
+            with open(self.journal + '.tmp', 'w') as f:
+                f.write(content)
+            os.rename(self.journal + '.tmp', self.journal)
+
+        return None
+
+    def _get_raw_data_from_tarball(self, tarball):
+        """Get the raw data from the fiolog in the specified tarball.
+
+        Args:
+            tarball: str, the path to the tarball.
+
+        Returns:
+            The raw data in Python dict format, or None if the tarball
+            doesn't contain a fiolog with a valid json block.
+
+        """
+        if not os.path.isfile(tarball):
+            return None
+
+        try:
+            with tarfile.open(tarball, 'r:gz') as tar:
+                for member in tar:
+                    if member.name.endswith('.fiolog'):
+                        # The json block may start at the beginning
+                        content = '\n' + tar.extractfile(
+                            member).read().decode()
+                        begin = content.index('\n{') + 1
+                        end = content.index('\n}', begin) + 2
+                        return json.loads(content[begin:end])
+        except Exception:
+            pass
+
+        return None
+
+    def _is_valid_tarball(self, tarball):
+        """Check if the specified tarball is a complete fio test result."""
+        return self._get_raw_data_from_tarball(tarball) is not None
+
+    def _get_raw_data_from_fiolog(self, fiolog):
+        """Get the raw data from the specified fiolog.
+
+        Args:
+            fiolog: str, the path to the fiolog.
+
+        Returns:
+            The raw data in Python dict format, or None if the fiolog
+            doesn't contain a valid json block.
+
+        """
+        try:
+            with open(fiolog, 'r') as f:
+                content = '\n' + f.read()
+            begin = content.index('\n{') + 1
+            end = content.index('\n}', begin) + 2
+            return json.loads(content[begin:end])
+        except Exception:
+            pass
+
+        return None
+
+    def _get_job_raw_data(self, job):
+        """Get the raw data of the specified job.
+
+        The raw data is read from the tarball, or from the fiolog in the
+        output path if the post-processing is still pending.
+
+        """
+        raw_data = self._get_raw_data_from_tarball(job['tarball'])
+        if raw_data is None:
+            raw_data = self._get_raw_data_from_fiolog(job['output_path'] +
+                                                      os.sep +
+                                                      job['casename'] +
+                                                      '.fiolog')
+
+        return raw_data
+
+    def _get_job_kpis(self, job):
+        """Get the performance KPIs of the specified finished job.
+
+        The KPIs are extracted by GenerateTestReport.py, so that they are
+        exactly the same as the ones in the test report.
+
+        Args:
+            job: dict, the finished job.
+
+        Returns:
+            The performance KPIs in Python dict format, or None if failed.
+
+        """
+        if job.get('kpis') is None:
+            from GenerateTestReport import FioTestReporter
+
+            raw_data = self._get_job_raw_data(job)
+            if raw_data is None:
+                return None
+
+            (result, perf_kpi) = FioTestReporter()._get_kpis_from_raw_data(
+                raw_data)
+            if result == 0:
+                job['kpis'] = perf_kpi
+
+        return job['kpis']
+
+    def _get_confidence_interval(self, values):
+        """Get the half width of the confidence interval in percent.
+
+        Args:
+            values: list, the samples of the KPI.
+
+        Returns:
+            The half width of the confidence interval in percent of the mean.
+
+        """
+        from scipy.stats import t
+
+        n = len(values)
+        mean = sum(values) / float(n)
+        if mean == 0:
+            return 0.0
+
+        stdev = (sum([(x - mean)**2 for x in values]) / (n - 1.0))**0.5
+        half_width = t.ppf((1 + self.ci_level) / 2.0, n - 1) * stdev / n**0.5
+
+        return abs(half_width / mean * 100)
+
+    def _is_subcase_converged(self, bs, iodepth, rw):
+        """Check if the confidence interval of the sub-case is narrow enough.
+
+        For the 'device' scheduler, all the targets should be converged.
+
+        Args:
+            bs, iodepth, rw: the parameters of this sub-case.
+
+        Returns:
+            True if converged, otherwise False.
+
+        """
+        samples = {}
+        for job in self.jobs:
+            if (job['bs'], job['iodepth'], job['rw']) != (bs, iodepth, rw):
+                continue
+            if job['status'] not in ('FINISH', 'MEASURED'):
+                continue
+
+            kpis = self._get_job_kpis(job)
+            if kpis is not None:
+                samples.setdefault(job['target'], []).append(
+                    kpis[self.adaptive_kpi])
+
+        converged = True
+        for (target, values) in samples.items():
+            if len(values) < 2:
+                converged = False
+                continue
+
+            width = self._get_confidence_interval(values)
+            print('[NOTE] Sub-case (%s, %s, %s) on "%s": %s rounds, %s CI '
+                  '+/-%.2f%% (target %.2f%%).' %
+                  (rw, bs, iodepth, target, len(values), self.adaptive_kpi,
+                   width, self.ci_width))
+            if width > self.ci_width:
+                converged = False
+
+        return converged and len(samples) > 0
+
+    def _load_journal(self):
+        """Load the job list from the journal for resuming.
+
+        The jobs with a valid tarball are marked as 'FINISH' and will be
+        skipped. The jobs measured but not post-processed yet are marked as
+        'MEASURED' and will be post-processed again. Other jobs are reset to
+        'NOTRUN', and their incomplete outputs are removed.
+
+        Returns:
+            0: Passed
+            1: Failed
+
+        Updates:
+            self.jobs: the job list.
+
+        """
+        try:
+            with open(self.journal, 'r') as f:
+                self.jobs = json.load(f)['jobs']
+        except Exception as err:
+            print('[WARNING] Fail to load the journal "%s". %s' %
+                  (self.journal, err))
+            return 1
+
+        finished = 0
+        for job in self.jobs:
+            if self._is_valid_tarball(job['tarball']):
+                job['status'] = 'FINISH'
+                finished += 1
+                continue
+
+            if job['status'] == 'MEASURED' and self._get_job_raw_data(job):
+                print('[WARNING] Job %s was not post-processed, queue it '
+                      'again.' % job['jobnum'])
+                finished += 1
+                continue
+
+            if job['status'] != 'NOTRUN':
+                print('[WARNING] Job %s was interrupted, run it again.' %
+                      job['jobnum'])
+            job['status'] = 'NOTRUN'
+            job['start'] = job['stop'] = job['reason'] = None
+            for path in (job['output_path'], job['tarball']):
+                os.system('[ -e {0} ] && rm -rf {0}'.format(path))
+
+        print('[NOTE] Resume from the journal "%s", %s / %s jobs finished.' %
+              (self.journal, finished, len(self.jobs)))
+
+        return 0
+
+    def _show_job(self, job):
+        """Show the information of the specified job."""
+        print('-' * 50)
+        print('Current Job  : %s / %s' % (job['jobnum'], len(self.jobs)))
+        print('Current Time : %s' %
+              time.strftime('%Y-%m-%d %H:%M:%S', time.localtime()))
+        print('Pre Command  : %s' % job['pre_command'])
+        print('Test Command : %s' % job['command'])
+        print('Post Command : %s' % job['post_command'])
+        print('Collectors   : %s' % ', '.join(
+            ['%s (%s)' % (x.name, x.overhead) for x in self.collectors]))
+        print('-' * 50)
+
+        return None
+
+    def _run_job(self, job):
+        """Run the specified job and update its status.
+
+        The job is updated under the journal lock, since the journal may be
+        saved by the other threads (such as the concurrent jobs and the
+        post-processing) in the meantime.
+
+        """
+        with self.journal_lock:
+            job['status'] = 'RUNNING'
+            job['start'] = time.strftime('%Y-%m-%d %H:%M:%S',
+                                         time.localtime())
+        self._save_journal()
+
+        # Execute current test
+        os.system(job['pre_command'])
+        self._call_collectors('before_job', job)
+        reason = self._run_fio(job)
+
+        # Update jobs data
+        with self.journal_lock:
+            job['status'] = 'ABORTED' if reason else 'MEASURED'
+            job['reason'] = reason
+            job['stop'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+        if self.adaptive_rounds and job['status'] == 'MEASURED':
+            self._get_job_kpis(job)
+        self._save_journal()
+
+        # Post-process the job or queue it
+        if self.postproc == 'sync':
+            self._run_postproc(job)
+        else:
+            self.postproc_queue.put(job)
+
+        return None
+
+    def _run_postproc(self, job):
+        """Run the post-processing of the specified job.
+
+        The post-processing time is recorded into the journal and logged
+        into 'fio_postproc.log' in the log path.
+
+        Args:
+            job: dict, the measured job.
+
+        Returns:
+            None
+
+        """
+        begin = time.time()
+        self._call_collectors('after_job', job)
+        if self.postproc == 'pinned':
+            os.system('taskset -c %s sh -c %s' %
+                      (self.postproc_cpus, quote(job['post_command'])))
+        else:
+            os.system(job['post_command'])
+        seconds = round(time.time() - begin, 3)
+
+        with self.journal_lock:
+            if job['status'] == 'MEASURED':
+                job['status'] = 'FINISH'
+            job['postproc'] = {'mode': self.postproc, 'seconds': seconds}
+            with open(self.path + os.sep + 'fio_postproc.log', 'a') as f:
+                f.write('%s %s %s %.3f\n' %
+                        (job['jobnum'], job['casename'], self.postproc,
+                         seconds))
+        self._save_journal()
+
+        return None
+
+    def _start_postproc_workers(self):
+        """Start the workers to consume the post-processing queue."""
+        if self.postproc_workers > 0:
+            count = self.postproc_workers
+        elif self.postproc == 'pinned':
+            count = len(self._parse_cpu_list(self.postproc_cpus))
+        else:
+            count = len(self.online_cpus)
+
+        def worker():
+            while True:
+                job = self.postproc_queue.get()
+                if job is None:
+                    return
+                self._run_postproc(job)
+
+        for x in range(count):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            self.postproc_threads.append(thread)
+
+        return None
+
+    def _finish_postproc(self):
+        """Wait for the post-processing queue to be drained.
+
+        The workers of the 'deferred' post-processing start here, after all
+        the measurements are done.
+
+        """
+        if self.postproc == 'deferred':
+            print('[NOTE] Run the deferred post-processing of %s jobs.' %
+                  self.postproc_queue.qsize())
+            self._start_postproc_workers()
+
+        for thread in self.postproc_threads:
+            self.postproc_queue.put(None)
+        for thread in self.postproc_threads:
+            thread.join()
+        self.postproc_threads = []
+
+        # Summarize the post-processing time
+        seconds = sum([
+            x['postproc']['seconds'] for x in self.jobs if 'postproc' in x
+        ])
+        print('[NOTE] Post-processing (%s): %.1fs in total, %.1fs in the '
+              'measurement loop.' %
+              (self.postproc, seconds,
+               seconds if self.postproc == 'sync' else 0))
+
+        return None
+
+    def _run_fio(self, job):
+        """Run the fio command of the specified job.
+
+        The collectors are called right after the fio process is started and
+        right after it exits, so that their data cover exactly the job.
+
+        Args:
+            job: dict, the job to be run.
+
+        Returns:
+            The reason if the job was aborted, otherwise None.
+
+        """
+        reason = None
+        try:
+            if self.status_interval:
+                process = subprocess.Popen(shlex.split(job['command']),
+                                           stdout=subprocess.PIPE,
+                                           universal_newlines=True)
+                self._call_collectors('fio_started', job, process.pid)
+                reason = self._ingest_fio_status(job, process)
+            else:
+                process = subprocess.Popen(shlex.split(job['command']))
+                self._call_collectors('fio_started', job, process.pid)
+            process.wait()
+        finally:
+            self._call_collectors('fio_finished', job)
+
+        return reason
+
+    def _ingest_fio_status(self, job, process):
+        """Ingest the fio outputs as they stream in.
+
+        fio dumps its outputs (a json block and the normal text) every
+        status interval. This function parses each json block, shows the
+        live KPIs and aborts the job when the throughput drops to zero or
+        errors appear. The interval samples are saved to
+        '<casename>.status.jsonl', and the last dump (the final result) is
+        saved to '<casename>.fiolog' as if 'fio --output' were used.
+
+        An aborted job saves its outputs to '<casename>.aborted.log' instead,
+        so that it will not be reported and will be run again on resuming.
+
+        Args:
+            job: dict, the running job.
+            process: subprocess.Popen, the fio process with stdout piped.
+
+        Returns:
+            The reason if the job was aborted, otherwise None.
+
+        """
+        prefix = job['output_path'] + os.sep + job['casename']
+        preamble, block, final, trailer = [], None, None, []
+        last = {'time': time.time()}
+        zero_count = 0
+        reason = None
+
+        with open(prefix + '.status.jsonl', 'w') as f:
+            for line in iter(process.stdout.readline, ''):
+                # Split the outputs into json blocks and text
+                if block is None:
+                    if line.startswith('{'):
+                        block = [line]
+                    elif final is None:
+                        preamble.append(line)
+                    else:
+                        trailer.append(line)
+                    continue
+
+                block.append(line)
+                if not line.startswith('}'):
+                    continue
+
+                try:
+                    sample = self._get_status_sample(
+                        json.loads(''.join(block)), last)
+                except (ValueError, KeyError, IndexError):
+                    print('[WARNING] Job %s: fail to parse the fio status.' %
+                          job['jobnum'])
+                    block = None
+                    continue
+
+                final, block, trailer, last = ''.join(block), None, [], sample
+                f.write(json.dumps(sample) + '\n')
+                f.flush()
+                self._show_status(job, sample)
+
+                # Abort the job once, fio dumps the final outputs on exiting
+                if reason:
+                    continue
+                if self.abort_on_error and sample['error']:
+                    reason = 'fio reported error %s' % sample['error']
+                if sample['elapsed'] > self.ramp_time and sample['ios'] == 0:
+                    zero_count += 1
+                else:
+                    zero_count = 0
+                if self.abort_zero_intervals and (zero_count >=
+                                                  self.abort_zero_intervals):
+                    reason = 'zero throughput for %s intervals' % zero_count
+                if reason:
+                    print('[WARNING] Job %s: %s, abort it.' %
+                          (job['jobnum'], reason))
+                    process.terminate()
+
+        if final is not None:
+            output = prefix + ('.aborted.log' if reason else '.fiolog')
+            with open(output, 'w') as f:
+                f.write(''.join(preamble) + final + ''.join(trailer))
+
+        return reason
+
+    def _get_status_sample(self, raw_data, last):
+        """Get the interval sample from a fio status dump.
+
+        The counters in the fio outputs are cumulative, so the interval KPIs
+        are derived from the deltas against the last sample.
+
+        Args:
+            raw_data: dict, the fio status dump in json format.
+            last: dict, the last sample.
+
+        Returns:
+            The sample in Python dict format, the 'iops', 'bw' (KiB/s) and
+            'lat' (us) are of the interval.
+
+        Updates:
+            The clones reported one by one (without group reporting) are
+            summed up into a single sample.
+
+        """
+        jobs = raw_data['jobs']
+        sample = {
+            'time': time.time(),
+            'elapsed': max([x.get('elapsed', 0) for x in jobs]),
+            'error': max([x.get('error', 0) or x.get('total_err', 0)
+                          for x in jobs])
+        }
+        seconds = max(sample['time'] - last['time'], 1e-6)
+
+        ios = 0
+        for rw in ('read', 'write'):
+            total_ios = sum([x[rw]['total_ios'] for x in jobs])
+            lat_sum = sum([
+                x[rw].get('lat_ns', {}).get('mean', 0.0) * x[rw]['total_ios']
+                for x in jobs
+            ])
+            current = {
+                'total_ios': total_ios,
+                'io_bytes': sum([x[rw]['io_bytes'] for x in jobs]),
+                'lat_mean': lat_sum / total_ios if total_ios else 0.0
+            }
+            previous = last.get(rw, {'total_ios': 0, 'io_bytes': 0,
+                                     'lat_mean': 0.0})
+
+            # The counters are reset after the ramp time
+            if current['total_ios'] < previous['total_ios']:
+                previous = {'total_ios': 0, 'io_bytes': 0, 'lat_mean': 0.0}
+
+            delta = current['total_ios'] - previous['total_ios']
+            current['iops'] = delta / seconds
+            current['bw'] = (current['io_bytes'] -
+                             previous['io_bytes']) / 1024.0 / seconds
+            if delta > 0:
+                current['lat'] = (
+                    current['lat_mean'] * current['total_ios'] -
+                    previous['lat_mean'] * previous['total_ios']
+                ) / delta / 1000.0
+            else:
+                current['lat'] = 0.0
+
+            sample[rw] = current
+            ios += delta
+
+        sample['ios'] = ios
+
+        return sample
+
+    def _show_status(self, job, sample):
+        """Show the live KPIs of the job and the ETA of the campaign."""
+        read, write = sample['read'], sample['write']
+        iops = read['iops'] + write['iops']
+        lat = (read['lat'] * read['iops'] +
+               write['lat'] * write['iops']) / iops if iops else 0.0
+
+        print('[STATUS] Job %s / %s: %4ss, IOPS %.0f, BW %.1f MiB/s, LAT '
+              '%.1f us, ETA %s' %
+              (job['jobnum'], len(self.jobs), sample['elapsed'], iops,
+               (read['bw'] + write['bw']) / 1024.0, lat,
+               self._get_eta(sample['elapsed'])))
+
+        return None
+
+    def _get_eta(self, elapsed):
+        """Estimate the remaining time of the campaign.
+
+        Args:
+            elapsed: int, the elapsed seconds of the current job.
+
+        Returns:
+            The remaining time in "H:MM:SS" format.
+
+        """
+        duration = self._parse_time(self.runtime) + self.ramp_time
+
+        # The jobs against different devices run concurrently
+        pending = len([x for x in self.jobs if x['status'] == 'NOTRUN'])
+        seconds = max(0, duration - elapsed) + (duration * pending //
+                                                self._get_parallelism())
+
+        return self._format_seconds(seconds)
+
+    def _parse_time(self, value):
+        """Parse the time string of fio into seconds.
+
+        Args:
+            value: str or int, such as "1m", "30s" or "90" (in seconds).
+
+        Returns:
+            The time in seconds.
+
+        """
+        units = {'us': 1e-6, 'ms': 1e-3, 's': 1, 'm': 60, 'h': 3600,
+                 'd': 86400}
+
+        match = re.match(r'^\s*(\d+(?:\.\d+)?)\s*(us|ms|s|m|h|d)?\s*$',
+                         str(value).lower())
+        if not match:
+            print('[WARNING] Fail to parse the time "%s".' % value)
+            return 0
+
+        return float(match.group(1)) * units[match.group(2) or 's']
+
+    def _run_jobs_concurrently(self, jobs):
+        """Run the specified jobs concurrently.
+
+        This function runs the jobs in a pool of threads, the size of the
+        pool is limited by self.concurrency.
+
+        Args:
+            jobs: list, the jobs to be run.
+
+        Returns:
+            None
+
+        """
+        if self.concurrency > 0:
+            limit = min(self.concurrency, len(jobs))
+        else:
+            limit = len(jobs)
+
+        pending = list(jobs)
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    job = pending.pop(0)
+                self._run_job(job)
+
+        threads = [threading.Thread(target=worker) for x in range(limit)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return None
+
+    def start(self):
+        """Start to run all tests in the job list."""
+        if self.resume and not self.jobs:
+            if self._load_journal():
+                print('[WARNING] Start a new campaign instead.')
+
+        if not self.jobs and self.sweep:
+            # The first step of the load sweep, others are added on demand
+            for (bs, iodepth, rw) in itertools.product(
+                    self.bs_list, self.iodepth_list, self.rw_list):
+                self._append_jobs(1, bs, iodepth, rw,
+                                  max(self.sweep_start,
+                                      self._get_min_rate(rw)))
+
+        if not self.jobs:
+            self._split_tests()
+
+            # Prune the jobs to fit the time budget
+            if self.time_budget:
+                self._prune_jobs()
+
+        # Create log directory
+        if self.dryrun is False and not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+        # Journal the jobs before running them
+        self._save_journal()
+
+        # Precondition the devices before the matrix, the results are
+        # meaningless if any of the devices is not preconditioned
+        if self.precondition and self._precondition():
+            print('[ERROR] The jobs are not run since the preconditioning '
+                  'failed.')
+            exit(1)
+
+        # Show the plan instead of running the jobs
+        if self.dryrun:
+            for job in self.jobs:
+                self._show_job(job)
+            self._show_plan()
+            return None
+
+        # Start the post-processing workers, and queue the jobs which were
+        # measured but not post-processed before resuming
+        if self.postproc == 'pinned':
+            self._start_postproc_workers()
+        for job in self.jobs:
+            if job['status'] == 'MEASURED':
+                if self.postproc == 'sync':
+                    self._run_postproc(job)
+                else:
+                    self.postproc_queue.put(job)
+
+        # Run the jobs
+        self._run_waves()
+
+        # Search the knee of the SLO for the load sweep
+        if self.sweep:
+            self._run_sweeps()
+
+        # Add rounds to the sub-cases until they are converged
+        elif self.adaptive_rounds:
+            self._run_adaptive_rounds()
+
+        # Drain the post-processing queue
+        self._finish_postproc()
+
+        return None
+
+    def _get_precondition_workload(self):
+        """Get the workload of preconditioning.
+
+        The workload is a sequential fill of the whole size, followed by
+        random writes until the steady state is reached (capped by
+        self.precondition_runtime). The marker file is valid only if it was
+        created by exactly the same workload.
+
+        Returns:
+            The workload in Python dict format.
+
+        """
+        return {
+            'fill': {'rw': 'write', 'bs': '128k', 'iodepth': 32,
+                     'numjobs': 1},
+            'steady': {'rw': 'randwrite', 'bs': '4k', 'iodepth': 32,
+                       'numjobs': 4},
+            'steadystate': self.precondition_steadystate,
+            'ss_dur': '300s',
+            'ss_ramp': '60s',
+            'runtime': self.precondition_runtime,
+            'ioengine': self.ioengine
+        }
+
+    def _precondition(self):
+        """Precondition all the targets before running the jobs.
+
+        For the 'device' scheduler, each target is preconditioned separately
+        and concurrently. Otherwise all the targets are preconditioned by a
+        single fio job, just like how they are tested.
+
+        Returns:
+            0: Passed
+            1: Failed (any of the targets)
+
+        """
+        if self.scheduler == 'device':
+            targets = self.filename.split(':')
+        else:
+            targets = [self.filename]
+
+        # The targets not in the results are failed by exceptions
+        results = {}
+
+        def worker(target):
+            results[target] = self._precondition_target(target)
+
+        threads = [
+            threading.Thread(target=worker, args=(x, )) for x in targets
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        failed = [x for x in targets if results.get(x) != 0]
+        if failed:
+            print('[ERROR] Fail to precondition "%s".' % '", "'.join(failed))
+            return 1
+
+        return 0
+
+    def _precondition_target(self, target):
+        """Precondition the specified target.
+
+        The preconditioning is skipped if the marker file shows that the
+        target has been preconditioned by the same size and workload, unless
+        self.force_precondition is set. The fio outputs and a summary (the
+        durations and whether the steady state was attained) are saved into
+        the log path as 'precondition_<device>*.json'.
+
+        Args:
+            target: str, the disk(s) or file(s) to be preconditioned.
+
+        Returns:
+            0: Passed or skipped
+            1: Failed
+
+        """
+        tag = re.sub(r'[^\w.]+', '-', target.strip('/'))
+        marker = os.path.join(os.path.expanduser(self.state_path),
+                              'precondition_%s.json' % tag)
+        prefix = self.path + os.sep + 'precondition_%s' % tag
+        workload = self._get_precondition_workload()
+
+        # Check the marker file
+        if not self.force_precondition:
+            try:
+                with open(marker, 'r') as f:
+                    state = json.load(f)
+                if (state['target'], state['size'],
+                        state['workload']) == (target, self.size, workload):
+                    print('[NOTE] "%s" was preconditioned at %s, skip it. '
+                          '(marker: %s)' % (target, state['stop'], marker))
+                    return 0
+            except (IOError, OSError, ValueError, KeyError):
+                pass
+
+        summary = {
+            'target': target,
+            'size': self.size,
+            'workload': workload,
+            'start': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime()),
+            'stop': None,
+            'phases': {}
+        }
+
+        for phase in ('fill', 'steady'):
+            command = 'fio --name=precondition_%s' % phase
+            command += ' --filename=%s' % target
+            command += ' --size=%s' % self.size
+            command += ' --ioengine=%s' % self.ioengine
+            command += ' --direct=1'
+            command += ' --rw=%s' % workload[phase]['rw']
+            command += ' --bs=%s' % workload[phase]['bs']
+            command += ' --iodepth=%s' % workload[phase]['iodepth']
+            command += ' --numjobs=%s' % workload[phase]['numjobs']
+            command += ' --group_reporting'
+            if phase == 'steady':
+                command += ' --norandommap --randrepeat=0'
+                command += ' --time_based'
+                command += ' --runtime=%s' % workload['runtime']
+                command += ' --steadystate=%s' % workload['steadystate']
+                command += ' --ss_dur=%s' % workload['ss_dur']
+                command += ' --ss_ramp=%s' % workload['ss_ramp']
+            command += ' --output-format=json'
+            command += ' --output=%s_%s.json' % (prefix, phase)
+
+            print('[NOTE] Precondition "%s" (%s): %s' % (target, phase,
+                                                        command))
+            if self.dryrun:
+                continue
+
+            begin = time.time()
+            if subprocess.call(shlex.split(command)) != 0:
+                print('[ERROR] Fail to precondition "%s" (%s).' %
+                      (target, phase))
+                return 1
+
+            result = {'duration': round(time.time() - begin, 3)}
+            try:
+                with open('%s_%s.json' % (prefix, phase), 'r') as f:
+                    content = f.read()
+                raw_data = json.JSONDecoder().raw_decode(
+                    content, content.index('{'))[0]
+                ss = raw_data['jobs'][0].get('steadystate', {})
+                result['attained'] = ss.get('attained')
+                result['ss_duration'] = ss.get('duration')
+            except (IOError, OSError, ValueError, KeyError, IndexError):
+                pass
+            summary['phases'][phase] = result
+
+        if self.dryrun:
+            return 0
+
+        summary['stop'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+        if not summary['phases']['steady'].get('attained'):
+            print('[WARNING] "%s" did not reach the steady state in %s.' %
+                  (target, workload['runtime']))
+
+        # Log the summary for the report and record the marker file
+        content = json.dumps(summary, indent=4)
+        with open(prefix + '.json', 'w') as f:
+            f.write(content)
+        if not os.path.exists(os.path.dirname(marker)):
+            os.makedirs(os.path.dirname(marker))
+        with open(marker, 'w') as f:
+            f.write(content)
+
+        print('[NOTE] "%s" was preconditioned in %ss.' %
+              (target,
+               sum([x['duration'] for x in summary['phases'].values()])))
+
+        return 0
+
+    def _get_parallelism(self):
+        """Get the number of jobs running at the same time."""
+        if self.scheduler != 'device':
+            return 1
+
+        parallel = len(self.filename.split(':'))
+        if self.concurrency > 0:
+            parallel = min(self.concurrency, parallel)
+
+        return parallel
+
+    def _get_job_overhead(self):
+        """Measure the overhead of each job from the journal.
+
+        The overhead (drop caches, post-processing, etc.) is the duration of
+        a finished job beyond its runtime and ramp time. The journal may be
+        left by a previous campaign in the same log path.
+
+        Returns:
+            A tuple of (overhead in seconds, number of the measured jobs).
+
+        """
+        try:
+            with open(self.journal, 'r') as f:
+                jobs = json.load(f)['jobs']
+        except (IOError, OSError, ValueError, KeyError):
+            jobs = []
+
+        # The jobs terminated at steady state are not comparable
+        expected = self._parse_time(self.runtime) + self.ramp_time
+        overheads = []
+        for job in jobs:
+            if job['status'] != 'FINISH' or 'steadystate' in job['command']:
+                continue
+            duration = time.mktime(
+                time.strptime(job['stop'], '%Y-%m-%d %H:%M:%S')) - time.mktime(
+                    time.strptime(job['start'], '%Y-%m-%d %H:%M:%S'))
+            if job.get('postproc', {}).get('mode') == 'sync':
+                duration += job['postproc']['seconds']
+            overheads.append(max(0, duration - expected))
+
+        if not overheads:
+            # Assume 10s for dropping caches and collecting the logs
+            return (10.0, 0)
+
+        overheads.sort()
+        return (overheads[len(overheads) // 2], len(overheads))
+
+    def _estimate_wall_time(self, jobs, overhead):
+        """Estimate the wall time of running the specified jobs.
+
+        Args:
+            jobs: list, the jobs to be run.
+            overhead: float, the overhead in seconds of each job.
+
+        Returns:
+            The estimated wall time in seconds.
+
+        """
+        duration = self._parse_time(self.runtime) + self.ramp_time + overhead
+        parallel = self._get_parallelism()
+
+        seconds = 0
+        for (wave, group) in itertools.groupby(jobs, key=lambda x: x['wave']):
+            count = len(list(group))
+            seconds += duration * ((count + parallel - 1) // parallel)
+
+        return seconds
+
+    def _format_seconds(self, seconds):
+        """Format the seconds in "H:MM:SS" format."""
+        seconds = int(seconds)
+        return '%d:%02d:%02d' % (seconds // 3600, seconds // 60 % 60,
+                                 seconds % 60)
+
+    def _load_history(self):
+        """Load the history KPIs of each sub-case from self.history_csv.
+
+        Returns:
+            A dict like {(rw, bs, iodepth): {'bw': mean BW in MiB/s,
+            'cov': CoV of the IOPS among the rounds}}.
+
+        """
+        if not self.history_csv:
+            return {}
+
+        samples = {}
+        try:
+            with open(os.path.expanduser(self.history_csv), 'r') as f:
+                for row in csv.DictReader(f):
+                    if row.get('Target') == 'ALL':
+                        continue
+                    key = (row['RW'], row['BS'], str(row['IODepth']))
+                    samples.setdefault(key, []).append(
+                        (float(row['BW(MiB/s)']), float(row['IOPS'])))
+        except (IOError, OSError, ValueError, KeyError) as err:
+            print('[WARNING] Fail to load the history "%s". %s' %
+                  (self.history_csv, err))
+            return {}
+
+        history = {}
+        for (key, values) in samples.items():
+            bws = [x[0] for x in values]
+            iops = [x[1] for x in values]
+            mean = sum(iops) / len(iops)
+            cov = None
+            if len(iops) > 1 and mean > 0:
+                stdev = (sum([(x - mean)**2 for x in iops]) /
+                         (len(iops) - 1.0))**0.5
+                cov = stdev / mean
+            history[key] = {'bw': sum(bws) / len(bws), 'cov': cov}
+
+        return history
+
+    def _prune_jobs(self):
+        """Prune the jobs to fit the campaign into self.time_budget.
+
+        The jobs are pruned in the following order, until the estimated wall
+        time fits the budget:
+        1. Reduce the rounds of the low-variance sub-cases (down to 2 rounds),
+           as long as the confidence interval estimated from the CoV in
+           self.history_csv is still narrower than self.ci_width;
+        2. Thin the middle values of self.bs_list and self.iodepth_list, the
+           first and the last values are always kept;
+
+        Updates:
+            self.jobs: the job list.
+
+        """
+        budget = self._parse_time(self.time_budget)
+        (overhead, measured) = self._get_job_overhead()
+
+        def fits():
+            return self._estimate_wall_time(self.jobs, overhead) <= budget
+
+        if fits():
+            return None
+
+        # Reduce the rounds of the low-variance sub-cases
+        from scipy.stats import t
+
+        history = self._load_history()
+        candidates = sorted(
+            [(history[x]['cov'], x) for x in history
+             if history[x]['cov'] is not None])
+        rounds = max([x['round'] for x in self.jobs])
+        floor = min(2, rounds)
+        while rounds > floor and not fits():
+            for (cov, (rw, bs, iodepth)) in candidates:
+                if fits():
+                    break
+                if t.ppf((1 + self.ci_level) / 2.0, rounds - 2) * cov / (
+                        rounds - 1)**0.5 * 100 > self.ci_width:
+                    continue
+                self.jobs = [
+                    x for x in self.jobs
+                    if not ((x['rw'], x['bs'], str(x['iodepth'])) == (
+                        rw, bs, iodepth) and x['round'] == rounds)
+                ]
+                print('[NOTE] Prune round %s of sub-case (%s, %s, %s), CoV '
+                      '%.2f%%.' % (rounds, rw, bs, iodepth, cov * 100))
+            rounds -= 1
+
+        # Thin the middle values of bs and iodepth
+        while not fits():
+            thinned = False
+            for (key, values) in (('bs', self.bs_list), ('iodepth',
+                                                         self.iodepth_list)):
+                if fits() or len(values) <= 2:
+                    continue
+                value = values.pop(len(values) // 2)
+                self.jobs = [x for x in self.jobs if x[key] != value]
+                print('[NOTE] Prune %s=%s.' % (key, value))
+                thinned = True
+            if not thinned:
+                break
+
+        if not fits():
+            print('[WARNING] The campaign still exceeds the time budget %s '
+                  'after pruning.' % self.time_budget)
+
+        # Renumber the jobs
+        for (index, job) in enumerate(self.jobs):
+            job['jobnum'] = index + 1
+
+        return None
+
+    def _check_commands(self):
+        """Validate the fio commands by 'fio --parse-only' in parallel.
+
+        The output file ('--output') and the logs ('--write_*_log') are
+        stripped from the commands, since they are under the output path of
+        the job, which doesn't exist until the job runs.
+
+        Returns:
+            A list of (job, error message) for the invalid commands.
+
+        """
+        pending = list(self.jobs)
+        failures = []
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    job = pending.pop(0)
+                args = [
+                    x for x in shlex.split(job['command'])
+                    if not re.match(r'^--(output|write_\w+_log)=', x)
+                ]
+                try:
+                    process = subprocess.Popen(
+                        args + ['--parse-only'],
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        universal_newlines=True)
+                    output = process.communicate()[0]
+                    if process.returncode != 0:
+                        with lock:
+                            failures.append((job, output.strip()))
+                except OSError as err:
+                    with lock:
+                        failures.append((job, str(err)))
+
+        threads = [
+            threading.Thread(target=worker)
+            for x in range(min(8, len(self.jobs)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return sorted(failures, key=lambda x: x[0]['jobnum'])
+
+    def _show_plan(self):
+        """Show the estimated cost of the campaign and validate the jobs."""
+        (overhead, measured) = self._get_job_overhead()
+        seconds = self._estimate_wall_time(self.jobs, overhead)
+        runtime = self._parse_time(self.runtime)
+        history = self._load_history()
+
+        # Estimate the bytes written to each device
+        written = {}
+        for job in self.jobs:
+            targets = job['target'].split(':')
+            if 'write' in job['rw']:
+                ratio = 1.0
+            elif job['rw'] in ('rw', 'readwrite', 'randrw'):
+                ratio = 0.5
+            else:
+                ratio = 0.0
+
+            key = (job['rw'], job['bs'], str(job['iodepth']))
+            if key in history:
+                # The bandwidth in history was against all the targets
+                bw = history[key]['bw']
+            elif self.est_bw:
+                bw = self.est_bw * len(targets)
+            else:
+                bw = None
+
+            for target in targets:
+                if bw is None or written.get(target, 0) is None:
+                    written[target] = None
+                else:
+                    written[target] = written.get(target, 0) + (
+                        bw * runtime * ratio / len(targets))
+
+        print('=' * 50)
+        print('Test Plan')
+        print('-' * 50)
+        print('Jobs         : %s (%s tarballs)' %
+              (len(self.jobs), len(self.jobs)))
+        if self.sweep:
+            print('               (the first step of the load sweep, the '
+                  'others are decided at runtime)')
+        print('Parallelism  : %s' % self._get_parallelism())
+        print('Job Duration : %gs runtime + %gs ramp + %gs overhead (%s)' %
+              (runtime, self.ramp_time, overhead,
+               'measured from %s jobs' % measured if measured else 'assumed'))
+        if self.steadystate:
+            print('               (runtime is the upper limit for '
+                  'steadystate)')
+        print('Wall Time    : %s' % self._format_seconds(seconds))
+        if self.adaptive_rounds and self.min_rounds < self.rounds:
+            print('               (up to %s with adaptive rounds)' %
+                  self._format_seconds(seconds * self.rounds /
+                                       float(self.min_rounds)))
+        if self.time_budget:
+            print('Time Budget  : %s' % self._format_seconds(
+                self._parse_time(self.time_budget)))
+        for (target, mib) in sorted(written.items()):
+            if mib is None:
+                print('Written      : %s: unknown (--history_csv or --est_bw '
+                      'needed)' % target)
+            else:
+                print('Written      : %s: %.1f GiB' % (target, mib / 1024.0))
+
+        failures = self._check_commands()
+        print('Parse Check  : %s / %s passed' %
+              (len(self.jobs) - len(failures), len(self.jobs)))
+        for (job, message) in failures:
+            print('[ERROR] Job %s: %s' % (job['jobnum'], message))
+        print('=' * 50)
+
+        return None
+
+    def _get_min_rate(self, rw):
+        """Get the lowest offered IOPS of the load sweep.
+
+        The offered IOPS is shared by the clones and the directions of the
+        mixed workloads, and each of them is offered 1 IOPS at least.
+
+        Args:
+            rw: str, the rw of the sub-case.
+
+        Returns:
+            The lowest offered IOPS.
+
+        """
+        directions = 2 if rw in ('rw', 'readwrite', 'randrw') else 1
+        return self.numjobs * directions
+
+    def _get_next_rate(self, bs, iodepth, rw):
+        """Get the offered IOPS of the next step of the load sweep.
+
+        The offered IOPS doubles until the SLO is broken (the latency
+        percentile exceeds the SLO or the offered IOPS can't be sustained),
+        then the knee is searched in binary. The next step is decided by the
+        finished steps only, so that the load sweep can be resumed.
+
+        For the 'device' scheduler, a step passes only if all the targets
+        meet the SLO.
+
+        Args:
+            bs, iodepth, rw: the parameters of this sub-case.
+
+        Returns:
+            The offered IOPS, or None if the knee has been located or even
+            the lowest offered IOPS (see _get_min_rate()) misses the SLO.
+
+        """
+        results = {}
+        for job in self.jobs:
+            if (job['bs'], job['iodepth'], job['rw']) != (bs, iodepth, rw):
+                continue
+            if job['status'] in ('FINISH', 'MEASURED'):
+                kpis = self._get_job_kpis(job)
+                passed = kpis is not None and kpis['slo_met'] is True
+            elif job['status'] == 'ABORTED':
+                passed = False
+            else:
+                continue
+            results[job['rate_iops']] = results.get(job['rate_iops'],
+                                                    True) and passed
+
+        good = max([x for x in results if results[x]] or [0])
+        bad = min([x for x in results if not results[x] and x > good] or
+                  [None])
+
+        min_rate = self._get_min_rate(rw)
+        if bad is None:
+            rate = good * 2 if good else max(self.sweep_start, min_rate)
+        elif bad - good <= bad * self.sweep_precision / 100:
+            rate = None
+        else:
+            rate = max((good + bad) // 2, min_rate)
+
+        # Stop at the resolution limit or the safety limit of steps
+        if rate in results or len(results) >= 32:
+            rate = None
+
+        if rate is None and good == 0:
+            print('[NOTE] Sub-case (%s, %s, %s): no load meets p%g <= %gms, '
+                  'even %s IOPS.' % (rw, bs, iodepth, self.slo_percentile,
+                                     self.slo_lat, min(results)))
+        elif rate is None:
+            print('[NOTE] Sub-case (%s, %s, %s): the knee is %s IOPS with '
+                  'p%g <= %gms.' %
+                  (rw, bs, iodepth, good, self.slo_percentile, self.slo_lat))
+
+        return rate
+
+    def _run_sweeps(self):
+        """Run the load sweep for each sub-case until the knee is located.
+
+        The sub-cases are swept one by one, the jobs of the first step have
+        been added by start().
+
+        """
+        for (bs, iodepth, rw) in itertools.product(self.bs_list,
+                                                   self.iodepth_list,
+                                                   self.rw_list):
+            while True:
+                rate = self._get_next_rate(bs, iodepth, rw)
+                if rate is None:
+                    break
+
+                self._append_jobs(1, bs, iodepth, rw, rate)
+                self._save_journal()
+                self._run_waves()
+
+        return None
+
+    def _run_adaptive_rounds(self):
+        """Add rounds to the sub-cases which are not converged yet.
+
+        The rounds are added round by round, so that the samples of the same
+        sub-case are still spread over the campaign.
+
+        """
+        param_tuples = list(
+            itertools.product(self.bs_list, self.iodepth_list, self.rw_list))
+        converged = []
+
+        for rd in range(self.min_rounds + 1, self.rounds + 1):
+            for (bs, iodepth, rw) in param_tuples:
+                if (bs, iodepth, rw) in converged:
+                    continue
+                if self._is_subcase_converged(bs, iodepth, rw):
+                    converged.append((bs, iodepth, rw))
+                    continue
+
+                # The job may exist already when resuming
+                if not [
+                        x for x in self.jobs
+                        if (x['round'], x['bs'], x['iodepth'],
+                            x['rw']) == (rd, bs, iodepth, rw)
+                ]:
+                    self._append_jobs(rd, bs, iodepth, rw)
+
+            self._save_journal()
+            self._run_waves()
+
+        return None
+
+    def _run_waves(self):
+        """Run all the unfinished jobs wave by wave."""
+        # The jobs in the same wave are against different devices
+        for (wave, jobs) in itertools.groupby(self.jobs,
+                                              key=lambda x: x['wave']):
+            # Skip the finished, measured and aborted jobs
+            jobs = [
+                x for x in jobs
+                if x['status'] not in ('FINISH', 'MEASURED', 'ABORTED')
+            ]
+            if not jobs:
+                continue
+
+            # Show job information
+            for job in jobs:
+                self._show_job(job)
+
+            # Drop caches before any job of the wave starts
+            if self.scheduler != 'serial':
+                os.system('sync; echo 3 > /proc/sys/vm/drop_caches')
+
+            # Execute current jobs
+            if len(jobs) == 1:
+                self._run_job(jobs[0])
+            else:
+                self._run_jobs_concurrently(jobs)
+
+        return None
+
+
+def get_cli_params(backend, driver, fs, rounds, filename, size, runtime,
+                   ioengine, direct, numjobs, rw_list, bs_list, iodepth_list,
+                   log_path, plots, dryrun, scheduler, concurrency, resume,
+                   steadystate, ss_dur, ss_ramp, adaptive_rounds, min_rounds,
+                   ci_width, ci_level, adaptive_kpi, sampler,
+                   sample_interval, status_interval, abort_zero_intervals,
+                   abort_on_error, precondition, force_precondition,
+                   precondition_runtime, precondition_steadystate,
+                   state_path, time_budget, history_csv, est_bw, sweep,
+                   slo_percentile, slo_lat, rate_process, sweep_start,
+                   sweep_precision, postproc, postproc_workers,
+                   postproc_cpus, placement, collectors, group_reporting,
+                   keep_text_logs):
+    """Get parameters from the CLI."""
+    cli_params = {}
+
+    if backend is not None:
+        cli_params['backend'] = backend
+    if driver is not None:
+        cli_params['driver'] = driver
+    if fs is not None:
+        cli_params['fs'] = fs
+    if rounds is not None:
+        cli_params['rounds'] = int(rounds)
+    if filename is not None:
+        cli_params['filename'] = filename
+    if size is not None:
+        cli_params['size'] = size
+    if runtime is not None:
+        cli_params['runtime'] = runtime
     if ioengine is not None:
         cli_params['ioengine'] = ioengine
     if direct is not None:
@@ -486,6 +3169,80 @@ def get_cli_params(backend, driver, fs, rounds, filename, size, runtime,
         cli_params['plots'] = plots
     if dryrun is not None:
         cli_params['dryrun'] = dryrun
+    if scheduler is not None:
+        cli_params['scheduler'] = scheduler
+    if concurrency is not None:
+        cli_params['concurrency'] = concurrency
+    if resume is not None:
+        cli_params['resume'] = resume
+    if steadystate is not None:
+        cli_params['steadystate'] = steadystate
+    if ss_dur is not None:
+        cli_params['ss_dur'] = ss_dur
+    if ss_ramp is not None:
+        cli_params['ss_ramp'] = ss_ramp
+    if adaptive_rounds is not None:
+        cli_params['adaptive_rounds'] = adaptive_rounds
+    if min_rounds is not None:
+        cli_params['min_rounds'] = min_rounds
+    if ci_width is not None:
+        cli_params['ci_width'] = ci_width
+    if ci_level is not None:
+        cli_params['ci_level'] = ci_level
+    if adaptive_kpi is not None:
+        cli_params['adaptive_kpi'] = adaptive_kpi
+    if sampler is not None:
+        cli_params['sampler'] = sampler
+    if sample_interval is not None:
+        cli_params['sample_interval'] = sample_interval
+    if status_interval is not None:
+        cli_params['status_interval'] = status_interval
+    if abort_zero_intervals is not None:
+        cli_params['abort_zero_intervals'] = abort_zero_intervals
+    if abort_on_error is not None:
+        cli_params['abort_on_error'] = abort_on_error
+    if precondition is not None:
+        cli_params['precondition'] = precondition
+    if force_precondition is not None:
+        cli_params['force_precondition'] = force_precondition
+    if precondition_runtime is not None:
+        cli_params['precondition_runtime'] = precondition_runtime
+    if precondition_steadystate is not None:
+        cli_params['precondition_steadystate'] = precondition_steadystate
+    if state_path is not None:
+        cli_params['state_path'] = state_path
+    if time_budget is not None:
+        cli_params['time_budget'] = time_budget
+    if history_csv is not None:
+        cli_params['history_csv'] = history_csv
+    if est_bw is not None:
+        cli_params['est_bw'] = est_bw
+    if sweep is not None:
+        cli_params['sweep'] = sweep
+    if slo_percentile is not None:
+        cli_params['slo_percentile'] = slo_percentile
+    if slo_lat is not None:
+        cli_params['slo_lat'] = slo_lat
+    if rate_process is not None:
+        cli_params['rate_process'] = rate_process
+    if sweep_start is not None:
+        cli_params['sweep_start'] = sweep_start
+    if sweep_precision is not None:
+        cli_params['sweep_precision'] = sweep_precision
+    if postproc is not None:
+        cli_params['postproc'] = postproc
+    if postproc_workers is not None:
+        cli_params['postproc_workers'] = postproc_workers
+    if postproc_cpus is not None:
+        cli_params['postproc_cpus'] = postproc_cpus
+    if placement is not None:
+        cli_params['placement'] = placement
+    if collectors is not None:
+        cli_params['collectors'] = [x for x in collectors.split(',') if x]
+    if group_reporting is not None:
+        cli_params['group_reporting'] = group_reporting
+    if keep_text_logs is not None:
+        cli_params['keep_text_logs'] = keep_text_logs
 
     return cli_params
 
@@ -566,8 +3323,166 @@ bw/iops/lat logs and plots in their lifetime.')
               default=None,
               help='Print the commands \
 that would be executed, but do not execute them.')
+@click.option('--scheduler',
+              type=click.Choice(['serial', 'device']),
+              help='How to schedule the jobs. \'serial\' runs each job \
+against all the targets in turn, \'device\' splits the targets into \
+per-device job streams and runs them concurrently.')
+@click.option('--concurrency',
+              type=click.IntRange(0, 65535),
+              help='The maximum number of jobs running at the same time for \
+the \'device\' scheduler, \'0\' for the number of targets.')
+@click.option('--resume',
+              is_flag=True,
+              default=None,
+              help='Resume the campaign from the journal in log_path, skip \
+the jobs whose tarball already exists and is valid.')
+@click.option('--steadystate',
+              help='[FIO] Terminate a job as soon as the steady state \
+criterion is met, capped by runtime. Such as: \'iops_slope:0.1%\', \
+\'bw:2%\', etc.')
+@click.option('--ss_dur',
+              help='[FIO] The duration of the rolling window to check the \
+steady state criterion.')
+@click.option('--ss_ramp',
+              help='[FIO] The duration before checking the steady state \
+criterion.')
+@click.option('--adaptive_rounds/--no-adaptive_rounds',
+              is_flag=True,
+              default=None,
+              help='Run --min_rounds rounds for each sub-case, then keep \
+adding rounds until the confidence interval of the KPI is narrow enough, up \
+to --rounds rounds.')
+@click.option('--min_rounds',
+              type=click.IntRange(2, 1000),
+              help='The minimal rounds for the adaptive rounds.')
+@click.option('--ci_width',
+              type=click.FloatRange(0, 100, min_open=True),
+              help='The target half width of the confidence interval in \
+percent of the mean, for the adaptive rounds.')
+@click.option('--ci_level',
+              type=click.FloatRange(0, 1, min_open=True, max_open=True),
+              help='The confidence level, for the adaptive rounds.')
+@click.option('--adaptive_kpi',
+              type=click.Choice(['iops', 'bw', 'lat', 'clat90']),
+              help='The KPI to decide the adaptive rounds.')
+@click.option('--sampler',
+              type=click.Choice(['native', 'sar', 'none']),
+              help='How to collect the system metrics during the fio test. \
+\'native\' samples /proc/{stat,diskstats,interrupts,softirqs,pressure} by a \
+built-in thread, \'sar\' runs sar in the background, \'none\' collects the \
+CPU idleness by fio instead.')
+@click.option('--sample_interval',
+              type=click.FloatRange(0, 3600, min_open=True),
+              help='The interval in seconds to collect the system metrics.')
+@click.option('--status_interval',
+              type=click.IntRange(0, 3600),
+              help='[FIO] The interval in seconds to stream the fio status \
+for the live KPIs and the anomaly detection, \'0\' (by default) to disable \
+it.')
+@click.option('--abort_zero_intervals',
+              type=click.IntRange(0, 65535),
+              help='Abort a job if its throughput stays zero for the \
+specified number of status intervals after the ramp time, \'0\' to disable \
+it.')
+@click.option('--abort_on_error/--no-abort_on_error',
+              is_flag=True,
+              default=None,
+              help='Abort a job as soon as fio reports errors.')
+@click.option('--precondition/--no-precondition',
+              is_flag=True,
+              default=None,
+              help='Precondition the targets by a sequential fill and random \
+writes until the steady state, before running the jobs.')
+@click.option('--force_precondition',
+              is_flag=True,
+              default=None,
+              help='Precondition the targets even if they have been \
+preconditioned by the same size and workload.')
+@click.option('--precondition_runtime',
+              help='[FIO] The maximum duration of the random writes for \
+preconditioning.')
+@click.option('--precondition_steadystate',
+              help='[FIO] The steady state criterion of the random writes for \
+preconditioning.')
+@click.option('--state_path',
+              help='Where the marker files of the preconditioned targets are \
+saved to.')
+@click.option('--time_budget',
+              help='Prune the jobs to fit the campaign into the specified \
+period of time, such as \'8h\'. Use with --dryrun to review the plan.')
+@click.option('--history_csv',
+              help='A test report of the previous campaign, to estimate the \
+variance and throughput of each sub-case for the plan.')
+@click.option('--est_bw',
+              type=click.FloatRange(0, None, min_open=True),
+              help='The estimated throughput in MiB/s of each device, for the \
+sub-cases not in --history_csv.')
+@click.option('--sweep/--no-sweep',
+              is_flag=True,
+              default=None,
+              help='Run the load sweep instead of the closed-loop jobs, which \
+drives fio at increasing offered IOPS and searches the maximum IOPS under the \
+latency SLO for each sub-case.')
+@click.option('--slo_percentile',
+              type=click.FloatRange(0, 100, min_open=True, max_open=True),
+              help='The percentile of the completion latency for the SLO.')
+@click.option('--slo_lat',
+              type=click.FloatRange(0, None, min_open=True),
+              help='The latency SLO in ms.')
+@click.option('--rate_process',
+              type=click.Choice(['linear', 'poisson']),
+              help='[FIO] How the I/Os are issued at the offered IOPS.')
+@click.option('--sweep_start',
+              type=click.IntRange(1, None),
+              help='The offered IOPS of the first step of the load sweep.')
+@click.option('--sweep_precision',
+              type=click.FloatRange(0, 100, min_open=True, max_open=True),
+              help='Stop the load sweep when the knee is located within the \
+specified percent of the offered IOPS.')
+@click.option('--postproc',
+              type=click.Choice(['sync', 'deferred', 'pinned']),
+              help='How to run the post-processing (plots, logs and tarball) \
+of the jobs. \'sync\' runs it right after each job, \'deferred\' queues it \
+until the campaign ends, \'pinned\' runs it in background on --postproc_cpus \
+which are excluded from fio.')
+@click.option('--postproc_workers',
+              type=click.IntRange(0, 1024),
+              help='The number of workers for the post-processing, \'0\' for \
+the number of --postproc_cpus (pinned) or all the CPUs (deferred).')
+@click.option('--postproc_cpus',
+              help='The CPUs for the pinned post-processing, such as \'0\' or \
+\'0-1\'. The last CPU by default.')
+@click.option('--placement',
+              type=click.Choice(['none', 'local', 'spread']),
+              help='How to place the fio clones on the NUMA nodes. \'none\' \
+leaves it to the scheduler, \'local\' pins them to the CPUs local to the \
+target device (or spreads them if unknown), \'spread\' distributes the job \
+streams over the nodes evenly.')
+@click.option('--collectors',
+              help='The instrumentation collectors of the fio jobs, such as \
+\'sampler,plots,perf\'. Built-ins: sampler, sar, idleprof, plots, hist, \
+diskstats, interrupts, perf, iostat. (default derives from --sampler and \
+--plots)')
+@click.option('--group_reporting/--no-group_reporting',
+              default=None,
+              help='[FIO] Report the fio clones as a whole, or one by one to \
+break down the results and show the imbalance in the test report.')
+@click.option('--keep_text_logs/--no-keep_text_logs',
+              default=None,
+              help='Keep the text bw/iops/lat logs in the tarball, they are \
+converted into \'<casename>.fiologs.npz\' and removed by default.')
 def cli(backend, driver, fs, rounds, filename, size, runtime, ioengine, direct,
-        numjobs, rw_list, bs_list, iodepth_list, log_path, plots, dryrun):
+        numjobs, rw_list, bs_list, iodepth_list, log_path, plots, dryrun,
+        scheduler, concurrency, resume, steadystate, ss_dur, ss_ramp,
+        adaptive_rounds, min_rounds, ci_width, ci_level, adaptive_kpi, sampler,
+        sample_interval, status_interval, abort_zero_intervals,
+        abort_on_error, precondition, force_precondition,
+        precondition_runtime, precondition_steadystate, state_path,
+        time_budget, history_csv, est_bw, sweep, slo_percentile, slo_lat,
+        rate_process, sweep_start, sweep_precision, postproc,
+        postproc_workers, postproc_cpus, placement, collectors,
+        group_reporting, keep_text_logs):
     """Command line interface.
 
     Take arguments from CLI, load default parameters from yaml file.
@@ -577,7 +3492,19 @@ def cli(backend, driver, fs, rounds, filename, size, runtime, ioengine, direct,
     # Read user specified parameters from CLI
     cli_params = get_cli_params(backend, driver, fs, rounds, filename, size,
                                 runtime, ioengine, direct, numjobs, rw_list,
-                                bs_list, iodepth_list, log_path, plots, dryrun)
+                                bs_list, iodepth_list, log_path, plots, dryrun,
+                                scheduler, concurrency, resume, steadystate,
+                                ss_dur, ss_ramp, adaptive_rounds, min_rounds,
+                                ci_width, ci_level, adaptive_kpi, sampler,
+                                sample_interval, status_interval,
+                                abort_zero_intervals, abort_on_error,
+                                precondition, force_precondition,
+                                precondition_runtime, precondition_steadystate,
+                                state_path, time_budget, history_csv, est_bw,
+                                sweep, slo_percentile, slo_lat, rate_process,
+                                sweep_start, sweep_precision, postproc,
+                                postproc_workers, postproc_cpus, placement,
+                                collectors, group_reporting, keep_text_logs)
 
     # Read user configuration from yaml file
     yaml_params = get_yaml_params()
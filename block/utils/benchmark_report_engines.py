@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Benchmark the statistics engines of GenerateBenchmarkReport.py.
+
+# Generate the base and test samples of many sub-cases, complete the
+# benchmark report by both the 'legacy' and 'groupby' engines, and check
+# that the conclusions are identical and the statistics are the same.
+
+History:
+v0.1    2026-10-17  agent         Init version.
+"""
+
+import os
+import sys
+import time
+import warnings
+import click
+import numpy as np
+import pandas as pd
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from GenerateBenchmarkReport import FioBenchmarkReporter  # noqa: E402
+
+
+def generate_samples(subcases, rounds, seed=0):
+    """Generate the base and test samples.
+
+    Most of the sub-cases differ by a few percent, some of them have the
+    same samples, invalid samples or large variance, and some of them are
+    missing in the base samples, so that all the conclusions are covered.
+
+    Args:
+        subcases: int, the number of sub-cases.
+        rounds: int, the number of rounds of each sub-case.
+        seed: int, the seed of the random numbers.
+
+    Returns:
+        A tuple like (df_base, df_test).
+
+    """
+    rng = np.random.RandomState(seed)
+    keys = pd.DataFrame({
+        'Backend': 'NVME',
+        'Driver': np.array(['IDE', 'SCSI', 'NVME'])[np.arange(subcases) % 3],
+        'Format': 'RAW',
+        'RW': np.array(['read', 'write', 'randrw'])[np.arange(subcases) // 3
+                                                     % 3],
+        'BS': np.array(['4k', '64k'])[np.arange(subcases) // 9 % 2],
+        'IODepth': 2**(np.arange(subcases) // 18 % 8),
+        'Numjobs': np.arange(subcases) // 144 + 1
+    })
+    means = {
+        'BW(MiB/s)': rng.uniform(100, 2000, subcases),
+        'IOPS': rng.uniform(1000, 100000, subcases),
+        'LAT(ms)': rng.uniform(0.1, 10, subcases),
+        'CLAT90(ms)': rng.uniform(0.1, 10, subcases),
+        'Util(%)': rng.uniform(50, 100, subcases),
+        'IOPS/CPU': rng.uniform(1000, 50000, subcases),
+        'BW/CPU(MiB/s)': rng.uniform(10, 500, subcases),
+        'Cycles/IO': rng.uniform(1000, 100000, subcases)
+    }
+
+    def get_samples(shift, noise):
+        df = keys.loc[np.repeat(np.arange(subcases), rounds)].reset_index(
+            drop=True)
+        df['Round'] = np.tile(np.arange(1, rounds + 1), subcases)
+        for (column, mean) in means.items():
+            values = np.repeat(mean * shift, rounds)
+            df[column] = values * rng.normal(1, noise, len(values))
+        return df
+
+    df_base = get_samples(1.0, 0.02)
+    df_test = get_samples(rng.normal(1.0, 0.05, subcases), 0.02)
+
+    # The same samples, the invalid samples, large variance and the missing
+    # sub-cases
+    index = np.arange(len(df_test)) // rounds
+    df_test.loc[index % 11 == 1, 'Util(%)'] = 100.0
+    df_base.loc[index % 11 == 1, 'Util(%)'] = 100.0
+    df_test.loc[(index % 13 == 2) & (df_test['Round'] == 1),
+                'LAT(ms)'] = np.nan
+    df_test.loc[index % 17 == 3, 'IOPS'] *= rng.normal(
+        1, 0.3, (index % 17 == 3).sum())
+    df_base = df_base[index % 19 != 4]
+
+    return (df_base, df_test)
+
+
+def run_engine(df_base, df_test, engine):
+    """Generate the report by an engine, return (df_report, seconds)."""
+    reporter = FioBenchmarkReporter()
+    reporter.df_base = df_base.copy()
+    reporter.df_test = df_test.copy()
+    reporter.engine = engine
+
+    # Mute the rows printed by the legacy engine, and the warnings of the
+    # t-tests on the same samples
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            begin = time.time()
+            reporter.generate_report()
+            seconds = time.time() - begin
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return (reporter.df_report, seconds)
+
+
+@click.command()
+@click.option('--subcases',
+              type=click.IntRange(min=1),
+              default=2000,
+              help='The number of sub-cases. (default 2000)')
+@click.option('--rounds',
+              type=click.IntRange(min=1),
+              default=5,
+              help='The number of rounds of each sub-case. (default 5)')
+@click.option('--seed',
+              type=int,
+              default=0,
+              help='The seed of the random numbers. (default 0)')
+def cli(subcases, rounds, seed):
+    """Command Line Interface."""
+    (df_base, df_test) = generate_samples(subcases, rounds, seed)
+    print('[NOTE] Generated %s base and %s test samples of %s sub-cases.' %
+          (len(df_base), len(df_test), subcases))
+
+    (df_legacy, legacy_seconds) = run_engine(df_base, df_test, 'legacy')
+    (df_groupby, groupby_seconds) = run_engine(df_base, df_test, 'groupby')
+    print('[NOTE] legacy: %.2fs, groupby: %.2fs (%.1fx)' %
+          (legacy_seconds, groupby_seconds,
+           legacy_seconds / groupby_seconds if groupby_seconds > 0 else 0))
+
+    # Compare the conclusions and the statistics
+    failed = 0
+    for column in df_legacy.columns:
+        if column.endswith('-CONCLUSION'):
+            mismatched = (df_legacy[column] != df_groupby[column]).sum()
+            if mismatched:
+                print('[ERROR] %s conclusions of "%s" mismatched.' %
+                      (mismatched, column))
+                failed = 1
+        elif column.endswith(('-AVG', '-%SD', '-%DIFF', '-SIGN')):
+            legacy = pd.to_numeric(df_legacy[column], errors='coerce')
+            groupby = pd.to_numeric(df_groupby[column], errors='coerce')
+            if not np.allclose(legacy, groupby, rtol=1e-6, atol=1e-4,
+                               equal_nan=True):
+                print('[ERROR] The values of "%s" mismatched.' % column)
+                failed = 1
+
+    conclusions = df_groupby[[
+        x for x in df_groupby.columns if x.endswith('-CONCLUSION')
+    ]].stack().value_counts()
+    print('[NOTE] The conclusions:\n%s' % conclusions.to_string())
+    if failed:
+        exit(1)
+
+    print('[NOTE] The conclusions are identical.')
+    exit(0)
+
+
+if __name__ == '__main__':
+    cli()
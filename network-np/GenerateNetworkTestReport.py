@@ -10,12 +10,16 @@ v0.3    2020-07-20  charles.shih  Adapt the script for virt_netperf_test.
 v0.4    2020-07-21  charles.shih  Add KPI TransRate.
 v0.5    2020-07-21  charles.shih  Modify KPI Throughput, MSize, RRSize.
 v0.6    2020-07-21  charles.shih  Adjust MSize, RRSize, add KPI Latency.
+v0.7    2026-10-17  agent         Read the tarballs in memory, stream the raw
+                                  data and support columnar reports.
 """
 
 import json
 import os
 import click
 import pandas as pd
+from ReportUtils import get_members_from_tarball
+from ReportUtils import dataframe_to_columnar
 
 
 class NetperfTestReporter():
@@ -26,24 +30,34 @@ class NetperfTestReporter():
     2. It analyse the raw data and extract performance KPIs from raw data;
     3. It generates the report DataFrame and dump to a CSV file;
 
+    The raw data are streamed into the KPIs, each of them is dropped right
+    after its KPIs are extracted.
+
     Attributes:
-        raw_data_list: the list to store raw data.
+        raw_data_iter: the generator of raw data.
         perf_kpi_list: the list to store performance KPI tuples.
         df_report: a DataFrame to store the test report.
 
     """
 
-    # The list of raw data, the item is loaded from netperf log file.
-    # Each item is a full data source (raw data) in Python dict format.
-    raw_data_list = []
+    # The key columns stored as categorical in the columnar report.
+    category_columns = ['Driver', 'Test', 'MSize', 'RRSize']
+
+    def __init__(self):
+        """Init test reporter."""
+        # The raw data to be consumed by calculate_performance_kpis(). It
+        # yields the raw data of each netperf log file, which is a full data
+        # source in Python dict format.
+        self.raw_data_iter = iter([])
 
-    # The list of performance KPIs, which are extracted from the raw data.
-    # Each item represents a single netperf test results in Python dict format.
-    perf_kpi_list = []
+        # The list of performance KPIs, which are extracted from the raw
+        # data. Each item represents a single netperf test results in Python
+        # dict format.
+        self.perf_kpi_list = []
 
-    # The DataFrame to store performance KPIs for reporting, which is powered
-    # by Pandas.
-    df_report = None
+        # The DataFrame to store performance KPIs for reporting, which is
+        # powered by Pandas.
+        self.df_report = None
 
     def _byteify(self, inputs):
         """Convert unicode to utf-8 string.
@@ -74,9 +88,10 @@ class NetperfTestReporter():
 
         This function open a specified netperf log file and read the json
         block. Then converts it into Python dict format and returns it.
+        If a tarball is specified, the netperf log is read from it in memory.
 
         Args:
-            data_file: string, the path to the netperf log file.
+            data_file: string, the path to the netperf log file or tarball.
 
         Returns:
             This function returns a tuple like (result, raw_data):
@@ -96,14 +111,21 @@ class NetperfTestReporter():
             return (1, None)
 
         try:
-            with open(data_file, 'r') as f:
-                json_data = json.load(f)
-                if '' == b'':
-                    # Convert to byteify for Python 2
-                    raw_data = self._byteify(json_data)
-                else:
-                    # Keep strings for Python 3
-                    raw_data = json_data
+            if data_file.endswith('.tar.gz'):
+                members = get_members_from_tarball(data_file, ['.nplog.json'])
+                if '.nplog.json' not in members:
+                    return (1, None)
+                json_data = json.loads(members['.nplog.json'].decode('utf-8'))
+            else:
+                with open(data_file, 'r') as f:
+                    json_data = json.load(f)
+
+            if '' == b'':
+                # Convert to byteify for Python 2
+                raw_data = self._byteify(json_data)
+            else:
+                # Keep strings for Python 3
+                raw_data = json_data
         except Exception as err:
             print('[ERROR] Error while handling the new json file: %s' % err)
             return (1, None)
@@ -113,8 +135,10 @@ class NetperfTestReporter():
     def load_raw_data_from_netperf_logs(self, params={}):
         """Load raw data from netperf log files.
 
-        This function loads raw data from a sort of netperf log files and stores
-        the raw data (in Python dict format) into self.raw_data_list.
+        This function finds a sort of netperf log files and sets up the
+        generator of their raw data (in Python dict format) as
+        self.raw_data_iter. The files are loaded when the generator is
+        consumed by calculate_performance_kpis().
 
         Args:
             params: dict
@@ -125,7 +149,7 @@ class NetperfTestReporter():
             1: Failed
 
         Updates:
-            self.raw_data_list: store all the raw data;
+            self.raw_data_iter: the generator of raw data;
 
         """
         # Parse required params
@@ -133,29 +157,34 @@ class NetperfTestReporter():
             print('[ERROR] Missing required params: params[result_path]')
             return 1
 
-        # Load raw data from files
+        # Find the files
+        filenames = []
         for fname in os.listdir(params['result_path']):
             filename = params['result_path'] + os.sep + fname
+            if filename.endswith(
+                ('.nplog.json', '.tar.gz')) and os.path.isfile(filename):
+                filenames.append(filename)
+
+        # Load raw data from files lazily
+        self.raw_data_iter = self._iter_raw_data(filenames)
 
-            # Tarball support
-            tmpfolder = '/tmp/netperf-report.tmp'
-            if filename.endswith('.tar.gz') and os.path.isfile(filename):
-                os.system('mkdir -p {0}'.format(tmpfolder))
-                os.system('tar xf {1} -C {0}'.format(tmpfolder, filename))
-                filename = tmpfolder + os.sep + fname.replace(
-                    '.tar.gz', '.nplog.json')
+        return 0
 
-            # Load raw data
-            if filename.endswith('.nplog.json') and os.path.isfile(filename):
-                (result,
-                 raw_data) = self._get_raw_data_from_netperf_log(filename)
-                if result == 0:
-                    self.raw_data_list.append(raw_data)
+    def _iter_raw_data(self, filenames):
+        """Load the raw data from the netperf log files one by one.
 
-            # Tarball support, cleanup
-            os.system('[ -e {0} ] && rm -rf {0}'.format(tmpfolder))
+        Args:
+            filenames: list, the netperf log files or tarballs (which are
+                read in memory).
 
-        return 0
+        Yields:
+            The raw data of each file, the failed files are skipped.
+
+        """
+        for filename in filenames:
+            (result, raw_data) = self._get_raw_data_from_netperf_log(filename)
+            if result == 0:
+                yield raw_data
 
     def _get_kpis_from_raw_data(self, raw_data):
         """Get KPIs from a specified raw data.
@@ -229,11 +258,12 @@ class NetperfTestReporter():
     def calculate_performance_kpis(self, params={}):
         """Calculate performance KPIs.
 
-        This function calculates performance KPIs from self.raw_data_list and
-        stores the performance KPI tuples into self.perf_kpi_list.
+        This function calculates performance KPIs from self.raw_data_iter and
+        stores the performance KPI tuples into self.perf_kpi_list. The raw
+        data are loaded one by one, and dropped once the KPIs are extracted.
 
         As data source, the following attributes should be ready to use:
-        1. self.raw_data_list: the list of raw data (Python dict format)
+        1. self.raw_data_iter: the generator of raw data (Python dict format)
 
         Args:
             params: dict
@@ -248,7 +278,7 @@ class NetperfTestReporter():
 
         """
         # Calculate performance KPIs
-        for raw_data in self.raw_data_list:
+        for raw_data in self.raw_data_iter:
             (result, perf_kpi) = self._get_kpis_from_raw_data(raw_data)
             if result == 0:
                 self.perf_kpi_list.append(perf_kpi)
@@ -363,9 +393,7 @@ class NetperfTestReporter():
         try:
             print('[NOTE] Dumping data into csv file "%s"...' %
                   params['report_csv'])
-            content = self.df_report.to_csv()
-            with open(params['report_csv'], 'w') as f:
-                f.write(content)
+            self.df_report.to_csv(params['report_csv'])
             print('[NOTE] Finished!')
 
         except Exception as err:
@@ -374,8 +402,31 @@ class NetperfTestReporter():
 
         return 0
 
+    def report_dataframe_to_columnar(self, params={}):
+        """Dump the report DataFrame to a columnar (parquet or feather) file.
 
-def generate_netperf_test_report(result_path, report_csv):
+        The key columns (self.category_columns, including "MSize" and
+        "RRSize", which could be like "1,1") are stored as categorical, and
+        the other columns (including "Round") are stored as numbers, see
+        dataframe_to_columnar().
+
+        As data source, the self.df_report should be ready to use.
+
+        Args:
+            params: dict, see dataframe_to_columnar().
+
+        Returns:
+            0: Passed
+            1: Failed
+
+        """
+        return dataframe_to_columnar(self.df_report, self.category_columns,
+                                     params)
+
+def generate_netperf_test_report(result_path,
+                                 report_csv,
+                                 columnar_format=None,
+                                 partition_cols=None):
     """Generate netperf test report."""
     netperfreporter = NetperfTestReporter()
 
@@ -399,6 +450,17 @@ def generate_netperf_test_report(result_path, report_csv):
     if return_value:
         exit(1)
 
+    # Dump the Dataframe as columnar file beside the CSV file if required
+    if columnar_format:
+        return_value = netperfreporter.report_dataframe_to_columnar({
+            'report_file':
+            os.path.splitext(report_csv)[0] + '.' + columnar_format,
+            'columnar_format': columnar_format,
+            'partition_cols': partition_cols
+        })
+        if return_value:
+            exit(1)
+
     exit(0)
 
 
@@ -409,7 +471,14 @@ def generate_netperf_test_report(result_path, report_csv):
 @click.option('--report_csv',
               type=click.Path(),
               help='Specify the name of CSV file for netperf test reports.')
-def cli(result_path, report_csv):
+@click.option('--columnar',
+              type=click.Choice(['parquet', 'feather']),
+              help='Also dump the report into a columnar file which keeps the \
+dtypes, named after the CSV file.')
+@click.option('--partition_cols',
+              help='Partition the parquet report by the columns, such as \
+\'Driver,Test\'.')
+def cli(result_path, report_csv, columnar, partition_cols):
     """Command Line Interface."""
     # Parse and check the parameters
     if not result_path:
@@ -421,7 +490,9 @@ use "%s/netperf_report.csv" instead.' % result_path)
         report_csv = result_path + os.sep + 'netperf_report.csv'
 
     # Generate netperf test report
-    generate_netperf_test_report(result_path, report_csv)
+    generate_netperf_test_report(
+        result_path, report_csv, columnar,
+        partition_cols.split(',') if partition_cols else None)
 
 
 if __name__ == '__main__':
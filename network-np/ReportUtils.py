@@ -0,0 +1 @@
+../block/ReportUtils.py
\ No newline at end of file
@@ -9,6 +9,7 @@ v0.4    2020-07-13  charles.shih  Support renaming KEY columns
 v0.5    2020-07-13  charles.shih  Support customizing KPI columns
 v0.6    2020-07-13  charles.shih  Support appending units to the columns
 v0.7    2020-07-21  charles.shih  Update the logic of getting conclusion
+v0.8    2026-10-17  agent         Load the samples from columnar files
 """
 
 import os
@@ -18,6 +19,7 @@ import pandas as pd
 import numpy as np
 from scipy.stats import ttest_rel
 from scipy.stats import ttest_ind
+from ReportUtils import read_samples
 
 
 class FlentBenchmarkReporter():
@@ -83,7 +85,8 @@ class FlentBenchmarkReporter():
     def load_samples(self, params={}):
         """Load the base and test samples.
 
-        Load the base and test samples from csv files specified.
+        Load the base and test samples from csv (or parquet/feather) files
+        specified.
 
         Args:
             params: dict
@@ -99,7 +102,7 @@ class FlentBenchmarkReporter():
             self.df_test: store the test samples;
 
         Raises:
-            1. Error while reading from csv file
+            1. Error while reading the samples
 
         """
         # Parse required params
@@ -113,17 +116,17 @@ class FlentBenchmarkReporter():
 
         try:
             # Load base samples from CSV file
-            print('[NOTE] Reading base samples from csv file "%s"...' %
+            print('[NOTE] Reading base samples from file "%s"...' %
                   params['base_csv'])
-            self.df_base = pd.read_csv(params['base_csv'])
+            self.df_base = read_samples(params['base_csv'])
 
             # Load test samples from CSV file
-            print('[NOTE] Reading test samples from csv file "%s"...' %
+            print('[NOTE] Reading test samples from file "%s"...' %
                   params['test_csv'])
-            self.df_test = pd.read_csv(params['test_csv'])
+            self.df_test = read_samples(params['test_csv'])
 
         except Exception as err:
-            print('[ERROR] Error while reading from csv file: %s' % err)
+            print('[ERROR] Error while reading the samples: %s' % err)
             return 1
 
         return 0
@@ -444,10 +447,12 @@ def generate_flent_benchmark_report(base_csv, test_csv, report_csv):
 @click.command()
 @click.option('--base_csv',
               type=click.Path(exists=True),
-              help='Specify the CSV file of the base samples.')
+              help='Specify the CSV (or parquet/feather) file of the base \
+samples.')
 @click.option('--test_csv',
               type=click.Path(exists=True),
-              help='Specify the CSV file of the test samples.')
+              help='Specify the CSV (or parquet/feather) file of the test \
+samples.')
 @click.option('--report_csv',
               type=click.Path(),
               help='Specify the CSV file to store the benchmark report.')